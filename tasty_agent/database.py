@@ -102,6 +102,26 @@ class CredentialsDB:
             conn.commit()
             logger.info(f"Inserted/updated credentials for API key {api_key[:8]}...")
     
+    def insert_or_update_many(self, entries: list[tuple[str, str, str]]) -> None:
+        """Insert or update many credentials in a single transaction.
+        
+        Args:
+            entries: List of (api_key, client_secret, refresh_token) tuples
+        """
+        if not entries:
+            return
+        with self._get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO credentials (api_key, client_secret, refresh_token, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(api_key) DO UPDATE SET
+                    client_secret = excluded.client_secret,
+                    refresh_token = excluded.refresh_token,
+                    updated_at = CURRENT_TIMESTAMP
+            """, entries)
+            conn.commit()
+            logger.info(f"Inserted/updated credentials for {len(entries)} API key(s)")
+    
     def delete_credentials(self, api_key: str) -> bool:
         """Delete credentials for an API key.
         
@@ -160,19 +180,21 @@ class CredentialsDB:
             with open(json_path, "r") as f:
                 creds_dict = json.load(f)
             
-            migrated_count = 0
+            entries: list[tuple[str, str, str]] = []
             for api_key, cred_data in creds_dict.items():
                 if isinstance(cred_data, dict):
                     client_secret = cred_data.get("client_secret")
                     refresh_token = cred_data.get("refresh_token")
                     if client_secret and refresh_token:
-                        self.insert_or_update_credentials(api_key, client_secret, refresh_token)
-                        migrated_count += 1
+                        entries.append((api_key, client_secret, refresh_token))
                     else:
                         logger.warning(f"Missing client_secret or refresh_token for API key: {api_key}")
                 else:
                     logger.warning(f"Invalid credential format for API key: {api_key}")
             
+            # One transaction instead of a connection + commit per credential
+            self.insert_or_update_many(entries)
+            migrated_count = len(entries)
             logger.info(f"Migrated {migrated_count} credential(s) from {json_path} to database")
             return migrated_count
         except json.JSONDecodeError as e:
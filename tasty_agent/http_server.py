@@ -10,32 +10,42 @@ import base64
 import json
 import logging
 import os
+import random
 import subprocess
+import time
+import zlib
+from collections import deque
 from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, timedelta, timezone
 from decimal import Decimal
+from functools import cached_property, lru_cache
+from enum import IntFlag
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, cast, get_args
 
 import humanize
 from aiocache import Cache, cached
-from aiocache.serializers import PickleSerializer
+from aiocache.base import BaseCache
+from aiocache.serializers import NullSerializer
 from aiolimiter import AsyncLimiter
 from fastapi import FastAPI, HTTPException, Header, Depends, Query, status, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import Message, ASGIApp
 from starlette.requests import Request as StarletteRequest
 from mcp.server.fastmcp import Context
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from pydantic_ai import Agent, BinaryContent
 from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.messages import PartDeltaEvent, PartStartEvent, TextPart, TextPartDelta
 from tabulate import tabulate
 from tastytrade import Account, Session
+from tastytrade.account import AccountBalance
 from tastytrade.dxfeed import Greeks, Quote
 from tastytrade.instruments import Equity, Option, a_get_option_chain
 from tastytrade.market_sessions import ExchangeType, MarketStatus, a_get_market_holidays, a_get_market_sessions
@@ -68,9 +78,42 @@ from tasty_agent.utils.session import create_session, is_sandbox_mode, select_ac
 from tasty_agent.utils.credentials import unpack_credentials
 from tasty_agent.utils.errors import handle_tastytrade_auth_error
 
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    orjson = None
+    DefaultResponse = JSONResponse  # Fall back to stdlib json encoding
+
 logger = get_http_server_logger()
 
-rate_limiter = AsyncLimiter(2, 1)  # 2 requests per second
+rate_limiter = AsyncLimiter(1.9, 1)  # Just under 2 requests per second so clock skew doesn't trip the API limit
+PAGINATE_PREFETCH = 4  # Pages requested concurrently once the first page comes back full
+RATE_LIMIT_RETRIES = 3  # Retries after a rate-limit rejection, backing off 0.5s, 2s, then 8s
+RATE_LIMIT_BACKOFF = 0.5
+TO_TABLE_MAX_TABULATE_ROWS = 500  # Larger tables use the single-pass plain renderer instead of tabulate
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Check whether an API error is a rate-limit rejection (the SDK only exposes the message)."""
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+async def _rate_limited_call[T](call: Callable[[], Awaitable[T]]) -> T:
+    """Run a read-only API call under the rate limiter, retrying rate-limit rejections with jittered backoff."""
+    for attempt in range(RATE_LIMIT_RETRIES):
+        async with rate_limiter:
+            try:
+                return await call()
+            except Exception as e:
+                if not _is_rate_limited(e):
+                    raise
+                delay = RATE_LIMIT_BACKOFF * 4 ** attempt
+                logger.warning(f"Rate limited by Tastytrade, retrying in {delay:.1f}s: {e}")
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+    async with rate_limiter:
+        return await call()
 
 # API Key authentication
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
@@ -166,9 +209,10 @@ def save_credentials(credentials: dict[str, tuple[str, str]]) -> None:
         )
     
     try:
-        # Save each credential to database
-        for api_key, (client_secret, refresh_token) in credentials.items():
-            credentials_db.insert_or_update_credentials(api_key, client_secret, refresh_token)
+        # Save all credentials in a single transaction
+        credentials_db.insert_or_update_many(
+            [(api_key, client_secret, refresh_token) for api_key, (client_secret, refresh_token) in credentials.items()]
+        )
         logger.info(f"Saved {len(credentials)} credential(s) to database")
     except Exception as e:
         logger.error(f"Failed to save credentials to database: {e}")
@@ -348,7 +392,55 @@ def get_conversation_history(api_key: str, tab_id: str | None) -> list[ChatMessa
         return []
     
     key = (api_key, tab_id)
-    return api_key_tab_conversations.get(key, []).copy()
+    return list(api_key_tab_conversations.get(key, ()))
+
+
+# Constant prompt fragments for assembling chat context
+_PREFIX_USER = "User: "
+_PREFIX_ASSISTANT = "Assistant: "
+_SYMBOL_HEADER = "Current symbol context: "
+_HISTORY_HEADER = "Previous conversation:\n"
+_QUESTION_HEADER = "\n\nCurrent question: "
+
+
+def format_history_line(message: ChatMessage) -> str:
+    """Format a chat message as a transcript line for the prompt context."""
+    return (_PREFIX_USER if message.role == 'user' else _PREFIX_ASSISTANT) + message.content
+
+
+def build_user_message(message: str, context: str | None = None, symbol: str | None = None) -> str:
+    """Assemble the prompt text from the optional symbol header, history context, and question.
+    
+    Args:
+        message: Current user message
+        context: Newline-joined history transcript (optional)
+        symbol: Symbol extracted from the tab ID (optional)
+    
+    Returns:
+        Prompt text built with a single join
+    """
+    parts: list[str] = []
+    if symbol:
+        parts += (_SYMBOL_HEADER, symbol, "\n\n")
+    if context:
+        parts += (_HISTORY_HEADER, context, _QUESTION_HEADER)
+    parts.append(message)
+    return "".join(parts)
+
+
+def get_conversation_transcript(api_key: str, tab_id: str | None) -> str:
+    """Get the preformatted conversation transcript for a specific (api_key, tab_id) pair.
+    
+    Args:
+        api_key: API key identifier
+        tab_id: Tab ID (optional)
+    
+    Returns:
+        Newline-joined transcript lines, empty string if no history exists
+    """
+    if not tab_id:
+        return ""
+    return "\n".join(api_key_tab_transcripts.get((api_key, tab_id), ()))
 
 
 def save_conversation_message(api_key: str, tab_id: str | None, message: ChatMessage) -> None:
@@ -364,14 +456,11 @@ def save_conversation_message(api_key: str, tab_id: str | None, message: ChatMes
     
     key = (api_key, tab_id)
     if key not in api_key_tab_conversations:
-        api_key_tab_conversations[key] = []
+        api_key_tab_conversations[key] = deque(maxlen=MAX_CONVERSATION_MESSAGES)
+        api_key_tab_transcripts[key] = deque(maxlen=MAX_CONVERSATION_MESSAGES)
+    # Bounded deques drop the oldest entries automatically
     api_key_tab_conversations[key].append(message)
-    
-    # Limit conversation history to prevent unbounded growth
-    # Keep last 100 messages (approximately 50 exchanges)
-    max_messages = 100
-    if len(api_key_tab_conversations[key]) > max_messages:
-        api_key_tab_conversations[key] = api_key_tab_conversations[key][-max_messages:]
+    api_key_tab_transcripts[key].append(format_history_line(message))
 
 
 def get_client_ip(request: Request) -> str:
@@ -540,8 +629,8 @@ async def verify_api_key(
     # First, try Supabase (for kiosk devices) - only if not in paper mode
     elif supabase_client:
         try:
-            # Always validate against Supabase first (to catch revocations)
-            # This ensures revoked keys are immediately rejected even if cached
+            # Always validate against Supabase first (to catch revocations). The client reuses a
+            # successful validation for up to a minute per key and IP, so revocations apply within that window
             kiosk_info = await supabase_client.validate_kiosk_api_key(api_key, client_ip=client_ip)
             if kiosk_info:
                 # Update cache with fresh validation result (only if IP validation passed)
@@ -599,40 +688,95 @@ async def _stream_events(
     streamer_symbols: list[str],
     timeout: float
 ) -> list[Any]:
-    """Generic streaming helper for Quote/Greeks events."""
+    """Generic streaming helper for Quote/Greeks events; `timeout` bounds the whole collection, not each event."""
     async with DXLinkStreamer(session) as streamer:
-        await streamer.subscribe(event_type, streamer_symbols)
-        events_by_symbol: dict[str, Any] = {}
-        expected = set(streamer_symbols)
-        while len(events_by_symbol) < len(expected):
-            event = await asyncio.wait_for(streamer.get_event(event_type), timeout=timeout)
-            if event.event_symbol in expected:
+        return await _collect_events(streamer, event_type, streamer_symbols, timeout)
+
+
+async def _collect_events(
+    streamer: DXLinkStreamer,
+    event_type: type[Quote] | type[Greeks],
+    streamer_symbols: list[str],
+    timeout: float
+) -> list[Any]:
+    """Subscribe on an open streamer and collect one event per symbol, in the order requested."""
+    await streamer.subscribe(event_type, streamer_symbols)
+    events_by_symbol: dict[str, Any] = {}
+    remaining = set(streamer_symbols)
+    async with asyncio.timeout(timeout):
+        while remaining:
+            event = await streamer.get_event(event_type)
+            if event.event_symbol in remaining:
                 events_by_symbol[event.event_symbol] = event
-        return [events_by_symbol[s] for s in streamer_symbols]
+                remaining.discard(event.event_symbol)
+    return [events_by_symbol[s] for s in streamer_symbols]
 
 
 async def _paginate[T](
     fetch_fn: Callable[[int], Awaitable[list[T]]],
     page_size: int
 ) -> list[T]:
-    """Generic pagination helper for API calls."""
-    all_items: list[T] = []
-    offset = 0
-    while True:
-        async with rate_limiter:
-            items = await fetch_fn(offset)
-        all_items.extend(items or [])
-        if not items or len(items) < page_size:
-            break
-        offset += page_size
+    """Generic pagination helper for API calls. `fetch_fn` receives the page index (the API's page-offset).
+    
+    The page count isn't known up front, so after a full first page the next PAGINATE_PREFETCH
+    pages are fetched concurrently (still under the rate limiter) until a short page ends the results.
+    """
+    async def fetch_page(page: int) -> list[T]:
+        return list(await _rate_limited_call(lambda: fetch_fn(page)) or [])
+
+    all_items = await fetch_page(0)
+    next_page = 1
+    more = len(all_items) >= page_size
+    while more:
+        pages = await asyncio.gather(*[fetch_page(p) for p in range(next_page, next_page + PAGINATE_PREFETCH)])
+        for items in pages:
+            all_items.extend(items)
+            if len(items) < page_size:
+                more = False
+                break
+        next_page += PAGINATE_PREFETCH
     return all_items
 
 
-def to_table(data: Sequence[BaseModel]) -> str:
-    """Format list of Pydantic models as a plain table."""
+def _fast_plain_table(rows: Sequence[Sequence[Any]], headers: Sequence[str]) -> str:
+    """Render rows in tabulate's 'plain' layout (no number parsing) with a single width pass."""
+    cells = [["" if value is None else str(value) for value in row] for row in rows]
+    widths = [len(header) + 2 for header in headers]
+    for row in cells:
+        for i, cell in enumerate(row):
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+    lines = ["  ".join(header.ljust(width) for header, width in zip(headers, widths, strict=True)).rstrip()]
+    lines.extend("  ".join(cell.ljust(width) for cell, width in zip(row, widths, strict=True)).rstrip() for row in cells)
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=64)
+def _table_columns(model: type[BaseModel]) -> tuple[tuple[str, ...], Callable[[BaseModel], tuple]]:
+    """Column names and a row getter for a model class, introspected once per class."""
+    keys = tuple(model.model_fields)
+    if len(keys) > 1:
+        return keys, attrgetter(*keys)
+    return keys, lambda item: tuple(getattr(item, key) for key in keys)
+
+
+def to_table(data: Sequence[BaseModel], dumped: list[dict[str, Any]] | None = None) -> str:
+    """Format list of Pydantic models as a plain table, reusing pre-dumped rows when given.
+    
+    Rows are read straight off the model attributes rather than through model_dump. Large tables
+    bypass tabulate, whose per-cell number parsing and width passes dominate formatting time.
+    """
     if not data:
         return "No data"
-    return tabulate([item.model_dump() for item in data], headers='keys', tablefmt='plain')
+    if dumped is not None:
+        keys = list(dumped[0])
+        rows = [[row.get(key) for key in keys] for row in dumped]
+    else:
+        keys, row_getter = _table_columns(type(data[0]))
+        rows = [row_getter(item) for item in data]
+    if len(rows) > TO_TABLE_MAX_TABULATE_ROWS:
+        return _fast_plain_table(rows, keys)
+    return tabulate(rows, headers=keys, tablefmt='plain')
 
 
 @dataclass
@@ -640,6 +784,11 @@ class ServerContext:
     session: Session
     accounts: list[Account]
 
+    @cached_property
+    def accounts_by_number(self) -> dict[str, Account]:
+        """Accounts keyed by account number (accounts are fixed once the context is built)."""
+        return {acc.account_number: acc for acc in self.accounts}
+
 
 # Credential mapping: API key -> (client_secret, refresh_token)
 api_key_credentials: dict[str, tuple[str, str]] = {}
@@ -654,9 +803,15 @@ api_key_agents: dict[tuple[str, str | None], Agent] = {}
 # User settings cache: API key -> UserSettings
 api_key_settings: dict[str, UserSettings] = {}
 
-# Conversation history cache: (api_key, tab_id) -> list[ChatMessage]
+# Conversation history cache: (api_key, tab_id) -> deque[ChatMessage]
 # This allows separate conversation contexts per tab
-api_key_tab_conversations: dict[tuple[str, str], list[ChatMessage]] = {}
+# Keep last 100 messages (approximately 50 exchanges) to prevent unbounded growth
+MAX_CONVERSATION_MESSAGES = 100
+api_key_tab_conversations: dict[tuple[str, str], deque[ChatMessage]] = {}
+
+# Preformatted "User: ..."/"Assistant: ..." lines mirroring api_key_tab_conversations,
+# so building the prompt context is a single join
+api_key_tab_transcripts: dict[tuple[str, str], deque[str]] = {}
 
 # Track current model identifier to invalidate cache when it changes
 # Initialize with current default to detect changes after restart
@@ -735,8 +890,10 @@ def get_api_key_context(api_key: str, client_secret: str | None = None, refresh_
             except Exception as refresh_err:
                 error_msg = str(refresh_err)
                 if "invalid_grant" in error_msg or "Grant revoked" in error_msg:
-                    # Clear invalid session
+                    # Clear invalid session, and re-read kiosk credentials on the next validation
                     api_key_sessions.pop(api_key, None)
+                    if supabase_client:
+                        supabase_client.invalidate(api_key)
                     raise HTTPException(
                         status_code=401,
                         detail=f"TastyTrade refresh token is invalid or revoked. Please update your credentials using POST /api/v1/credentials. Error: {error_msg}"
@@ -837,7 +994,7 @@ def get_account_context(api_key: str, account_id: str | None) -> tuple[Session,
             account_id = kiosk_info.get('account_id')
             if account_id:
                 # Find the matching account
-                account = next((acc for acc in context.accounts if acc.account_number == account_id), None)
+                account = context.accounts_by_number.get(account_id)
                 if account:
                     logger.debug(f"Using account {account_id} from kiosk broker connection")
                     return context.session, account
@@ -854,9 +1011,9 @@ def get_account_context(api_key: str, account_id: str | None) -> tuple[Session,
             )
     
     # Find the specified account
-    account = next((acc for acc in context.accounts if acc.account_number == account_id), None)
+    account = context.accounts_by_number.get(account_id)
     if not account:
-        available_accounts = [acc.account_number for acc in context.accounts]
+        available_accounts = list(context.accounts_by_number)
         raise HTTPException(
             status_code=404,
             detail=f"Account '{account_id}' not found. Available accounts: {available_accounts}"
@@ -1089,10 +1246,11 @@ def get_claude_agent(api_key: str, account_id: str | None = None) -> Agent:
         logger.info(f"Using model identifier: {model_identifier}")
         _current_model_identifier = model_identifier
     
-    # Use (api_key, account_id) as cache key
+    # Use (api_key, account_id) as cache key; single lookup on the hit path
     cache_key = (api_key, account_id)
-    if cache_key in api_key_agents:
-        return api_key_agents[cache_key]
+    cached_agent = api_key_agents.get(cache_key)
+    if cached_agent is not None:
+        return cached_agent
     
     # Get Claude API key from environment (lines 6-10 in .env typically)
     claude_api_key = os.getenv("ANTHROPIC_API_KEY") or os.getenv("CLAUDE_API_KEY")
@@ -1174,6 +1332,70 @@ def get_claude_agent(api_key: str, account_id: str | None = None) -> Agent:
         ) from e
 
 
+# Long-lived agent contexts (id(agent) -> (agent, holder task, stop event)).
+# Entering an agent starts its MCP stdio server; holding it open lets every
+# run reuse that subprocess instead of spawning a new one per request.
+_open_agents: dict[int, tuple[Agent, asyncio.Task, asyncio.Event]] = {}
+
+
+async def _hold_agent_open(agent: Agent, ready: asyncio.Event, stop: asyncio.Event) -> None:
+    """Enter the agent context and keep it open until stop is set (enter/exit must share a task)."""
+    async with agent:
+        ready.set()
+        await stop.wait()
+
+
+def _release_stale_agents() -> None:
+    """Signal holders for agents that were evicted from api_key_agents to close their MCP servers."""
+    live_ids = {id(agent) for agent in api_key_agents.values()}
+    for agent_id in [agent_id for agent_id in _open_agents if agent_id not in live_ids]:
+        _, _, stop = _open_agents.pop(agent_id)
+        stop.set()
+
+
+async def acquire_claude_agent(api_key: str, account_id: str | None = None) -> Agent:
+    """
+    Get the cached Claude agent with its MCP server already running.
+
+    Args:
+        api_key: API key identifier
+        account_id: Optional TastyTrade account ID. If None, uses default account.
+
+    Returns:
+        Agent instance whose toolsets stay entered across requests
+    """
+    agent = get_claude_agent(api_key, account_id=account_id)
+    if id(agent) in _open_agents:
+        # Fast path: cached agent with its MCP server already running
+        return agent
+    
+    # A new agent usually means older ones were evicted; release their holders
+    _release_stale_agents()
+
+    ready = asyncio.Event()
+    stop = asyncio.Event()
+    holder = asyncio.create_task(_hold_agent_open(agent, ready, stop))
+    _open_agents[id(agent)] = (agent, holder, stop)
+
+    ready_wait = asyncio.create_task(ready.wait())
+    await asyncio.wait({holder, ready_wait}, return_when=asyncio.FIRST_COMPLETED)
+    if not ready.is_set():
+        # MCP server failed to start; runs will enter the agent themselves
+        ready_wait.cancel()
+        _open_agents.pop(id(agent), None)
+        logger.warning(f"Could not keep Claude agent open for API key {api_key[:8]}...: {holder.exception()}")
+    return agent
+
+
+async def close_open_agents() -> None:
+    """Close every long-lived agent context (called on shutdown)."""
+    holders = [holder for _, holder, _ in _open_agents.values()]
+    for _, _, stop in _open_agents.values():
+        stop.set()
+    _open_agents.clear()
+    await asyncio.gather(*holders, return_exceptions=True)
+
+
 def create_mcp_context(session: Session, account: Account) -> Context[Any, Any, Any]:  # type: ignore[type-arg]
     """Create a mock MCP Context for calling MCP tools from HTTP server."""
     # Create a mock request context with lifespan_context
@@ -1256,7 +1478,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Initialize database
     project_root = Path(__file__).parent.parent
     db_path = get_db_path(project_root)
-    credentials_db = CredentialsDB(db_path)
+    credentials_db = await asyncio.to_thread(CredentialsDB, db_path)
     
     # Initialize Supabase client for kiosk API key validation
     try:
@@ -1273,7 +1495,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         supabase_client = None
     
     # Load credentials at startup (from database and environment variables)
-    api_key_credentials = load_credentials()
+    api_key_credentials = await asyncio.to_thread(load_credentials)
     
     if not api_key_credentials:
         logger.warning(
@@ -1284,7 +1506,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info(f"Loaded credentials for {len(api_key_credentials)} API key(s)")
     
     # Load user settings at startup
-    api_key_settings.update(load_settings())
+    api_key_settings.update(await asyncio.to_thread(load_settings))
     logger.info(f"Loaded settings for {len(api_key_settings)} API key(s)")
     
     # Clear agent cache on startup to ensure fresh agents with current model
@@ -1306,6 +1528,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         await keep_alive_task
     except asyncio.CancelledError:
         pass
+    await close_open_agents()
     if supabase_client:
         await supabase_client.close()
     api_key_sessions.clear()
@@ -1313,6 +1536,14 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     api_key_agents.clear()
     api_key_settings.clear()
     api_key_tab_conversations.clear()
+    api_key_tab_transcripts.clear()
+
+
+def _store_request_context(request: Request, session: Session, account: Account | None = None) -> None:
+    """Remember the resolved session (and account) on request.state for the rest of the request."""
+    request.state.session = session
+    if account is not None:
+        request.state.account = account
 
 
 async def get_session_and_account(
@@ -1323,7 +1554,23 @@ async def get_session_and_account(
     """
     Dependency to get session and account.
     Supports credentials-based auth (internal network) or API key auth (legacy).
+    The result is kept on request.state so later lookups in the same request are free.
     """
+    account = getattr(request.state, "account", None)
+    if account is not None:
+        return request.state.session, account
+    
+    session, account = _resolve_session_and_account(request, api_key, account_id)
+    _store_request_context(request, session, account)
+    return session, account
+
+
+def _resolve_session_and_account(
+    request: Request,
+    api_key: str,
+    account_id: str | None
+) -> tuple[Session, Account]:
+    """Resolve the session and account for a request (see get_session_and_account)."""
     # Check if credentials are provided directly in headers (internal network - no API key needed)
     client_secret = request.headers.get("X-TastyTrade-Client-Secret")
     refresh_token = request.headers.get("X-TastyTrade-Refresh-Token")
@@ -1337,7 +1584,7 @@ async def get_session_and_account(
         target_account_id = header_account_id or account_id
         if target_account_id:
             try:
-                account = select_account(context.accounts, target_account_id)
+                account = select_account(context.accounts_by_number, target_account_id)
                 logger.info(f"Using account {target_account_id} from credentials")
                 return context.session, account
             except ValueError:
@@ -1369,10 +1616,15 @@ async def get_session_and_account(
 
 
 async def get_session_only(
+    request: Request,
     api_key: str = Depends(verify_api_key)
 ) -> Session:
     """Dependency to get session only (for endpoints that don't need account)."""
-    return get_valid_session(api_key)
+    session = getattr(request.state, "session", None)
+    if session is None:
+        session = get_valid_session(api_key)
+        _store_request_context(request, session)
+    return session
 
 
 # ASGI wrapper to increase max body size for image uploads
@@ -1397,7 +1649,8 @@ app = FastAPI(
     title="TastyTrade API Server",
     description="REST API server for TastyTrade brokerage operations. Multiple kiosks can connect via HTTP.",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 # CORS middleware for kiosk access
@@ -1455,6 +1708,11 @@ class OrderLeg(BaseModel):
     strike_price: float | None = Field(None, description="Strike price (required for options)")
     expiration_date: str | None = Field(None, description="Expiration date in YYYY-MM-DD format (required for options)")
 
+    @cached_property
+    def signed_quantity(self) -> int:
+        """Quantity signed by cash flow: negative when buying (debit), positive when selling (credit)."""
+        return -self.quantity if self.action.startswith('Buy') else self.quantity
+
 
 class WatchlistSymbol(BaseModel):
     """Symbol specification for watchlist operations."""
@@ -1496,10 +1754,14 @@ class InstrumentDetail:
 # HELPER FUNCTIONS
 # =============================================================================
 
+@lru_cache(maxsize=4096)
 def validate_date_format(date_string: str) -> date:
-    """Validate date format and return date object."""
+    """Validate date format and return date object (memoized; legs often share expirations)."""
     try:
-        return datetime.strptime(date_string, "%Y-%m-%d").date()
+        # fromisoformat also accepts compact and week dates (20241220, 2024-W51-5), so pin the layout first
+        if len(date_string) != 10 or date_string[4] != '-' or date_string[7] != '-':
+            raise ValueError(date_string)
+        return date.fromisoformat(date_string)
     except ValueError as e:
         raise ValueError(f"Invalid date format '{date_string}'. Expected YYYY-MM-DD format.") from e
 
@@ -1520,15 +1782,152 @@ def _option_chain_key_builder(fn, session: Session, symbol: str):
     return f"option_chain:{symbol}"
 
 
-@cached(ttl=86400, cache=Cache.MEMORY, serializer=PickleSerializer(), key_builder=_option_chain_key_builder)
+# On-disk copy of option chains so process restarts don't refetch every chain
+OPTION_CHAIN_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "option_chains"
+OPTION_CHAIN_CACHE_TTL = 86400
+
+# Chains are stored as zlib-compressed JSON rather than pickles: validated on load, and no code runs from cache files
+_option_chain_adapter = TypeAdapter(dict[date, list[Option]])
+
+
+def _option_chain_cache_path(symbol: str) -> Path:
+    """Get the compressed JSON path for a symbol's cached option chain."""
+    return OPTION_CHAIN_CACHE_DIR / f"{symbol.replace('/', '_')}.json.z"
+
+
+def _read_option_chain_file(symbol: str) -> dict[date, list[Option]] | None:
+    """
+    Load an option chain from the disk cache if it is younger than the TTL.
+    
+    Args:
+        symbol: Underlying symbol
+    
+    Returns:
+        Cached option chain, or None if missing, stale, or unreadable
+    """
+    path = _option_chain_cache_path(symbol)
+    try:
+        fetched_at = float(path.with_suffix(".ts").read_text())
+        if time.time() - fetched_at >= OPTION_CHAIN_CACHE_TTL:
+            return None
+        return _option_chain_adapter.validate_json(zlib.decompress(path.read_bytes()))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable option chain cache for {symbol}: {e}")
+        return None
+
+
+def _write_option_chain_file(symbol: str, chain: dict[date, list[Option]]) -> None:
+    """Persist an option chain to the disk cache along with its fetch time."""
+    path = _option_chain_cache_path(symbol)
+    try:
+        OPTION_CHAIN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(zlib.compress(_option_chain_adapter.dump_json(chain), 6))
+        tmp_path.replace(path)
+        path.with_suffix(".ts").write_text(str(time.time()))
+    except Exception as e:
+        logger.warning(f"Failed to write option chain cache for {symbol}: {e}")
+
+
+@cached(ttl=86400, cache=Cache.MEMORY, serializer=NullSerializer(), key_builder=_option_chain_key_builder)
+async def _get_cached_option_chain(session: Session, symbol: str):
+    """Cache option chains for 24 hours as they rarely change during that timeframe.
+    
+    The memory cache stores the chain object itself (no per-hit pickling), so callers must not mutate it.
+    """
+    chain = await asyncio.to_thread(_read_option_chain_file, symbol)
+    if chain is not None:
+        return chain
+    chain = await a_get_option_chain(session, symbol)
+    await asyncio.to_thread(_write_option_chain_file, symbol, chain)
+    return chain
+
+
+# In-flight chain fetches by symbol, so concurrent cache misses share one request
+_option_chain_inflight: dict[str, asyncio.Task] = {}
+
+
 async def get_cached_option_chain(session: Session, symbol: str):
-    """Cache option chains for 24 hours as they rarely change during that timeframe."""
-    return await a_get_option_chain(session, symbol)
+    """Get the cached option chain, coalescing concurrent misses for a symbol into a single fetch."""
+    task = _option_chain_inflight.get(symbol)
+    if task is None:
+        task = asyncio.create_task(_get_cached_option_chain(session, symbol))
+        _option_chain_inflight[symbol] = task
+        task.add_done_callback(lambda _: _option_chain_inflight.pop(symbol, None))
+    # Shield so one caller's cancellation doesn't abort the fetch the others are waiting on
+    return await asyncio.shield(task)
+
+
+def _equity_key_builder(fn, session: Session, symbol: str):
+    """Build cache key using only symbol (equity metadata is stable for the trading day)."""
+    return f"equity:{symbol}"
+
+
+@cached(ttl=86400, cache=Cache.MEMORY, serializer=NullSerializer(), key_builder=_equity_key_builder)
+async def _get_cached_equity(session: Session, symbol: str) -> Equity:
+    """Cache equity instruments for 24 hours so stock legs skip the instrument lookup on repeat calls."""
+    return await Equity.a_get(session, symbol)
+
+
+async def _get_cached_equities(session: Session, symbols: list[str]) -> dict[str, Equity]:
+    """Resolve equities from the per-symbol cache, fetching every miss in one batched request."""
+    cache = cast(BaseCache, _get_cached_equity.cache)  # Set by @cached; shared with the single-symbol lookup
+    cached_equities = await cache.multi_get([_equity_key_builder(None, session, s) for s in symbols])
+    equities = {s: e for s, e in zip(symbols, cached_equities, strict=True) if e is not None}
+    missing = [s for s in symbols if s not in equities]
+    if missing:
+        fetched = await Equity.a_get(session, missing)
+        fetched = fetched if isinstance(fetched, list) else [fetched]
+        await cache.multi_set([(_equity_key_builder(None, session, e.symbol), e) for e in fetched], ttl=86400)
+        equities.update((e.symbol, e) for e in fetched)
+        # Symbols the batch didn't return go through the single lookup so the API's error surfaces as before
+        for symbol in missing:
+            if symbol not in equities:
+                equities[symbol] = await _get_cached_equity(session, symbol)
+    return equities
+
+
+def _option_chain_index_key_builder(fn, session: Session, symbol: str):
+    """Build cache key for the option chain index using only symbol."""
+    return f"option_chain_index:{symbol}"
+
+
+def _strike_cents(strike_price: Any) -> int:
+    """Convert a strike to integer cents so index keys compare exactly (150.5 and Decimal('150.50') match)."""
+    return int(round(float(strike_price) * 100))
+
+
+@cached(ttl=86400, cache=Cache.MEMORY, serializer=NullSerializer(), key_builder=_option_chain_index_key_builder)
+async def get_cached_option_chain_index(session: Session, symbol: str) -> dict[tuple[date, str, int], Option]:
+    """Index the cached option chain by (expiration, option type, strike in cents) for O(1) contract lookup."""
+    chain = await get_cached_option_chain(session, symbol)
+    return {
+        (exp_date, option.option_type.value, _strike_cents(option.strike_price)): option
+        for exp_date, options in chain.items()
+        for option in options
+    }
+
+
+# Recently resolved contracts keyed by (trading day, spec fields), so repeat orders skip the lookups.
+# The trading day in the key retires entries at the date change; OCC symbology is stable intraday.
+INSTRUMENT_DETAIL_CACHE_SIZE = 4096
+_instrument_detail_cache: dict[tuple, InstrumentDetail] = {}
 
 
-async def get_instrument_details(session: Session, instrument_specs: list[InstrumentSpec]) -> list[InstrumentDetail]:
-    """Get instrument details with validation and caching."""
-    async def lookup_single_instrument(spec: InstrumentSpec) -> InstrumentDetail:
+def _remember_instrument_detail(key: tuple, detail: InstrumentDetail) -> None:
+    """Store a resolved instrument, evicting the least recently used entry when full."""
+    _instrument_detail_cache[key] = detail
+    if len(_instrument_detail_cache) > INSTRUMENT_DETAIL_CACHE_SIZE:
+        del _instrument_detail_cache[next(iter(_instrument_detail_cache))]
+
+
+async def get_instrument_details(
+    session: Session, instrument_specs: Sequence[InstrumentSpec | OrderLeg]
+) -> list[InstrumentDetail]:
+    """Get instrument details with validation and caching. Order legs carry the same lookup fields as specs."""
+    async def lookup_single_instrument(spec: InstrumentSpec | OrderLeg) -> InstrumentDetail:
         symbol = spec.symbol.upper()
         option_type = spec.option_type
         
@@ -1544,25 +1943,82 @@ async def get_instrument_details(session: Session, instrument_specs: list[Instru
             if option_type not in ['C', 'P']:
                 raise ValueError(f"Invalid option_type '{option_type}'. Expected 'C' or 'P'.")
             
-            # Get cached option chain and find specific option
+            # Find the specific option via the prefetched chain index
+            index = chain_indexes[symbol]
+            option = index.get((target_date, option_type, _strike_cents(strike_price)))
+            if option is not None:
+                return InstrumentDetail(option.streamer_symbol, option)
+            
+            # Not found - consult the full chain to build a helpful error
             chain = await get_cached_option_chain(session, symbol)
             if target_date not in chain:
                 available_dates = sorted(chain.keys())
                 raise ValueError(f"No options found for {symbol} expiration {expiration_date}. Available: {available_dates}")
             
-            for option in chain[target_date]:
-                if (option.strike_price == strike_price and
-                    option.option_type.value == option_type):
-                    return InstrumentDetail(option.streamer_symbol, option)
-            
-            available_strikes = [opt.strike_price for opt in chain[target_date] if opt.option_type.value == option_type]
-            raise ValueError(f"Option not found: {symbol} {expiration_date} {option_type} {strike_price}. Available strikes: {sorted(set(available_strikes))}")
+            available_strikes = sorted({opt.strike_price for opt in chain[target_date] if opt.option_type.value == option_type})
+            raise ValueError(f"Option not found: {symbol} {expiration_date} {option_type} {strike_price}. Available strikes: {available_strikes}")
         else:
-            # Get equity instrument
-            instrument = await Equity.a_get(session, symbol)
-            return InstrumentDetail(symbol, instrument)
-    
-    return await asyncio.gather(*[lookup_single_instrument(spec) for spec in instrument_specs])
+            # Get equity instrument from the batched prefetch
+            return InstrumentDetail(symbol, equities[symbol])
+    
+    # Resolve each distinct spec once (callers may repeat a contract), serving recent contracts from the cache
+    trading_day = now_in_new_york().date()
+    spec_keys = [
+        (trading_day, spec.symbol.upper(), spec.option_type, spec.strike_price, spec.expiration_date)
+        for spec in instrument_specs
+    ]
+    details: dict[tuple, InstrumentDetail] = {}
+    unique_specs: dict[tuple, InstrumentSpec | OrderLeg] = {}
+    for key, spec in zip(spec_keys, instrument_specs, strict=True):
+        if key in details or key in unique_specs:
+            continue
+        cached_detail = _instrument_detail_cache.pop(key, None)
+        if cached_detail is not None:
+            _instrument_detail_cache[key] = cached_detail  # Re-insert as most recently used
+            details[key] = cached_detail
+        else:
+            unique_specs[key] = spec
+    if not unique_specs:
+        return [details[key] for key in spec_keys]
+    
+    # Prefetch each distinct underlying's chain index once (multi-leg strategies share an underlying)
+    pending = unique_specs.values()
+    option_symbols = list(dict.fromkeys(spec.symbol.upper() for spec in pending if spec.option_type))
+    chain_indexes = dict(zip(
+        option_symbols,
+        await asyncio.gather(*[get_cached_option_chain_index(session, s) for s in option_symbols]),
+        strict=True
+    ))
+    
+    # Fetch all distinct equities in a single batched lookup (cached per symbol)
+    equity_symbols = list(dict.fromkeys(spec.symbol.upper() for spec in pending if not spec.option_type))
+    equities = await _get_cached_equities(session, equity_symbols) if equity_symbols else {}
+    
+    resolved = await asyncio.gather(*[lookup_single_instrument(spec) for spec in pending])
+    for key, detail in zip(unique_specs, resolved, strict=True):
+        details[key] = detail
+        _remember_instrument_detail(key, detail)
+    return [details[key] for key in spec_keys]
+
+
+# Stock legs only take Buy/Sell; option-style actions map by direction
+_EQUITY_ACTION: dict[str, OrderAction] = {
+    action.value: OrderAction.BUY if action.value.startswith('Buy') else OrderAction.SELL for action in OrderAction
+}
+
+
+def _equity_action(action: str) -> OrderAction:
+    """Resolve a stock leg's action, rejecting anything that isn't a buy or sell."""
+    try:
+        return _EQUITY_ACTION[action]
+    except KeyError:
+        raise ValueError(f"Invalid action '{action}' for stock leg. Expected 'Buy' or 'Sell'.") from None
+
+
+@lru_cache(maxsize=256)
+def _quantity_decimal(quantity: int) -> Decimal:
+    """Convert a leg quantity to Decimal (memoized; strategies reuse a few sizes)."""
+    return Decimal(quantity)
 
 
 def build_order_legs(instrument_details: list[InstrumentDetail], legs: list[OrderLeg]) -> list:
@@ -1571,16 +2027,76 @@ def build_order_legs(instrument_details: list[InstrumentDetail], legs: list[Orde
         raise ValueError(f"Mismatched legs: {len(instrument_details)} instruments vs {len(legs)} leg specs")
     
     built_legs = []
-    for detail, leg_spec in zip(instrument_details, legs, strict=True):
+    for detail, leg_spec in zip(instrument_details, legs, strict=False):  # Lengths checked above
         instrument = detail.instrument
         order_action = (
-            OrderAction(leg_spec.action) if isinstance(instrument, Option)
-            else OrderAction.BUY if leg_spec.action == 'Buy' else OrderAction.SELL
+            OrderAction(leg_spec.action) if isinstance(instrument, Option) else _equity_action(leg_spec.action)
         )
-        built_legs.append(instrument.build_leg(Decimal(str(leg_spec.quantity)), order_action))
+        built_legs.append(instrument.build_leg(_quantity_decimal(leg_spec.quantity), order_action))
     return built_legs
 
 
+def _to_decimal(value: float | Decimal | None) -> Decimal | None:
+    """Convert an optional float price to Decimal via its string form (avoids binary float artifacts)."""
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+class _OrderCategory(IntFlag):
+    """Price requirements of an order type, combined as bit flags."""
+    MARKET = 1
+    LIMIT = 2
+    STOP = 4
+    TRAILING = 8
+    STOP_LIMIT = STOP | LIMIT
+
+
+# Built once at import; TRAILING_STOP is only present in some tastytrade SDK versions
+_ORDER_TYPE_CATEGORY: dict[OrderType, _OrderCategory] = {
+    order_type: category
+    for name, category in (
+        ('MARKET', _OrderCategory.MARKET),
+        ('MARKETABLE_LIMIT', _OrderCategory.MARKET),
+        ('NOTIONAL_MARKET', _OrderCategory.MARKET),
+        ('LIMIT', _OrderCategory.LIMIT),
+        ('STOP', _OrderCategory.STOP),
+        ('STOP_LIMIT', _OrderCategory.STOP_LIMIT),
+        ('TRAILING_STOP', _OrderCategory.TRAILING),
+    )
+    if (order_type := getattr(OrderType, name, None)) is not None
+}
+
+
+def _order_type_key(order_type: str) -> str:
+    """Normalize an order type name so 'StopLimit', 'stop_limit' and 'Stop Limit' compare equal."""
+    return order_type.upper().replace('_', '').replace(' ', '')
+
+
+# Enum lookups built once at import, keyed by both member names and values
+_ORDER_TYPE_BY_KEY: dict[str, OrderType] = {
+    _order_type_key(key): member for member in OrderType for key in (member.name, member.value)
+}
+# Exact spellings (values, names and the tools' CamelCase literals like 'StopLimit') resolve without normalizing
+_ORDER_TYPE_EXACT: dict[str, OrderType] = {
+    key: member for member in OrderType for key in (member.value, member.name, member.value.replace(' ', ''))
+}
+_TIME_IN_FORCE_BY_VALUE: dict[str, OrderTimeInForce] = {member.value: member for member in OrderTimeInForce}
+
+
+def _resolve_order_type(order_type: str) -> OrderType | None:
+    """Resolve an order type string, normalizing only spellings outside the exact table."""
+    order_type_enum = _ORDER_TYPE_EXACT.get(order_type)
+    if order_type_enum is None:
+        order_type_enum = _ORDER_TYPE_BY_KEY.get(_order_type_key(order_type))
+    return order_type_enum
+
+
+def _price_fields(order_type: str) -> _OrderCategory:
+    """Price fields an order type uses; unknown types keep price and stop price, like build_new_order's fallback."""
+    return _ORDER_TYPE_CATEGORY.get(_resolve_order_type(order_type), _OrderCategory.STOP_LIMIT)
+
+
 def build_new_order(
     order_type: str,
     legs: list,
@@ -1605,34 +2121,13 @@ def build_new_order(
     Returns:
         Configured NewOrder object
     """
-    # Convert string order_type to enum, handling different naming conventions
-    order_type_upper = order_type.upper().replace('_', '')
-    order_type_mapping = {
-        'MARKET': 'MARKET',
-        'LIMIT': 'LIMIT',
-        'STOP': 'STOP',
-        'STOPLIMIT': 'STOP_LIMIT',
-        'STOP_LIMIT': 'STOP_LIMIT',
-        'TRAILINGSTOP': 'TRAILING_STOP',
-        'TRAILING_STOP': 'TRAILING_STOP'
-    }
-    
-    enum_name = order_type_mapping.get(order_type_upper)
-    if enum_name is None:
-        # Try to use the order_type string directly as enum value name
-        try:
-            order_type_enum = OrderType[order_type_upper]
-        except (KeyError, AttributeError):
-            # Fall back to using the string directly and let OrderType constructor handle it
-            order_type_enum = OrderType(order_type)
-    else:
-        try:
-            order_type_enum = OrderType[enum_name]
-        except (KeyError, AttributeError):
-            # Fall back to using the string directly
-            order_type_enum = OrderType(order_type)
-    
-    time_in_force_enum = OrderTimeInForce(time_in_force)
+    # Resolve enums from the import-time tables; unknown strings go to the enum constructors for their usual error
+    order_type_enum = _resolve_order_type(order_type)
+    if order_type_enum is None:
+        order_type_enum = OrderType(order_type)
+    time_in_force_enum = _TIME_IN_FORCE_BY_VALUE.get(time_in_force)
+    if time_in_force_enum is None:
+        time_in_force_enum = OrderTimeInForce(time_in_force)
     
     # Build base order kwargs
     order_kwargs = {
@@ -1641,69 +2136,73 @@ def build_new_order(
         "legs": legs
     }
     
-    # Add parameters based on order type (try enum comparison first, then string fallback)
-    order_type_str = str(order_type_enum).upper()
-    if hasattr(order_type_enum, 'value'):
-        order_type_str = str(order_type_enum.value).upper()
-    
-    # Determine order type category using string matching (works regardless of enum naming)
-    is_market = 'MARKET' in order_type_str
-    is_limit_only = 'LIMIT' in order_type_str and 'STOP' not in order_type_str
-    is_stop_limit = 'STOP' in order_type_str and 'LIMIT' in order_type_str
-    is_stop_only = 'STOP' in order_type_str and 'TRAILING' not in order_type_str and 'LIMIT' not in order_type_str
-    is_trailing_stop = 'TRAILING' in order_type_str or 'TRAIL' in order_type_str
-    
-    if is_market:
-        # Market orders don't need price
-        pass
-    elif is_limit_only:
-        if price is None:
-            raise ValueError("price is required for Limit orders")
-        order_kwargs["price"] = price
-    elif is_stop_limit:
-        if price is None:
-            raise ValueError("price is required for StopLimit orders")
-        if stop_price is None:
-            raise ValueError("stop_price is required for StopLimit orders")
-        order_kwargs["price"] = price
-        order_kwargs["stop_price"] = stop_price
-    elif is_stop_only:
-        if stop_price is None:
-            raise ValueError("stop_price is required for Stop orders")
-        order_kwargs["stop_price"] = stop_price
-    elif is_trailing_stop:
-        if trail_price is None and trail_percent is None:
-            raise ValueError("trail_price or trail_percent is required for TrailingStop orders")
-        if trail_price is not None:
-            order_kwargs["trail_price"] = trail_price
-        if trail_percent is not None:
-            order_kwargs["trail_percent"] = trail_percent
-    else:
-        # For unknown order types, try to use price if provided
-        if price is not None:
+    # Attach price fields by category (NewOrder calls the stop price stop_trigger)
+    match _ORDER_TYPE_CATEGORY.get(order_type_enum):
+        case _OrderCategory.MARKET:
+            # Market orders don't need price
+            pass
+        case _OrderCategory.LIMIT:
+            if price is None:
+                raise ValueError("price is required for Limit orders")
             order_kwargs["price"] = price
-        if stop_price is not None:
-            order_kwargs["stop_price"] = stop_price
+        case _OrderCategory.STOP_LIMIT:
+            if price is None:
+                raise ValueError("price is required for StopLimit orders")
+            if stop_price is None:
+                raise ValueError("stop_price is required for StopLimit orders")
+            order_kwargs["price"] = price
+            order_kwargs["stop_trigger"] = stop_price
+        case _OrderCategory.STOP:
+            if stop_price is None:
+                raise ValueError("stop_price is required for Stop orders")
+            order_kwargs["stop_trigger"] = stop_price
+        case _OrderCategory.TRAILING:
+            if trail_price is None and trail_percent is None:
+                raise ValueError("trail_price or trail_percent is required for TrailingStop orders")
+            if trail_price is not None:
+                order_kwargs["trail_price"] = trail_price
+            if trail_percent is not None:
+                order_kwargs["trail_percent"] = trail_percent
+        case _:
+            # For unknown order types, try to use price if provided
+            if price is not None:
+                order_kwargs["price"] = price
+            if stop_price is not None:
+                order_kwargs["stop_trigger"] = stop_price
     
     return NewOrder(**order_kwargs)
 
 
-async def _fetch_quotes_raw(session: Session, instrument_details: list[InstrumentDetail], timeout: float = 10.0) -> list[Any]:
-    """Fetch raw Quote objects for price calculations (internal use)."""
-    return await _stream_events(session, Quote, [d.streamer_symbol for d in instrument_details], timeout)
+async def _fetch_quotes_raw(
+    session: Session,
+    instrument_details: list[InstrumentDetail],
+    timeout: float = 10.0,
+    streamer: DXLinkStreamer | None = None
+) -> list[Any]:
+    """Fetch raw Quote objects for price calculations (internal use), reusing an open streamer when given."""
+    streamer_symbols = [d.streamer_symbol for d in instrument_details]
+    if streamer is not None:
+        return await _collect_events(streamer, Quote, streamer_symbols, timeout)
+    return await _stream_events(session, Quote, streamer_symbols, timeout)
 
 
-async def calculate_net_price(session: Session, instrument_details: list[InstrumentDetail], legs: list[OrderLeg]) -> float:
-    """Calculate net price from current market quotes."""
-    quotes = await _fetch_quotes_raw(session, instrument_details)
-    
+async def calculate_net_price(
+    session: Session,
+    instrument_details: list[InstrumentDetail],
+    legs: list[OrderLeg],
+    streamer: DXLinkStreamer | None = None
+) -> float:
+    """Calculate net price from current market quotes, reusing an open quote streamer when given."""
+    quotes = await _fetch_quotes_raw(session, instrument_details, streamer=streamer)
+
+    if not len(quotes) == len(instrument_details) == len(legs):
+        raise ValueError(f"Mismatched legs: {len(quotes)} quotes, {len(instrument_details)} instruments, {len(legs)} leg specs")
+
+    # Validate and accumulate in one pass; buying pays the mid (debit), selling receives it (credit)
     net_price = 0.0
-    for quote, detail, leg in zip(quotes, instrument_details, legs, strict=True):
-        if quote.bid_price is not None and quote.ask_price is not None:
-            mid_price = float(quote.bid_price + quote.ask_price) / 2
-            leg_price = -mid_price if leg.action.startswith('Buy') else mid_price
-            net_price += leg_price * leg.quantity
-        else:
+    for quote, detail, leg in zip(quotes, instrument_details, legs, strict=False):  # Lengths checked above
+        bid, ask = quote.bid_price, quote.ask_price
+        if bid is None or ask is None:
             inst = detail.instrument
             symbol_info = (
                 f"{inst.underlying_symbol} {inst.option_type.value}{inst.strike_price} {inst.expiration_date}"
@@ -1711,7 +2210,9 @@ async def calculate_net_price(session: Session, instrument_details: list[Instrum
             )
             logger.warning(f"Could not get bid/ask prices for {symbol_info}")
             raise ValueError(f"Could not get bid/ask for {symbol_info}")
-    
+        net_price += float(bid + ask) * leg.signed_quantity
+    net_price /= 2  # Halve once after summing bid+ask
+
     return round(net_price * 100) / 100
 
 
@@ -1736,9 +2237,8 @@ async def monitor_order_fill(session: Session, account: Account, order_id: int,
     start_time = time.time()
     
     while time.time() - start_time < timeout:
-        # Direct API call - no AI
-        live_orders = await account.a_get_live_orders(session)
-        order = next((o for o in live_orders if o.id == order_id), None)
+        # Direct API call - no AI; fetch just this order rather than scanning every live order
+        order = await account.a_get_order(session, order_id)
         
         if order:
             # Check order status
@@ -1890,11 +2390,8 @@ async def place_stop_loss_order(
         )
         
         # Build order leg
-        order_action = (
-            OrderAction(stop_action) if is_option
-            else OrderAction.BUY if stop_action == 'Buy' else OrderAction.SELL
-        )
-        stop_leg = instrument.build_leg(Decimal(str(leg.quantity)), order_action)
+        order_action = OrderAction(stop_action) if is_option else _equity_action(stop_action)
+        stop_leg = instrument.build_leg(_quantity_decimal(leg.quantity), order_action)
         
         # Build stop order using build_new_order to properly handle stop_price
         stop_order = build_new_order(
@@ -1913,6 +2410,8 @@ async def place_stop_loss_order(
             return None
         
         result = await account.a_place_order(session, stop_order, dry_run=dry_run)
+        if not dry_run:
+            invalidate_live_orders_cache(account)
         
         # Check if order was rejected - check model_dump() for status
         result_dict = result.model_dump() if hasattr(result, 'model_dump') else {}
@@ -1932,6 +2431,23 @@ async def place_stop_loss_order(
 # ACCOUNT & POSITION ENDPOINTS
 # =============================================================================
 
+# AccountBalance fields classified once: numeric fields are dropped when zero or None, the rest only when None
+_BALANCE_FIELDS: tuple[tuple[str, bool], ...] = tuple(
+    (name, Decimal in (info.annotation, *get_args(info.annotation)))
+    for name, info in AccountBalance.model_fields.items()
+)
+
+
+def _nonzero_balances(balances: AccountBalance) -> dict[str, Any]:
+    """Collect balance fields that carry information (non-zero amounts, non-None everything else)."""
+    result: dict[str, Any] = {}
+    for name, numeric in _BALANCE_FIELDS:
+        value = getattr(balances, name)
+        if value if numeric else value is not None:
+            result[name] = value
+    return result
+
+
 @app.get("/api/v1/balances")
 async def get_balances(
     session_and_account: tuple[Session, Account] = Depends(get_session_and_account)
@@ -1939,7 +2455,7 @@ async def get_balances(
     """Get account balances and buying power."""
     session, account = session_and_account
     balances = await account.a_get_balances(session)
-    return {k: v for k, v in balances.model_dump().items() if v is not None and v != 0}
+    return _nonzero_balances(balances)
 
 
 @app.get("/api/v1/positions")
@@ -1949,9 +2465,10 @@ async def get_positions(
     """Get all open positions with current values."""
     session, account = session_and_account
     positions = await account.a_get_positions(session, include_marks=True)
+    rows = [pos.model_dump() for pos in positions]
     return {
-        "positions": [pos.model_dump() for pos in positions],
-        "table": to_table(positions)
+        "positions": rows,
+        "table": to_table(positions, dumped=rows)
     }
 
 
@@ -1963,9 +2480,10 @@ async def get_net_liquidating_value_history(
     """Get portfolio value history over time."""
     session, account = session_and_account
     history = await account.a_get_net_liquidating_value_history(session, time_back=time_back)
+    rows = [h.model_dump() for h in history]
     return {
-        "history": [h.model_dump() for h in history],
-        "table": to_table(history)
+        "history": rows,
+        "table": to_table(history, dumped=rows)
     }
 
 
@@ -1985,25 +2503,41 @@ async def get_quotes(
     
     try:
         # Use Claude agent to get quotes
-        agent = get_claude_agent(api_key)
+        agent = await acquire_claude_agent(api_key)
         
         # Build prompt for Claude
         instruments_json = json.dumps([inst.model_dump() for inst in instruments], default=str)
         prompt = f"Get live quotes for these instruments: {instruments_json}. Use the get_quotes tool with timeout={timeout}."
         
-        # Run Claude agent with context manager
-        async with agent:
-            result = await agent.run(prompt)
+        async def run_agent() -> Any:
+            # Run Claude agent with context manager
+            async with agent:
+                return await agent.run(prompt)
+        
+        async def fetch_quotes() -> list[Quote]:
+            # Raw quotes for structured response
+            session = get_valid_session(api_key)
+            instrument_details = await get_instrument_details(session, instruments)
+            return await _stream_events(session, Quote, [d.streamer_symbol for d in instrument_details], timeout)
+        
+        # Run both concurrently so the streamer timeout window is only paid once
+        result, quotes = await asyncio.gather(run_agent(), fetch_quotes(), return_exceptions=True)
+        if isinstance(quotes, BaseException):
+            raise quotes
+        if isinstance(result, BaseException):
+            logger.warning(f"Claude quotes call failed, returning direct quotes: {result}")
+            rows = [q.model_dump() for q in quotes]
+            return {
+                "quotes": rows,
+                "table": to_table(quotes, dumped=rows),
+                "claude_analysis": None,
+                "claude_error": str(result)
+            }
         
         # Extract the table result from Claude's response
         table_result = result.output if hasattr(result, 'output') and result.output is not None else (getattr(result, 'data', None) if hasattr(result, 'data') else str(result))
         claude_analysis = result.output if hasattr(result, 'output') and result.output is not None else None
         
-        # Also get raw quotes for structured response
-        session = get_valid_session(api_key)
-        instrument_details = await get_instrument_details(session, instruments)
-        quotes = await _stream_events(session, Quote, [d.streamer_symbol for d in instrument_details], timeout)
-        
         return {
             "quotes": [q.model_dump() for q in quotes],
             "table": table_result,
@@ -2019,9 +2553,10 @@ async def get_quotes(
             session = get_valid_session(api_key)
             instrument_details = await get_instrument_details(session, instruments)
             quotes = await _stream_events(session, Quote, [d.streamer_symbol for d in instrument_details], timeout)
+            rows = [q.model_dump() for q in quotes]
             return {
-                "quotes": [q.model_dump() for q in quotes],
-                "table": to_table(quotes),
+                "quotes": rows,
+                "table": to_table(quotes, dumped=rows),
                 "claude_analysis": None,
                 "claude_error": str(e)
             }
@@ -2042,23 +2577,24 @@ async def get_greeks(
     
     try:
         # Use Claude agent to get Greeks
-        agent = get_claude_agent(api_key)
+        agent = await acquire_claude_agent(api_key)
         
         # Build prompt for Claude
         options_json = json.dumps([opt.model_dump() for opt in options], default=str)
         prompt = f"Get Greeks for these options: {options_json}. Use the get_greeks tool with timeout={timeout}."
         
-        # Run Claude agent
-        result = await agent.run(prompt)
+        async def fetch_greeks() -> list[Greeks]:
+            # Raw Greeks for structured response
+            session = get_valid_session(api_key)
+            option_details = await get_instrument_details(session, options)
+            return await _stream_events(session, Greeks, [d.streamer_symbol for d in option_details], timeout)
+        
+        # Run Claude agent and the raw Greeks stream concurrently
+        result, greeks = await asyncio.gather(agent.run(prompt), fetch_greeks())
         
         # Extract the table result from Claude's response
         table_result = result.output if hasattr(result, 'output') and result.output is not None else str(result)
         
-        # Also get raw Greeks for structured response
-        session = get_valid_session(api_key)
-        option_details = await get_instrument_details(session, options)
-        greeks = await _stream_events(session, Greeks, [d.streamer_symbol for d in option_details], timeout)
-        
         return {
             "greeks": [g.model_dump() for g in greeks],
             "table": table_result,
@@ -2079,22 +2615,19 @@ async def get_market_metrics(
     """Get market metrics including IV rank, percentile, beta, liquidity for multiple symbols. Uses Claude via MCP tools."""
     try:
         # Use Claude agent to get market metrics
-        agent = get_claude_agent(api_key)
+        agent = await acquire_claude_agent(api_key)
         
         # Build prompt for Claude
         symbols_json = json.dumps(symbols)
         prompt = f"Get market metrics for these symbols: {symbols_json}. Use the get_market_metrics tool."
         
-        # Run Claude agent
-        result = await agent.run(prompt)
+        # Run Claude agent and the raw metrics fetch concurrently
+        session = get_valid_session(api_key)
+        result, metrics = await asyncio.gather(agent.run(prompt), a_get_market_metrics(session, symbols))
         
         # Extract the table result from Claude's response
         table_result = result.output if hasattr(result, 'output') and result.output is not None else str(result)
         
-        # Also get raw metrics for structured response
-        session = get_valid_session(api_key)
-        metrics = await a_get_market_metrics(session, symbols)
-        
         return {
             "metrics": [m.model_dump() for m in metrics],
             "table": table_result,
@@ -2107,12 +2640,24 @@ async def get_market_metrics(
         raise HTTPException(status_code=500, detail=f"Error getting market metrics: {e}") from e
 
 
+def _market_holidays_key_builder(fn, session: Session):
+    """Build cache key from today's date so the calendar is refetched once the day rolls over."""
+    return f"market_holidays:{date.today().isoformat()}"
+
+
+@cached(ttl=3600, cache=Cache.MEMORY, serializer=NullSerializer(), key_builder=_market_holidays_key_builder)
+async def get_cached_market_holidays(session: Session):
+    """Cache the market holiday calendar as it is stable day-over-day."""
+    return await a_get_market_holidays(session)
+
+
 @app.get("/api/v1/market-status")
 async def market_status(
     exchanges: list[Literal['Equity', 'CME', 'CFE', 'Smalls']] | None = None,
+    with_analysis: bool = Query(False, description="Append a Claude market analysis to the response"),
     api_key: str = Depends(verify_api_key)
 ) -> list[dict[str, Any]]:
-    """Get market status for each exchange including current open/closed state. Uses Claude for analysis."""
+    """Get market status for each exchange including current open/closed state. Optionally uses Claude for analysis."""
     if exchanges is None:
         exchanges = ['Equity']
     
@@ -2125,7 +2670,7 @@ async def market_status(
             raise HTTPException(status_code=404, detail="No market sessions found")
         
         current_time = datetime.now(UTC)
-        calendar = await a_get_market_holidays(session)
+        calendar = await get_cached_market_holidays(session)
         is_holiday = current_time.date() in calendar.holidays
         is_half_day = current_time.date() in calendar.half_days
         
@@ -2148,18 +2693,19 @@ async def market_status(
             
             results.append(result)
         
-        # Use Claude for additional analysis/insights
-        try:
-            agent = get_claude_agent(api_key)
-            exchanges_str = ", ".join(exchanges)
-            prompt = f"Analyze the current market status for {exchanges_str} exchanges. Provide insights about trading opportunities and market conditions."
-            claude_result = await agent.run(prompt)
-            # Add Claude analysis to response if available
-            if hasattr(claude_result, 'output') and claude_result.output is not None:
-                results.append({"claude_analysis": claude_result.output})
-        except Exception as e:
-            logger.warning(f"Claude analysis failed for market-status: {e}")
-            # Continue without Claude analysis
+        # Use Claude for additional analysis/insights only when requested
+        if with_analysis:
+            try:
+                agent = await acquire_claude_agent(api_key)
+                exchanges_str = ", ".join(exchanges)
+                prompt = f"Analyze the current market status for {exchanges_str} exchanges. Provide insights about trading opportunities and market conditions."
+                claude_result = await agent.run(prompt)
+                # Add Claude analysis to response if available
+                if hasattr(claude_result, 'output') and claude_result.output is not None:
+                    results.append({"claude_analysis": claude_result.output})
+            except Exception as e:
+                logger.warning(f"Claude analysis failed for market-status: {e}")
+                # Continue without Claude analysis
         
         return results
     except HTTPException:
@@ -2169,20 +2715,29 @@ async def market_status(
         raise HTTPException(status_code=500, detail=f"Error getting market status: {e}") from e
 
 
-def _get_next_open_time(session, current_time: datetime) -> datetime | None:
-    """Determine next market open time based on current status."""
-    if session.status == MarketStatus.PRE_MARKET:
+def _closed_next_open(session, current_time: datetime) -> datetime | None:
+    """Next open for a closed session: today's open if still ahead, else the next session's open."""
+    if session.open_at and current_time < session.open_at:
         return session.open_at
-    if session.status == MarketStatus.CLOSED:
-        if session.open_at and current_time < session.open_at:
-            return session.open_at
-        if session.close_at and current_time > session.close_at and session.next_session:
-            return session.next_session.open_at
-    if session.status == MarketStatus.EXTENDED and session.next_session:
+    if session.close_at and current_time > session.close_at and session.next_session:
         return session.next_session.open_at
     return None
 
 
+# Next-open resolver per market status; statuses not listed (e.g. OPEN) have no next open
+_NEXT_OPEN_BY_STATUS: dict[MarketStatus, Callable[[Any, datetime], datetime | None]] = {
+    MarketStatus.PRE_MARKET: lambda session, _: session.open_at,
+    MarketStatus.CLOSED: _closed_next_open,
+    MarketStatus.EXTENDED: lambda session, _: session.next_session.open_at if session.next_session else None,
+}
+
+
+def _get_next_open_time(session, current_time: datetime) -> datetime | None:
+    """Determine next market open time based on current status."""
+    resolver = _NEXT_OPEN_BY_STATUS.get(session.status)
+    return resolver(session, current_time) if resolver else None
+
+
 @app.get("/api/v1/search-symbols")
 async def search_symbols(
     symbol: str,
@@ -2191,7 +2746,7 @@ async def search_symbols(
     """Search for symbols similar to the given search phrase. Uses Claude via MCP tools."""
     try:
         # Use Claude agent to search symbols
-        agent = get_claude_agent(api_key)
+        agent = await acquire_claude_agent(api_key)
         
         # Build prompt for Claude
         prompt = f"Search for symbols similar to '{symbol}'. Use the search_symbols tool."
@@ -2204,8 +2759,7 @@ async def search_symbols(
         
         # Also get raw results for structured response
         session = get_valid_session(api_key)
-        async with rate_limiter:
-            results = await a_symbol_search(session, symbol)
+        results = await _rate_limited_call(lambda: a_symbol_search(session, symbol))
         
         return {
             "results": [r.model_dump() for r in results],
@@ -2219,16 +2773,78 @@ async def search_symbols(
         raise HTTPException(status_code=500, detail=f"Error searching symbols: {e}") from e
 
 
+def _format_chain_expiration(exp_date: Any, options: list[Option]) -> tuple[str, dict[str, Any], list[dict[str, Any]]]:
+    """
+    Convert one expiration of an option chain into its JSON-ready form.
+    
+    Args:
+        exp_date: Expiration date key from the option chain
+        options: Option contracts for that expiration
+    
+    Returns:
+        Tuple of (expiration date string, grouped calls/puts/strikes data, flat option list)
+    """
+    exp_date_str = exp_date.strftime("%Y-%m-%d") if hasattr(exp_date, 'strftime') else str(exp_date)
+    
+    # Group options by type (C/P) and collect strikes
+    calls = []
+    puts = []
+    strikes = set()
+    
+    for option in options:
+        # Get option type
+        option_type = option.option_type.value if hasattr(option.option_type, 'value') else str(option.option_type)
+        
+        option_data = {
+            "strike_price": float(option.strike_price),
+            "option_type": option_type,
+            "streamer_symbol": option.streamer_symbol,
+            "expiration_date": exp_date_str,
+            "symbol": option.streamer_symbol  # For easy reference
+        }
+        strikes.add(option_data["strike_price"])
+        
+        # Add to calls or puts
+        if option_type == 'C':
+            calls.append(option_data)
+        else:
+            puts.append(option_data)
+    
+    expiration_data = {
+        "calls": sorted(calls, key=lambda x: x["strike_price"]),
+        "puts": sorted(puts, key=lambda x: x["strike_price"]),
+        "strikes": sorted(strikes),
+        "total_options": len(calls) + len(puts)
+    }
+    return exp_date_str, expiration_data, calls + puts
+
+
 @app.get("/api/v1/option-chain")
 async def get_option_chain(
     symbol: str,
+    stream: bool = Query(False, description="Stream the chain as NDJSON, one line per expiration"),
     api_key: str = Depends(verify_api_key)
-) -> dict[str, Any]:
+) -> Any:
     """Get complete option chain for a symbol, returning all available expiration dates, strikes, and option contracts."""
     try:
         session = get_valid_session(api_key)
         chain = await get_cached_option_chain(session, symbol.upper())
         
+        if stream:
+            # Emit a header line, then one line per expiration so the full payload is never held in memory
+            def generate_chain():
+                ordered = sorted(chain.items(), key=lambda item: item[0])
+                expiration_dates = [
+                    exp_date.strftime("%Y-%m-%d") if hasattr(exp_date, 'strftime') else str(exp_date)
+                    for exp_date, _ in ordered
+                ]
+                yield json.dumps({"symbol": symbol.upper(), "expiration_dates": expiration_dates}) + "\n"
+                for exp_date, options in ordered:
+                    exp_date_str, expiration_data, _ = _format_chain_expiration(exp_date, options)
+                    yield json.dumps({"expiration": exp_date_str, "data": expiration_data}) + "\n"
+            
+            return StreamingResponse(generate_chain(), media_type="application/x-ndjson")
+        
         # Convert chain to a structured format
         # chain is a dict: {date: [Option, Option, ...]}
         chain_data = {}
@@ -2236,40 +2852,10 @@ async def get_option_chain(
         all_options = []  # Flat list of all options
         
         for exp_date, options in chain.items():
-            exp_date_str = exp_date.strftime("%Y-%m-%d") if hasattr(exp_date, 'strftime') else str(exp_date)
+            exp_date_str, expiration_data, flat_options = _format_chain_expiration(exp_date, options)
             expiration_dates.append(exp_date_str)
-            
-            # Group options by type (C/P) and collect strikes
-            calls = []
-            puts = []
-            
-            for option in options:
-                # Get option type
-                option_type = option.option_type.value if hasattr(option.option_type, 'value') else str(option.option_type)
-                
-                option_data = {
-                    "strike_price": float(option.strike_price),
-                    "option_type": option_type,
-                    "streamer_symbol": option.streamer_symbol,
-                    "expiration_date": exp_date_str,
-                    "symbol": option.streamer_symbol  # For easy reference
-                }
-                
-                # Add to flat list
-                all_options.append(option_data)
-                
-                # Add to calls or puts
-                if option_type == 'C':
-                    calls.append(option_data)
-                else:
-                    puts.append(option_data)
-            
-            chain_data[exp_date_str] = {
-                "calls": sorted(calls, key=lambda x: x["strike_price"]),
-                "puts": sorted(puts, key=lambda x: x["strike_price"]),
-                "strikes": sorted(set([opt["strike_price"] for opt in calls + puts])),
-                "total_options": len(calls) + len(puts)
-            }
+            chain_data[exp_date_str] = expiration_data
+            all_options.extend(flat_options)
         
         # Build a summary table
         today = date.today()
@@ -2279,7 +2865,7 @@ async def get_option_chain(
         table_lines.append("-" * 60)
         
         for exp_date_str in sorted(expiration_dates):
-            exp_date = datetime.strptime(exp_date_str, "%Y-%m-%d").date()
+            exp_date = date.fromisoformat(exp_date_str)
             dte = (exp_date - today).days
             calls_count = len(chain_data[exp_date_str]["calls"])
             puts_count = len(chain_data[exp_date_str]["puts"])
@@ -2322,15 +2908,16 @@ async def get_transaction_history(
     start = date.today() - timedelta(days=days)
     
     trades = await _paginate(
-        lambda offset: account.a_get_history(
+        lambda page: account.a_get_history(
             session, start_date=start, underlying_symbol=underlying_symbol,
-            type=transaction_type, per_page=250, page_offset=offset
+            type=transaction_type, per_page=250, page_offset=page
         ),
         page_size=250
     )
+    rows = [t.model_dump() for t in trades]
     return {
-        "transactions": [t.model_dump() for t in trades],
-        "table": to_table(trades)
+        "transactions": rows,
+        "table": to_table(trades, dumped=rows)
     }
 
 
@@ -2349,9 +2936,9 @@ async def get_recent_trades(
     
     # Get only trade transactions
     trades = await _paginate(
-        lambda offset: account.a_get_history(
+        lambda page: account.a_get_history(
             session, start_date=start, underlying_symbol=underlying_symbol,
-            type="Trade", per_page=250, page_offset=offset
+            type="Trade", per_page=250, page_offset=page
         ),
         page_size=250
     )
@@ -2514,15 +3101,16 @@ async def get_order_history(
     start = date.today() - timedelta(days=days)
     
     orders = await _paginate(
-        lambda offset: account.a_get_order_history(
+        lambda page: account.a_get_order_history(
             session, start_date=start, underlying_symbol=underlying_symbol,
-            per_page=50, page_offset=offset
+            per_page=50, page_offset=page
         ),
         page_size=50
     )
+    rows = [o.model_dump() for o in orders]
     return {
-        "orders": [o.model_dump() for o in orders],
-        "table": to_table(orders)
+        "orders": rows,
+        "table": to_table(orders, dumped=rows)
     }
 
 
@@ -2530,17 +3118,74 @@ async def get_order_history(
 # TRADING ENDPOINTS
 # =============================================================================
 
+# Short-lived live-orders snapshots per account, so UI polling loops and
+# replace_order lookups reuse one fetch
+LIVE_ORDERS_CACHE_TTL = 1.5
+
+
+@dataclass
+class LiveOrdersSnapshot:
+    """Live orders fetched for an account, indexed by order id."""
+    fetched_at: float  # time.monotonic() at fetch
+    orders_by_id: dict[str, Any]
+    payload: dict[str, Any] | None = None  # /live-orders response, built on first use
+
+
+live_orders_cache: dict[str, LiveOrdersSnapshot] = {}
+_live_orders_locks: dict[str, asyncio.Lock] = {}
+# Bumped per account on invalidation, so a fetch in flight at the time isn't cached over it
+_live_orders_generations: dict[str, int] = {}
+
+
+def invalidate_live_orders_cache(account: Account) -> None:
+    """Drop the cached live orders for an account after an order mutation."""
+    live_orders_cache.pop(account.account_number, None)
+    _live_orders_generations[account.account_number] = _live_orders_generations.get(account.account_number, 0) + 1
+
+
+async def get_live_orders_snapshot(session: Session, account: Account) -> LiveOrdersSnapshot:
+    """
+    Get live orders for an account, refetching only when the cached snapshot is older than the TTL.
+    
+    Args:
+        session: TastyTrade session
+        account: Account object
+    
+    Returns:
+        LiveOrdersSnapshot with orders indexed by str(order.id)
+    """
+    account_number = account.account_number
+    # Serialize refreshes per account so concurrent callers share one fetch
+    lock = _live_orders_locks.setdefault(account_number, asyncio.Lock())
+    async with lock:
+        snapshot = live_orders_cache.get(account_number)
+        if snapshot and time.monotonic() - snapshot.fetched_at < LIVE_ORDERS_CACHE_TTL:
+            return snapshot
+        
+        generation = _live_orders_generations.get(account_number, 0)
+        orders = await account.a_get_live_orders(session)
+        snapshot = LiveOrdersSnapshot(time.monotonic(), {str(o.id): o for o in orders})
+        # An order mutated during the fetch may be missing from it, so only cache a fetch nothing invalidated
+        if _live_orders_generations.get(account_number, 0) == generation:
+            live_orders_cache[account_number] = snapshot
+        return snapshot
+
+
 @app.get("/api/v1/live-orders")
 async def get_live_orders(
     session_and_account: tuple[Session, Account] = Depends(get_session_and_account)
 ) -> dict[str, Any]:
     """Get currently active orders."""
     session, account = session_and_account
-    orders = await account.a_get_live_orders(session)
-    return {
-        "orders": [o.model_dump() for o in orders],
-        "table": to_table(orders)
-    }
+    snapshot = await get_live_orders_snapshot(session, account)
+    if snapshot.payload is None:
+        orders = list(snapshot.orders_by_id.values())
+        rows = [o.model_dump() for o in orders]
+        snapshot.payload = {
+            "orders": rows,
+            "table": to_table(orders, dumped=rows)
+        }
+    return snapshot.payload
 
 
 @app.post("/api/v1/place-order")
@@ -2580,37 +3225,41 @@ async def place_order(
             time_in_force = user_settings.default_time_in_force
         
         session, account = session_and_account
-        # Convert OrderLeg to InstrumentSpec for instrument lookup
-        instrument_specs = [
-            InstrumentSpec(
-                symbol=leg.symbol,
-                option_type=leg.option_type,
-                strike_price=leg.strike_price,
-                expiration_date=leg.expiration_date
-            )
-            for leg in legs
-        ]
-        instrument_details = await get_instrument_details(session, instrument_specs)
-        built_legs = build_order_legs(instrument_details, legs)
         
-        # Convert prices to Decimal
-        price_decimal = Decimal(str(price)) if price is not None else None
-        stop_price_decimal = Decimal(str(stop_price)) if stop_price is not None else None
-        trail_price_decimal = Decimal(str(trail_price)) if trail_price is not None else None
-        trail_percent_decimal = Decimal(str(trail_percent)) if trail_percent is not None else None
+        # Convert only the prices this order type uses (Market orders need none)
+        price_fields = _price_fields(order_type)
+        price_decimal = _to_decimal(price) if price_fields & _OrderCategory.LIMIT else None
+        stop_price_decimal = _to_decimal(stop_price) if price_fields & _OrderCategory.STOP else None
+        trail_price_decimal = _to_decimal(trail_price) if price_fields & _OrderCategory.TRAILING else None
+        trail_percent_decimal = _to_decimal(trail_percent) if price_fields & _OrderCategory.TRAILING else None
         
-        # For Limit and StopLimit orders, calculate price if not provided
+        # Legs expose the same lookup fields as InstrumentSpec, so resolve them directly.
+        # For Limit and StopLimit orders without a price, the net mid-price is calculated from quotes.
         if order_type in ['Limit', 'StopLimit'] and price_decimal is None:
-            try:
-                calculated_price = await calculate_net_price(session, instrument_details, legs)
-                price_decimal = Decimal(str(calculated_price))
-                logger.info(f"Auto-calculated price ${float(price_decimal):.2f} for {len(legs)}-leg {order_type} order")
-            except Exception as e:
-                logger.warning(f"Failed to auto-calculate price for order legs {[leg.symbol for leg in legs]}: {e!s}")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Could not fetch quotes for price calculation: {e!s}. Please provide a price."
-                ) from e
+            async with AsyncExitStack() as stack:
+                # Open the quote streamer while instruments resolve; the handshake doesn't depend on the lookup
+                instrument_details, streamer = await asyncio.gather(
+                    get_instrument_details(session, legs),
+                    stack.enter_async_context(DXLinkStreamer(session)),
+                    return_exceptions=True
+                )
+                if isinstance(instrument_details, BaseException):
+                    raise instrument_details
+                try:
+                    if isinstance(streamer, BaseException):
+                        raise streamer
+                    calculated_price = await calculate_net_price(session, instrument_details, legs, streamer=streamer)
+                except Exception as e:
+                    logger.warning(f"Failed to auto-calculate price for order legs {[leg.symbol for leg in legs]}: {e!s}")
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Could not fetch quotes for price calculation: {e!s}. Please provide a price."
+                    ) from e
+            price_decimal = Decimal(str(calculated_price))
+            logger.info(f"Auto-calculated price ${float(price_decimal):.2f} for {len(legs)}-leg {order_type} order")
+        else:
+            instrument_details = await get_instrument_details(session, legs)
+        built_legs = build_order_legs(instrument_details, legs)
         
         # Build and place the order
         try:
@@ -2628,6 +3277,8 @@ async def place_order(
         
         # Place entry order
         entry_result = await account.a_place_order(session, new_order, dry_run=dry_run)
+        if not dry_run:
+            invalidate_live_orders_cache(account)
         entry_order_data = entry_result.model_dump()
         
         # Initialize response with entry order
@@ -2768,12 +3419,16 @@ async def replace_order(
     async with rate_limiter:
         session, account = session_and_account
         
-        # Get the existing order
-        live_orders = await account.a_get_live_orders(session)
-        existing_order = next((order for order in live_orders if str(order.id) == order_id), None)
+        # Get the existing order from the indexed snapshot; refetch once on a miss in case it is stale
+        snapshot = await get_live_orders_snapshot(session, account)
+        existing_order = snapshot.orders_by_id.get(order_id)
+        if existing_order is None:
+            invalidate_live_orders_cache(account)
+            snapshot = await get_live_orders_snapshot(session, account)
+            existing_order = snapshot.orders_by_id.get(order_id)
         
         if not existing_order:
-            live_order_ids = [str(order.id) for order in live_orders]
+            live_order_ids = list(snapshot.orders_by_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"Order {order_id} not found in live orders. Available orders: {live_order_ids}"
@@ -2787,9 +3442,13 @@ async def replace_order(
                 time_in_force=existing_order.time_in_force,
                 order_type=existing_order.order_type,
                 legs=existing_order.legs,
-                price=Decimal(str(price))
+                price=Decimal(str(price)),
+                # Carry over the trigger and GTD date so stop and GTD orders keep their terms
+                stop_trigger=Decimal(existing_order.stop_trigger) if existing_order.stop_trigger else None,
+                gtc_date=existing_order.gtc_date
             )
         )
+        invalidate_live_orders_cache(account)
         return result.model_dump()
 
 
@@ -2801,6 +3460,7 @@ async def delete_order(
     """Cancel an existing order."""
     session, account = session_and_account
     await account.a_delete_order(session, int(order_id))
+    invalidate_live_orders_cache(account)
     return {"success": True, "order_id": order_id}
 
 
@@ -2808,33 +3468,88 @@ async def delete_order(
 # WATCHLIST ENDPOINTS
 # =============================================================================
 
+# Maximum concurrent Claude calls when analyzing several watchlists
+WATCHLIST_ANALYSIS_CONCURRENCY = 4
+
+
+def _agent_output_text(result: Any) -> str:
+    """Extract the text output from an agent run result."""
+    return result.output if hasattr(result, 'output') and result.output is not None else str(result)
+
+
+@lru_cache(maxsize=2)
+def _watchlist_list_adapter(watchlist_class: type) -> TypeAdapter:
+    """Build (once per watchlist class) the adapter used to dump a list of watchlists to JSON."""
+    return TypeAdapter(list[watchlist_class])
+
+
 @app.get("/api/v1/watchlists")
 async def get_watchlists(
     watchlist_type: Literal['public', 'private'] = 'private',
     name: str | None = None,
+    per_watchlist: bool = False,
     api_key: str = Depends(verify_api_key)
 ) -> dict[str, Any]:
-    """Get watchlists for market insights and tracking. Uses Claude for analysis."""
+    """Get watchlists for market insights and tracking. Uses Claude for analysis.
+    
+    Args:
+        watchlist_type: 'public' or 'private' watchlists
+        name: Only return the watchlist with this name
+        per_watchlist: Analyze each watchlist in its own Claude call (one call per watchlist)
+            instead of a single analysis of all of them
+    """
     try:
         # Get raw watchlist data
         session = get_valid_session(api_key)
         watchlist_class = PublicWatchlist if watchlist_type == 'public' else PrivateWatchlist
         
         if name:
-            watchlists = [(await watchlist_class.a_get(session, name)).model_dump()]
+            watchlist_objects = [await watchlist_class.a_get(session, name)]
         else:
-            watchlists = [w.model_dump() for w in await watchlist_class.a_get(session)]
+            watchlist_objects = await watchlist_class.a_get(session)
+        
+        # Serialize once: the JSON bytes feed the prompt and, decoded, the response payload
+        # (watchlist fields are all JSON-native, so this matches model_dump()).
+        watchlists_raw = _watchlist_list_adapter(watchlist_class).dump_json(watchlist_objects)
+        watchlists_json = watchlists_raw.decode()
+        watchlists = orjson.loads(watchlists_raw) if orjson is not None else json.loads(watchlists_raw)
         
         # Use Claude for analysis
         try:
-            agent = get_claude_agent(api_key)
-            watchlists_json = json.dumps(watchlists, default=str)
-            prompt = f"Analyze these {watchlist_type} watchlists: {watchlists_json}. Use the get_watchlists tool and provide insights about the symbols, trends, and potential trading opportunities."
-            claude_result = await agent.run(prompt)
+            agent = await acquire_claude_agent(api_key)
+            if not per_watchlist or len(watchlists) <= 1:
+                prompt = f"Analyze these {watchlist_type} watchlists: {watchlists_json}. Use the get_watchlists tool and provide insights about the symbols, trends, and potential trading opportunities."
+                claude_result = await agent.run(prompt)
+                
+                return {
+                    "watchlists": watchlists,
+                    "claude_analysis": _agent_output_text(claude_result)
+                }
+            
+            # Per-watchlist analysis requested: analyze each one concurrently (capped) instead of as one blob
+            semaphore = asyncio.Semaphore(WATCHLIST_ANALYSIS_CONCURRENCY)
+            
+            async def analyze(watchlist: dict[str, Any]) -> str:
+                # Re-encode the already-serialized entry rather than dumping the model again
+                watchlist_json = orjson.dumps(watchlist).decode() if orjson is not None else json.dumps(watchlist)
+                async with semaphore:
+                    prompt = f"Analyze this {watchlist_type} watchlist: {watchlist_json}. Provide insights about the symbols, trends, and potential trading opportunities."
+                    return _agent_output_text(await agent.run(prompt))
+            
+            results = await asyncio.gather(*(analyze(w) for w in watchlists), return_exceptions=True)
+            analyses: dict[str, str] = {}
+            for watchlist, result in zip(watchlists, results, strict=True):
+                if isinstance(result, BaseException):
+                    logger.warning(f"Claude analysis failed for watchlist '{watchlist['name']}': {result}")
+                    continue
+                analyses[watchlist['name']] = result
+            if not analyses:
+                return {"watchlists": watchlists}
             
             return {
                 "watchlists": watchlists,
-                "claude_analysis": claude_result.output if hasattr(claude_result, 'output') and claude_result.output is not None else str(claude_result)
+                "watchlist_analyses": analyses,
+                "claude_analysis": "\n\n".join(f"## {wl_name}\n{text}" for wl_name, text in analyses.items())
             }
         except Exception as e:
             logger.warning(f"Claude analysis failed for watchlists: {e}")
@@ -2846,6 +3561,12 @@ async def get_watchlists(
         raise HTTPException(status_code=500, detail=f"Error getting watchlists: {e}") from e
 
 
+@lru_cache(maxsize=16)
+def _instrument_type(value: str) -> InstrumentType:
+    """Resolve an instrument type string to its enum member (memoized; only a handful exist)."""
+    return InstrumentType(value)
+
+
 @app.post("/api/v1/watchlists/private/manage")
 async def manage_private_watchlist(
     action: Literal["add", "remove"],
@@ -2861,10 +3582,10 @@ async def manage_private_watchlist(
     if action == "add":
         try:
             watchlist = await PrivateWatchlist.a_get(session, name)
-            for symbol_spec in symbols:
-                symbol = symbol_spec.symbol
-                instrument_type = InstrumentType(symbol_spec.instrument_type)
-                watchlist.add_symbol(symbol, instrument_type)
+            # Bulk-append entries in the same shape PrivateWatchlist.add_symbol uses
+            watchlist.watchlist_entries = (watchlist.watchlist_entries or []) + [
+                {"symbol": s.symbol, "instrument-type": _instrument_type(s.instrument_type)} for s in symbols
+            ]
             await watchlist.a_update(session)
             logger.info(f"Added {len(symbols)} symbols to existing watchlist '{name}'")
             return {"success": True, "action": "add", "watchlist": name, "symbols_count": len(symbols)}
@@ -2882,10 +3603,16 @@ async def manage_private_watchlist(
     else:
         try:
             watchlist = await PrivateWatchlist.a_get(session, name)
-            for symbol_spec in symbols:
-                symbol = symbol_spec.symbol
-                instrument_type = InstrumentType(symbol_spec.instrument_type)
-                watchlist.remove_symbol(symbol, instrument_type)
+            # Filter entries in one pass instead of a list.remove() scan per symbol
+            to_remove = {(s.symbol, _instrument_type(s.instrument_type).value) for s in symbols}
+            entries = watchlist.watchlist_entries or []
+            present = {(e["symbol"], _instrument_type(e["instrument-type"]).value) for e in entries}
+            missing = to_remove - present
+            if missing:
+                raise ValueError(f"Symbols not in watchlist: {sorted(missing)}")
+            watchlist.watchlist_entries = [
+                e for e in entries if (e["symbol"], _instrument_type(e["instrument-type"]).value) not in to_remove
+            ]
             await watchlist.a_update(session)
             logger.info(f"Removed {len(symbols)} symbols from watchlist '{name}'")
             return {"success": True, "action": "remove", "watchlist": name, "symbols_count": len(symbols)}
@@ -3031,7 +3758,8 @@ async def add_or_update_credentials(
     
     # Save to database
     try:
-        credentials_db.insert_or_update_credentials(
+        await asyncio.to_thread(
+            credentials_db.insert_or_update_credentials,
             credential.api_key,
             credential.client_secret,
             credential.refresh_token
@@ -3043,8 +3771,8 @@ async def add_or_update_credentials(
             detail=f"Failed to save credentials: {e}"
         ) from e
     
-    # Reload credentials in memory
-    api_key_credentials = load_credentials()
+    # Update in-memory credentials directly (authoritative copy; no full reload)
+    api_key_credentials[credential.api_key] = (credential.client_secret, credential.refresh_token)
     
     # Clear any existing session for this API key to force re-authentication
     if credential.api_key in api_key_sessions:
@@ -3072,28 +3800,14 @@ async def list_credentials(
     api_key: str = Depends(verify_api_key)
 ) -> dict[str, Any]:
     """List all configured API keys (without sensitive data). Requires authentication."""
-    global credentials_db
+    # api_key_credentials is the authoritative copy: it is loaded from the database at
+    # startup and updated in place by every credential mutation, so no DB read is needed
+    api_keys = [{"api_key": key, "configured": True} for key in sorted(api_key_credentials)]
     
-    if not credentials_db:
-        raise HTTPException(
-            status_code=500,
-            detail="Database not initialized"
-        )
-    
-    try:
-        api_key_list = credentials_db.list_api_keys()
-        api_keys = [{"api_key": key, "configured": True} for key in api_key_list]
-        
-        return {
-            "api_keys": api_keys,
-            "count": len(api_keys)
-        }
-    except Exception as e:
-        logger.error(f"Failed to list credentials: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to list credentials: {e}"
-        ) from e
+    return {
+        "api_keys": api_keys,
+        "count": len(api_keys)
+    }
 
 
 @app.delete("/api/v1/credentials/{api_key}")
@@ -3109,7 +3823,7 @@ async def delete_credentials(api_key: str) -> dict[str, Any]:
     
     # Delete from database
     try:
-        deleted = credentials_db.delete_credentials(api_key)
+        deleted = await asyncio.to_thread(credentials_db.delete_credentials, api_key)
         if not deleted:
             raise HTTPException(
                 status_code=404,
@@ -3124,8 +3838,8 @@ async def delete_credentials(api_key: str) -> dict[str, Any]:
             detail=f"Failed to delete credentials: {e}"
         ) from e
     
-    # Reload credentials in memory
-    api_key_credentials = load_credentials()
+    # Update in-memory credentials directly (authoritative copy; no full reload)
+    api_key_credentials.pop(api_key, None)
     
     # Clear any existing session for this API key
     if api_key in api_key_sessions:
@@ -3245,35 +3959,62 @@ def format_message_with_images(text: str, images: list[str] | None) -> str | lis
     return content_items
 
 
+_SSE_DATA = b"data: "
+_SSE_END = b"\n\n"
+
+
+def _sse(payload: dict[str, Any]) -> bytes:
+    """Encode a payload as a Server-Sent Events data frame (orjson when available).
+
+    Frames are returned as bytes so StreamingResponse writes them without re-encoding.
+    """
+    body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode()
+    return _SSE_DATA + body + _SSE_END
+
+
+# Constant status frames, encoded once at import time
+_SSE_PROCESSING = _sse({'type': 'status', 'content': 'Processing request...'})
+_SSE_ANALYZING = _sse({'type': 'status', 'content': 'Analyzing market data and preparing response...'})
+
+
+def _text_delta(event: Any) -> str | None:
+    """Extract streamed text from a model response event, if it carries any."""
+    if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart):
+        return event.part.content
+    if isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
+        return event.delta.content_delta
+    return None
+
+
 @app.post("/api/v1/chat/stream", include_in_schema=True)
 async def chat_stream(
     request: ChatRequest,
     api_key: str = Depends(verify_api_key)
 ):
     """Stream chat responses from the Claude agent using Server-Sent Events (SSE)."""
-    async def generate_stream():
+    async def generate_stream() -> AsyncIterator[bytes]:
         try:
             try:
                 # Get account_id from request, if provided
                 account_id = request.account_id
-                agent = get_claude_agent(api_key, account_id=account_id)
+                agent = await acquire_claude_agent(api_key, account_id=account_id)
             except HTTPException as http_err:
                 error_data = _serialize_error(http_err)
                 try:
-                    yield f"data: {json.dumps(error_data)}\n\n"
+                    yield _sse(error_data)
                 except (TypeError, ValueError) as json_err:
                     logger.error(f"Failed to serialize error: {json_err}")
-                    yield f"data: {json.dumps({'type': 'error', 'error': 'Failed to initialize AI agent', 'error_type': type(http_err).__name__})}\n\n"
+                    yield _sse({'type': 'error', 'error': 'Failed to initialize AI agent', 'error_type': type(http_err).__name__})
                 return
             except Exception as agent_err:
                 logger.error(f"Failed to get/create agent for API key {api_key[:8]}...: {agent_err}", exc_info=True)
                 error_data = _serialize_error(agent_err)
                 error_data["error"] = f"Failed to initialize AI agent: {error_data['error']}"
                 try:
-                    yield f"data: {json.dumps(error_data)}\n\n"
+                    yield _sse(error_data)
                 except (TypeError, ValueError) as json_err:
                     logger.error(f"Failed to serialize error: {json_err}")
-                    yield f"data: {json.dumps({'type': 'error', 'error': 'Failed to initialize AI agent', 'error_type': type(agent_err).__name__})}\n\n"
+                    yield _sse({'type': 'error', 'error': 'Failed to initialize AI agent', 'error_type': type(agent_err).__name__})
                 return
             
             # Get conversation history - prefer message_history from request, otherwise use tabId history
@@ -3295,18 +4036,14 @@ async def chat_stream(
                     logger.info(f"Extracted symbol '{current_symbol}' from tab_id: {request.tab_id}")
             
             # Build user message with history context and images
-            user_message = request.message
+            context: str | None = None
             if conversation_history:
-                context_parts = []
-                for msg in conversation_history:
-                    context_parts.append(f"{'User' if msg.role == 'user' else 'Assistant'}: {msg.content}")
-                context = "\n".join(context_parts)
-                user_message = f"Previous conversation:\n{context}\n\nCurrent question: {request.message}"
-            
-            # Add symbol context at the beginning if available (highly visible)
-            if current_symbol:
-                symbol_context = f"Current symbol context: {current_symbol}\n\n"
-                user_message = symbol_context + user_message
+                if request.message_history:
+                    context = "\n".join(format_history_line(msg) for msg in conversation_history)
+                else:
+                    context = get_conversation_transcript(api_key, request.tab_id)
+            # Symbol context goes first (highly visible), then history, then the question
+            user_message = build_user_message(request.message, context, current_symbol)
             
             # Format message content with images if provided
             message_content = format_message_with_images(user_message, request.images)
@@ -3319,19 +4056,27 @@ async def chat_stream(
             logger.info(f"Starting streaming Claude agent run for message: {message_preview[:100]}...")
             
             # Send initial "thinking" event for immediate feedback
-            yield f"data: {json.dumps({'type': 'status', 'content': 'Processing request...'})}\n\n"
+            yield _SSE_PROCESSING
             
             try:
                 async with agent:
                     # Send "analyzing" status
-                    yield f"data: {json.dumps({'type': 'status', 'content': 'Analyzing market data and preparing response...'})}\n\n"
+                    yield _SSE_ANALYZING
                     
-                    # Run the agent with message (supports both string and list with BinaryContent)
+                    # Run the agent with message (supports both string and list with BinaryContent),
+                    # forwarding text deltas from each model response as they arrive
                     start_time = asyncio.get_event_loop().time()
-                    result = await asyncio.wait_for(
-                        agent.run(message_content),
-                        timeout=90.0
-                    )
+                    async with asyncio.timeout(90.0):
+                        async with agent.iter(message_content) as agent_run:
+                            async for node in agent_run:
+                                if not Agent.is_model_request_node(node):
+                                    continue
+                                async with node.stream(agent_run.ctx) as request_stream:
+                                    async for event in request_stream:
+                                        text = _text_delta(event)
+                                        if text:
+                                            yield _sse({'type': 'text', 'content': text})
+                    result = agent_run.result
                     elapsed_time = asyncio.get_event_loop().time() - start_time
                     logger.info(f"Agent completed in {elapsed_time:.2f}s")
                     
@@ -3372,16 +4117,8 @@ async def chat_stream(
                         except Exception as save_err:
                             logger.warning(f"Failed to save conversation messages for tab_id={request.tab_id}: {save_err}")
                     
-                    # Stream the response in chunks for better UX
-                    # Use larger chunks for faster transmission, no artificial delay
-                    chunk_size = 100  # Larger chunks for faster streaming
-                    for i in range(0, len(response_text), chunk_size):
-                        chunk = response_text[i:i + chunk_size]
-                        yield f"data: {json.dumps({'type': 'text', 'content': chunk})}\n\n"
-                        # No artificial delay - stream as fast as possible
-                    
                     # Send done event with timing info
-                    yield f"data: {json.dumps({'type': 'done', 'elapsed_time': f'{elapsed_time:.2f}s'})}\n\n"
+                    yield _sse({'type': 'done', 'elapsed_time': f'{elapsed_time:.2f}s'})
                         
             except asyncio.TimeoutError:
                 logger.error("Claude agent timed out")
@@ -3392,10 +4129,10 @@ async def chat_stream(
                     "timestamp": datetime.now(UTC).isoformat(),
                 }
                 try:
-                    yield f"data: {json.dumps(timeout_error)}\n\n"
+                    yield _sse(timeout_error)
                 except (TypeError, ValueError) as json_err:
                     logger.error(f"Failed to serialize timeout error: {json_err}")
-                    yield f"data: {json.dumps({'type': 'error', 'error': 'Request timed out'})}\n\n"
+                    yield _sse({'type': 'error', 'error': 'Request timed out'})
             except Exception as e:
                 error_msg = str(e)
                 # Provide more helpful error messages for common issues
@@ -3413,19 +4150,19 @@ async def chat_stream(
                     error_data = _serialize_error(e)
                 
                 try:
-                    yield f"data: {json.dumps(error_data)}\n\n"
+                    yield _sse(error_data)
                 except (TypeError, ValueError) as json_err:
                     logger.error(f"Failed to serialize error: {json_err}")
-                    yield f"data: {json.dumps({'type': 'error', 'error': 'An error occurred while processing your request', 'error_type': type(e).__name__})}\n\n"
+                    yield _sse({'type': 'error', 'error': 'An error occurred while processing your request', 'error_type': type(e).__name__})
         except Exception as e:
             logger.error(f"Error in chat stream endpoint: {e}", exc_info=True)
             error_data = _serialize_error(e)
             error_data["error"] = f"Error processing chat message: {error_data['error']}"
             try:
-                yield f"data: {json.dumps(error_data)}\n\n"
+                yield _sse(error_data)
             except (TypeError, ValueError) as json_err:
                 logger.error(f"Failed to serialize outer error: {json_err}")
-                yield f"data: {json.dumps({'type': 'error', 'error': 'Error processing chat message', 'error_type': type(e).__name__})}\n\n"
+                yield _sse({'type': 'error', 'error': 'Error processing chat message', 'error_type': type(e).__name__})
     
     return StreamingResponse(
         generate_stream(),
@@ -3438,17 +4175,17 @@ async def chat_stream(
     )
 
 
-@app.post("/api/v1/chat", response_model=ChatResponse)
+@app.post("/api/v1/chat", response_model=None, responses={200: {"model": ChatResponse}})
 async def chat(
     request: ChatRequest,
     api_key: str = Depends(verify_api_key)
-) -> ChatResponse:
+) -> dict[str, Any]:
     """Chat with the Claude agent. Supports conversation history for context."""
     try:
         try:
             # Get account_id from request, if provided
             account_id = request.account_id
-            agent = get_claude_agent(api_key, account_id=account_id)
+            agent = await acquire_claude_agent(api_key, account_id=account_id)
         except HTTPException as http_err:
             # Re-raise HTTP exceptions (like invalid credentials)
             raise http_err
@@ -3479,19 +4216,15 @@ async def chat(
                 logger.info(f"Extracted symbol '{current_symbol}' from tab_id: {request.tab_id}")
         
         # Build user message with history context
-        user_message = request.message
+        context: str | None = None
         if conversation_history:
-            # Build context from history
-            context_parts = []
-            for msg in conversation_history:
-                context_parts.append(f"{'User' if msg.role == 'user' else 'Assistant'}: {msg.content}")
-            context = "\n".join(context_parts)
-            user_message = f"Previous conversation:\n{context}\n\nCurrent question: {request.message}"
-        
-        # Add symbol context at the beginning if available (highly visible)
-        if current_symbol:
-            symbol_context = f"Current symbol context: {current_symbol}\n\n"
-            user_message = symbol_context + user_message
+            # Build context from history (stored tabs keep preformatted transcript lines)
+            if request.message_history:
+                context = "\n".join(format_history_line(msg) for msg in conversation_history)
+            else:
+                context = get_conversation_transcript(api_key, request.tab_id)
+        # Symbol context goes first (highly visible), then history, then the question
+        user_message = build_user_message(request.message, context, current_symbol)
         
         # Format message content with images if provided
         message_content = format_message_with_images(user_message, request.images)
@@ -3566,15 +4299,15 @@ async def chat(
             except Exception as save_err:
                 logger.warning(f"Failed to save conversation messages for tab_id={request.tab_id}: {save_err}")
         
-        # Build updated history for response
-        updated_history = conversation_history.copy()
-        updated_history.append(ChatMessage(role="user", content=request.message))
-        updated_history.append(ChatMessage(role="assistant", content=response_text))
+        # Build updated history for response as plain dicts (ChatResponse documents the schema)
+        updated_history = [{"role": msg.role, "content": msg.content} for msg in conversation_history]
+        updated_history.append({"role": "user", "content": request.message})
+        updated_history.append({"role": "assistant", "content": response_text})
         
-        return ChatResponse(
-            response=response_text,
-            message_history=updated_history
-        )
+        return {
+            "response": response_text,
+            "message_history": updated_history
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -3619,7 +4352,8 @@ async def create_or_update_settings(
     
     # Save to memory and file
     api_key_settings[api_key] = new_settings
-    save_settings(api_key_settings)
+    # Write from a worker thread on a snapshot so the file I/O never stalls the event loop
+    await asyncio.to_thread(save_settings, dict(api_key_settings))
     
     logger.info(f"Updated settings for API key {api_key[:8]}...")
     return new_settings
@@ -3920,6 +4654,13 @@ def main():
     logger.info("Set API_KEY environment variable to secure the server")
     logger.info("Set CORS_ORIGINS environment variable to restrict CORS (comma-separated)")
     
+    # Prefer the C-backed event loop and HTTP parser shipped with uvicorn[standard];
+    # uvloop has no Windows build, so fall back to asyncio/h11 when they're missing
+    from importlib.util import find_spec
+    loop = "uvloop" if find_spec("uvloop") is not None else "asyncio"
+    http = "httptools" if find_spec("httptools") is not None else "h11"
+    logger.info(f"Using {loop} event loop with {http} HTTP parser")
+    
     # When running directly, pass the app object directly to avoid import issues
     # When run as a module, uvicorn can use the string path for reload support
     if __name__ == "__main__":
@@ -3928,6 +4669,8 @@ def main():
             host=host,
             port=port,
             reload=False,  # Reload not supported when passing app object directly
+            loop=loop,
+            http=http,
             log_level="info"
         )
     else:
@@ -3936,6 +4679,8 @@ def main():
             host=host,
             port=port,
             reload=os.getenv("RELOAD", "false").lower() == "true",
+            loop=loop,
+            http=http,
             log_level="info"
         )
 
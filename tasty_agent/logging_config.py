@@ -2,20 +2,73 @@
 Logging Configuration for TastyAgent Services
 Sets up separate log files for each service in the tasty-agent flow
 """
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
+import threading
+import time
 from pathlib import Path
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
 # ET timezone for market hours
-ET = pytz.timezone("America/New_York")
+ET = ZoneInfo("America/New_York")
 
 # Base logs directory (relative to project root)
 LOGS_DIR = Path(__file__).parent.parent / "Logs"
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+# File writes are buffered in memory and flushed in batches: when the buffer fills,
+# on any ERROR/CRITICAL record (so crash context always reaches disk), every
+# FLUSH_INTERVAL seconds from a background thread, and at interpreter exit
+BUFFER_CAPACITY = 512
+FLUSH_INTERVAL = 1.0
+
+_buffered_handlers: list[logging.handlers.MemoryHandler] = []
+_flush_thread: threading.Thread | None = None
+_flush_lock = threading.Lock()
+
+
+def flush_buffered_handlers() -> None:
+    """Flush all buffered file handlers to disk"""
+    for handler in list(_buffered_handlers):
+        handler.flush()
+
+
+def _flush_periodically() -> None:
+    """Background loop that flushes buffered handlers every FLUSH_INTERVAL seconds"""
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush_buffered_handlers()
+
+
+def _register_buffered_handler(handler: logging.handlers.MemoryHandler) -> None:
+    """Track a buffered handler and start the shared periodic flusher on first use"""
+    global _flush_thread
+    with _flush_lock:
+        _buffered_handlers.append(handler)
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(target=_flush_periodically, name="log-flusher", daemon=True)
+            _flush_thread.start()
+            atexit.register(flush_buffered_handlers)
+
+
+# Each service logger only enqueues records; a QueueListener thread per service does
+# the actual formatting and file/console writes off the caller's (event loop) thread
+_listeners: dict[str, logging.handlers.QueueListener] = {}
+
+# Service names whose loggers have been set up (duplicate-setup guard)
+_configured_services: set[str] = set()
+
+
+def stop_log_listeners() -> None:
+    """Stop all queue listeners, draining any records still queued"""
+    while _listeners:
+        _, listener = _listeners.popitem()
+        listener.stop()
+
 
 def get_log_filename(service_name: str) -> Path:
     """
@@ -27,8 +80,23 @@ def get_log_filename(service_name: str) -> Path:
     Returns:
         Path to the log file (e.g., Logs/server_2025-01-15.log)
     """
-    today = datetime.now(ET).strftime("%Y-%m-%d")
-    return LOGS_DIR / f"{service_name}_{today}.log"
+    return LOGS_DIR / f"{service_name}_{_today_et()}.log"
+
+
+# Formatted ET date, reused until the next ET midnight (a time.time() timestamp)
+_cached_date: str | None = None
+_date_expires: float = 0.0
+
+
+def _today_et() -> str:
+    """Return today's ET date as YYYY-MM-DD, recomputing only after ET midnight"""
+    global _cached_date, _date_expires
+    if _cached_date is None or time.time() >= _date_expires:
+        now = datetime.now(ET)
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=ET)
+        _cached_date = now.strftime("%Y-%m-%d")
+        _date_expires = next_midnight.timestamp()
+    return _cached_date
 
 
 def setup_service_logger(
@@ -49,14 +117,13 @@ def setup_service_logger(
     Returns:
         Configured logger instance
     """
+    # Already configured: skip handler setup (and the logger's handler list) entirely
+    if service_name in _configured_services:
+        return logging.getLogger(service_name)
+    
     logger = logging.getLogger(service_name)
     logger.setLevel(log_level)
     
-    # Check if file handler already exists (to avoid duplicates)
-    has_file_handler = any(isinstance(h, logging.handlers.RotatingFileHandler) for h in logger.handlers)
-    if has_file_handler:
-        return logger
-    
     # Create formatter with timestamp, level, and message
     formatter = logging.Formatter(
         fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
@@ -74,14 +141,34 @@ def setup_service_logger(
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
     
-    # Add handler to logger
-    logger.addHandler(file_handler)
+    # Buffer file writes so many records coalesce into one write
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+    buffered_handler.setLevel(log_level)
+    
+    _register_buffered_handler(buffered_handler)
     
     # Also add console handler for immediate visibility
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    
+    # Logging calls only enqueue; the listener thread writes to file and console
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, buffered_handler, console_handler, respect_handler_level=True
+    )
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    with _flush_lock:
+        if not _listeners:
+            atexit.register(stop_log_listeners)
+        _listeners[service_name] = listener
+        _configured_services.add(service_name)
+    listener.start()
     
     logger.info(f"Logger initialized for {service_name} - Logging to {log_file}")
     
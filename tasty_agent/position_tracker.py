@@ -4,6 +4,7 @@ import logging
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from decimal import Decimal
+from functools import cache
 from typing import Any
 
 from tastytrade import Account, Session
@@ -22,6 +23,17 @@ from tasty_agent.utils.session import is_sandbox_mode
 logger = logging.getLogger(__name__)
 
 
+@cache
+def _instrument_api() -> tuple[Any, Any]:
+    """Resolve InstrumentSpec and get_instrument_details from the HTTP server once.
+    
+    Imported lazily so loading this module doesn't pull in the whole FastAPI app
+    (and can't form an import cycle if the server imports the tracker).
+    """
+    from tasty_agent.http_server import InstrumentSpec, get_instrument_details
+    return InstrumentSpec, get_instrument_details
+
+
 @dataclass
 class TrackedPosition:
     """Data class for tracking a position."""
@@ -36,19 +48,62 @@ class TrackedPosition:
     position_direction: str  # 'long' or 'short'
     current_stop_order_id: int | None = None
     current_stop_price: float | None = None
+    current_stop_price_cents: int | None = None  # current_stop_price quantized to cents
     last_vwap: float | None = None
     last_support: float | None = None
     last_resistance: float | None = None
     breakout_detected: bool = False
-    _monitor_task: asyncio.Task | None = field(default=None, init=False, repr=False)
+    _session: Session | None = field(default=None, init=False, repr=False)
+    _account: Account | None = field(default=None, init=False, repr=False)
+    # The contract, closing action, and size never change for a position, so resolve them once
+    _cached_instrument: Any | None = field(default=None, init=False, repr=False)
+    _close_action: OrderAction | None = field(default=None, init=False, repr=False)
+    _close_quantity: Decimal | None = field(default=None, init=False, repr=False)
+    _stop_order_template: NewOrder | None = field(default=None, init=False, repr=False)
+    # Adaptive polling: seconds between checks and the loop time of the next one
+    _poll_interval: float = field(default=10.0, init=False, repr=False)
+    _next_poll: float = field(default=0.0, init=False, repr=False)
+
+
+# Dummy volume for the flat fallback candles; only ratios matter for VWAP
+_FALLBACK_VOLUMES = [1000] * 10
+
+
+def _flat_candles(price: float) -> dict[str, list[float]]:
+    """Build ten flat OHLCV candles at one price, in the dict format the TA helpers accept."""
+    prices = [price] * len(_FALLBACK_VOLUMES)
+    return {'OPEN': prices, 'HIGH': prices, 'LOW': prices, 'CLOSE': prices, 'VOLUME': _FALLBACK_VOLUMES}
+
+
+def resolve_close_action(position: TrackedPosition) -> OrderAction:
+    """Determine the OrderAction that closes a position (used for its stop orders).
+    
+    Option legs close with Sell/Buy to Close; equity legs with a plain Sell/Buy.
+    Long positions are closed by selling, short positions by buying.
+    """
+    is_option = getattr(position.legs[0], 'option_type', None) is not None
+    if position.position_direction == 'long':
+        return OrderAction.SELL_TO_CLOSE if is_option else OrderAction.SELL
+    return OrderAction.BUY_TO_CLOSE if is_option else OrderAction.BUY
 
 
 class PositionTracker:
-    """Manages background tracking tasks for positions."""
+    """Manages background tracking for positions with a single shared polling tick."""
+    
+    POLLING_INTERVAL = 10  # Default seconds between checks of a position
+    MIN_POLLING_INTERVAL = 2  # When price is within ~0.2% of the stop
+    MAX_POLLING_INTERVAL = 60  # When price is far from the stop
+    CANDLE_COUNT = 10
     
     def __init__(self):
-        self._tracked_positions: dict[str, TrackedPosition] = {}  # order_id -> position
+        self._tracked_positions: dict[int, TrackedPosition] = {}  # order_id -> position
         self._thetadata_client: ThetaDataClient | None = None
+        self._ticker_task: asyncio.Task | None = None
+        self._shutdown = asyncio.Event()
+        self._schedule_changed = asyncio.Event()  # Wakes the ticker to re-plan when a position is added
+        # Sandbox mode is fixed for the process, so read it once
+        self._paper_mode = is_sandbox_mode()
+        self._mode_str = "📝 PAPER" if self._paper_mode else "💰 LIVE"
     
     async def _get_thetadata_client(self) -> ThetaDataClient:
         """Get or create ThetaData client."""
@@ -74,149 +129,236 @@ class PositionTracker:
             session: TastyTrade session
             account: TastyTrade account
         """
-        position_key = str(position.order_id)
-        
-        if position_key in self._tracked_positions:
+        if position.order_id in self._tracked_positions:
             logger.warning(f"Position {position.order_id} is already being tracked")
             return
         
-        self._tracked_positions[position_key] = position
+        position._session = session
+        position._account = account
+        position._close_action = resolve_close_action(position)
+        position._close_quantity = Decimal(str(position.quantity))
+        position._poll_interval = self.POLLING_INTERVAL
+        position._next_poll = asyncio.get_running_loop().time() + self.POLLING_INTERVAL
+        self._tracked_positions[position.order_id] = position
         
-        # Start background monitoring task
-        task = asyncio.create_task(
-            self._monitor_position(position, session, account)
-        )
-        position._monitor_task = task
+        # All positions share one background ticker; start it if it isn't running
+        if self._ticker_task is None or self._ticker_task.done():
+            self._shutdown.clear()
+            self._ticker_task = asyncio.create_task(self._run_ticker())
+        else:
+            self._schedule_changed.set()
         
-        paper_mode = is_sandbox_mode()
-        mode_str = "📝 PAPER" if paper_mode else "💰 LIVE"
         logger.info(
             f"Started tracking position {position.order_id} for {position.symbol} "
-            f"({position.position_direction}, entry: ${position.entry_price:.2f}) [{mode_str} MODE]"
+            f"({position.position_direction}, entry: ${position.entry_price:.2f}) [{self._mode_str} MODE]"
         )
     
-    async def _monitor_position(
-        self,
-        position: TrackedPosition,
-        session: Session,
-        account: Account
-    ):
+    async def shutdown(self):
+        """Stop the ticker cleanly and wait for its current tick to finish."""
+        self._shutdown.set()
+        task = self._ticker_task
+        if task is not None and not task.done():
+            await task
+    
+    async def _run_ticker(self):
         """
-        Background task to monitor position and update stop-loss.
+        Background task that polls market data for all tracked positions at once.
         
-        Works for both paper and live trading - the session/account determines
-        which mode orders are placed in. Position tracking automatically uses
-        the same mode as the original order.
+        Every tick deduplicates the tracked symbols and fetches prices and candles
+        for them in one batch, then updates each position from the shared results.
+        Works for both paper and live trading - each position's own session/account
+        determines which mode orders are placed in.
         """
-        polling_interval = 10  # Poll every 10 seconds
-        paper_mode = is_sandbox_mode()
-        mode_str = "📝 PAPER" if paper_mode else "💰 LIVE"
-        
-        logger.debug(f"Monitoring position {position.order_id} in {mode_str} mode")
+        logger.debug("Position ticker started in %s mode", self._mode_str)
         
         try:
-            while True:
-                await asyncio.sleep(polling_interval)
-                
-                # Check if position still exists
-                if not await self._position_exists(session, account, position):
-                    logger.info(f"Position {position.order_id} no longer exists, stopping tracking")
+            loop = asyncio.get_running_loop()
+            while self._tracked_positions:
+                # Sleep until the next position is due; each position keeps its own interval
+                self._schedule_changed.clear()
+                next_due = min(position._next_poll for position in self._tracked_positions.values())
+                # Wake early if shutdown() is signalled or a newly tracked position may be due sooner
+                wakeups = [
+                    asyncio.create_task(self._shutdown.wait()),
+                    asyncio.create_task(self._schedule_changed.wait()),
+                ]
+                try:
+                    await asyncio.wait(
+                        wakeups, timeout=max(0.0, next_due - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    for wakeup in wakeups:
+                        wakeup.cancel()
+                if self._shutdown.is_set():
+                    logger.info("Position ticker shutting down")
                     break
                 
-                # Get current price and candles from ThetaData
+                now = loop.time()
+                positions = [position for position in self._tracked_positions.values() if position._next_poll <= now]
+                if not positions:
+                    continue  # Woken early; recompute the next due time
+                # Keep the current interval unless a fresh price adjusts it below
+                for position in positions:
+                    position._next_poll = now + position._poll_interval
+                
+                # Fetch prices and candles for every distinct symbol in one batch
+                symbols = {position.symbol for position in positions}
                 try:
                     td_client = await self._get_thetadata_client()
-                    current_price = await td_client.get_current_price(position.symbol)
-                    candles = await td_client.get_1min_candles(position.symbol, count=10)
-                except Exception as e:
-                    logger.warning(
-                        f"Error fetching ThetaData for {position.symbol}: {e}. "
-                        "Falling back to TastyTrade position API."
+                    # Overlap price and candle fetches, and bound them so a stuck request
+                    # can't push the tick past the polling schedule
+                    prices, candles_map = await asyncio.wait_for(
+                        asyncio.gather(
+                            td_client.get_prices_bulk(symbols),
+                            td_client.get_1min_candles_bulk(symbols, count=self.CANDLE_COUNT)
+                        ),
+                        timeout=self.POLLING_INTERVAL - 1
                     )
-                    # Fallback: try to get price from TastyTrade positions
-                    try:
-                        positions = await account.a_get_positions(session, include_marks=True)
-                        for pos in positions:
-                            if pos.symbol == position.symbol and pos.quantity != 0:
-                                if hasattr(pos, 'mark_price') and pos.mark_price:
-                                    current_price = float(pos.mark_price)
-                                    # For candles, create minimal dataframe from current price
-                                    # This is a fallback - won't have proper OHLCV but will work for basic VWAP
-                                    import pandas as pd
-                                    candles = pd.DataFrame({
-                                        'OPEN': [current_price] * 10,
-                                        'HIGH': [current_price] * 10,
-                                        'LOW': [current_price] * 10,
-                                        'CLOSE': [current_price] * 10,
-                                        'VOLUME': [1000] * 10  # Dummy volume
-                                    })
-                                    break
-                        else:
-                            logger.warning(f"Could not get price for {position.symbol} from TastyTrade either")
-                            continue
-                    except Exception as fallback_error:
-                        logger.error(f"Fallback to TastyTrade also failed: {fallback_error}")
-                        continue
-                
-                # Calculate VWAP, support, resistance
-                vwap = calculate_vwap(candles)
-                support, resistance = calculate_support_resistance(candles)
-                
-                position.last_vwap = vwap
-                position.last_support = support
-                position.last_resistance = resistance
+                except Exception as e:
+                    logger.warning(f"Error fetching ThetaData for {sorted(symbols)}: {e}")
+                    prices, candles_map = {}, {}
                 
-                # Calculate ITM status
-                is_itm = await self._calculate_itm_status(position, current_price)
+                # Fetch each account's open positions once and share them across its tracked positions
+                open_marks = await self._fetch_open_marks(positions)
                 
-                # Detect breakout
-                if not position.breakout_detected:
-                    position.breakout_detected = detect_breakout(
-                        current_price, support, resistance, position.position_direction
-                    )
-                    if position.breakout_detected:
-                        logger.info(
-                            f"Breakout detected for position {position.order_id} "
-                            f"({position.symbol}): price {current_price:.2f} "
-                            f"{'above' if position.position_direction == 'long' else 'below'} "
-                            f"{'resistance' if position.position_direction == 'long' else 'support'} "
-                            f"{resistance if position.position_direction == 'long' else support:.2f}"
-                        )
-                
-                # Update stop-loss strategy
-                await self._update_stop_loss_strategy(
-                    position, session, account, current_price, vwap, support, resistance, is_itm
+                await asyncio.gather(
+                    *(self._process_tick(
+                        position,
+                        prices.get(position.symbol),
+                        candles_map.get(position.symbol),
+                        open_marks.get(position._account.account_number)
+                    ) for position in positions)
                 )
         
         except asyncio.CancelledError:
-            logger.info(f"Monitoring task cancelled for position {position.order_id}")
+            logger.info("Position ticker cancelled")
         except Exception as e:
-            logger.error(f"Error monitoring position {position.order_id}: {e}", exc_info=True)
+            logger.error(f"Error in position ticker: {e}", exc_info=True)
         finally:
-            # Cleanup
-            position_key = str(position.order_id)
-            if position_key in self._tracked_positions:
-                del self._tracked_positions[position_key]
+            self._ticker_task = None
+    
+    def _schedule_next_poll(self, position: TrackedPosition, current_price: float):
+        """
+        Adapt the position's polling interval to how far price is from its stop.
+        
+        Scales linearly from POLLING_INTERVAL at a 1% gap (2% gap doubles it),
+        clamped to MIN_POLLING_INTERVAL..MAX_POLLING_INTERVAL.
+        """
+        reference = position.current_stop_price if position.current_stop_price is not None else position.entry_price
+        if current_price:
+            gap = abs(current_price - reference) / abs(current_price)
+            position._poll_interval = max(
+                self.MIN_POLLING_INTERVAL,
+                min(self.MAX_POLLING_INTERVAL, int(self.POLLING_INTERVAL * gap / 0.01))
+            )
+        position._next_poll = asyncio.get_running_loop().time() + position._poll_interval
+    
+    async def _fetch_open_marks(self, positions: list[TrackedPosition]) -> dict[str, dict[str, float | None] | None]:
+        """
+        Fetch open positions once per account for this tick.
+        
+        Returns:
+            Dict mapping account number to {symbol: mark price} for non-zero positions,
+            or to None if that account's positions could not be fetched
+        """
+        accounts: dict[str, tuple[Session, Account]] = {}
+        for position in positions:
+            accounts.setdefault(position._account.account_number, (position._session, position._account))
+        
+        results = await asyncio.gather(
+            *(account.a_get_positions(session, include_marks=True) for session, account in accounts.values()),
+            return_exceptions=True
+        )
+        open_marks: dict[str, dict[str, float | None] | None] = {}
+        for account_number, result in zip(accounts, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.warning(f"Error checking position existence for account {account_number}: {result}")
+                open_marks[account_number] = None
+                continue
+            open_marks[account_number] = {
+                pos.symbol: (float(pos.mark_price) if getattr(pos, 'mark_price', None) else None)
+                for pos in result
+                if pos.quantity != 0
+            }
+        return open_marks
     
-    async def _position_exists(
+    async def _process_tick(
         self,
-        session: Session,
-        account: Account,
-        position: TrackedPosition
-    ) -> bool:
-        """Check if position still exists in account."""
+        position: TrackedPosition,
+        current_price: Any,
+        candles: Any,
+        open_marks: dict[str, float | None] | None
+    ):
+        """
+        Update one position from the tick's shared data.
+        
+        Missing market data is passed as None or as the exception raised while fetching it;
+        open_marks is None when the account's positions couldn't be fetched this tick.
+        """
+        session, account = position._session, position._account
+        
         try:
-            positions = await account.a_get_positions(session, include_marks=True)
+            # Check if position still exists (assume it does if the account fetch failed)
+            if open_marks is not None and position.symbol not in open_marks:
+                logger.info(f"Position {position.order_id} no longer exists, stopping tracking")
+                self._tracked_positions.pop(position.order_id, None)
+                return
+            
+            if current_price is None or candles is None or isinstance(current_price, BaseException) or isinstance(candles, BaseException):
+                error = current_price if isinstance(current_price, BaseException) else candles
+                logger.warning(
+                    f"Error fetching ThetaData for {position.symbol}: {error}. "
+                    "Falling back to TastyTrade position API."
+                )
+                # Fallback: use the mark price from this tick's TastyTrade positions
+                mark_price = open_marks.get(position.symbol) if open_marks is not None else None
+                if not mark_price:
+                    logger.warning(f"Could not get price for {position.symbol} from TastyTrade either")
+                    return
+                current_price = mark_price
+                # This is a fallback - won't have proper OHLCV but will work for basic VWAP
+                candles = _flat_candles(current_price)
+            
+            self._schedule_next_poll(position, current_price)
+            
+            # Calculate VWAP, support, resistance
+            vwap = calculate_vwap(candles)
+            position.last_vwap = vwap
+            
+            # Support/resistance only feed breakout detection and the no-breakout branch of the
+            # resistance strategy; once a breakout is latched, reuse the last levels instead
+            if position.breakout_detected:
+                support, resistance = position.last_support, position.last_resistance
+            else:
+                support, resistance = calculate_support_resistance(candles)
+                position.last_support = support
+                position.last_resistance = resistance
             
-            # Check if any position matches our tracked position
-            for pos in positions:
-                if pos.symbol == position.symbol and pos.quantity != 0:
-                    return True
+            # Calculate ITM status
+            is_itm = await self._calculate_itm_status(position, current_price)
             
-            return False
+            # Detect breakout
+            if not position.breakout_detected:
+                position.breakout_detected = detect_breakout(
+                    current_price, support, resistance, position.position_direction
+                )
+                # The breakout message is costly to format; skip it when INFO is filtered out
+                if position.breakout_detected and logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        f"Breakout detected for position {position.order_id} "
+                        f"({position.symbol}): price {current_price:.2f} "
+                        f"{'above' if position.position_direction == 'long' else 'below'} "
+                        f"{'resistance' if position.position_direction == 'long' else 'support'} "
+                        f"{resistance if position.position_direction == 'long' else support:.2f}"
+                    )
+            
+            # Update stop-loss strategy
+            await self._update_stop_loss_strategy(
+                position, session, account, current_price, vwap, support, resistance, is_itm
+            )
         except Exception as e:
-            logger.warning(f"Error checking position existence: {e}")
-            return True  # Assume exists on error to continue monitoring
+            logger.error(f"Error monitoring position {position.order_id}: {e}", exc_info=True)
+            self._tracked_positions.pop(position.order_id, None)
     
     async def _calculate_itm_status(
         self,
@@ -355,6 +497,27 @@ class PositionTracker:
                 position, session, account, stop_price, "No breakout: stop at VWAP/support"
             )
     
+    async def _resolve_stop_instrument(self, position: TrackedPosition, session: Session) -> Any | None:
+        """Look up the instrument for the position's first leg (called once per position)."""
+        # The legs stored in TrackedPosition should be the original OrderLeg BaseModel objects
+        first_leg_data = position.legs[0]
+        
+        InstrumentSpec, get_instrument_details = _instrument_api()
+        
+        # Convert leg to InstrumentSpec and look it up
+        instrument_spec = InstrumentSpec(
+            symbol=first_leg_data.symbol,
+            option_type=getattr(first_leg_data, 'option_type', None),
+            strike_price=getattr(first_leg_data, 'strike_price', None),
+            expiration_date=getattr(first_leg_data, 'expiration_date', None)
+        )
+        
+        instrument_details = await get_instrument_details(session, [instrument_spec])
+        if not instrument_details:
+            logger.error(f"Could not get instrument details for {first_leg_data.symbol}")
+            return None
+        return instrument_details[0].instrument
+    
     async def _update_or_place_stop_order(
         self,
         position: TrackedPosition,
@@ -364,102 +527,64 @@ class PositionTracker:
         reason: str
     ):
         """Update existing stop order or place new one."""
+        # Nothing to do if the stop rounds to the same cent as the live one
+        new_cents = round(stop_price * 100)
+        if new_cents == position.current_stop_price_cents:
+            return
+        
         try:
-            # Determine stop action based on position direction
-            first_leg = position.legs[0]
-            action_lower = first_leg.action.lower()
-            
-            if position.position_direction == 'long':
-                # Long position: stop-loss is a sell order
-                stop_action = 'Sell to Close' if 'option' in str(type(first_leg)).lower() else 'Sell'
-            else:
-                # Short position: stop-loss is a buy order
-                stop_action = 'Buy to Close' if 'option' in str(type(first_leg)).lower() else 'Buy'
-            
-            # Build stop order leg - need to reconstruct from stored leg data
-            # The legs stored in TrackedPosition should be the original OrderLeg BaseModel objects
-            first_leg_data = position.legs[0]
-            
-            # Import here to avoid circular dependency
-            from tasty_agent.http_server import InstrumentSpec, get_instrument_details
-            
-            # Convert leg to InstrumentSpec and build order
-            instrument_spec = InstrumentSpec(
-                symbol=first_leg_data.symbol,
-                option_type=getattr(first_leg_data, 'option_type', None),
-                strike_price=getattr(first_leg_data, 'strike_price', None),
-                expiration_date=getattr(first_leg_data, 'expiration_date', None)
-            )
-            
-            instrument_details = await get_instrument_details(session, [instrument_spec])
-            if not instrument_details:
-                logger.error(f"Could not get instrument details for {first_leg_data.symbol}")
-                return
-            
-            instrument = instrument_details[0].instrument
-            order_action = (
-                OrderAction(stop_action) if isinstance(instrument, type) and hasattr(OrderAction, stop_action.replace(' ', '_').upper())
-                else (OrderAction.BUY if 'buy' in stop_action.lower() else OrderAction.SELL)
-            )
-            
-            # Determine proper OrderAction based on instrument type and stop action
-            from tastytrade.instruments import Option
-            
-            if isinstance(instrument, Option):
-                if 'buy to close' in stop_action.lower():
-                    order_action = OrderAction.BUY_TO_CLOSE
-                elif 'sell to close' in stop_action.lower():
-                    order_action = OrderAction.SELL_TO_CLOSE
-                elif 'buy to open' in stop_action.lower():
-                    order_action = OrderAction.BUY_TO_OPEN
-                elif 'sell to open' in stop_action.lower():
-                    order_action = OrderAction.SELL_TO_OPEN
-                else:
-                    # Default based on position direction
-                    order_action = OrderAction.BUY_TO_CLOSE if position.position_direction == 'short' else OrderAction.SELL_TO_CLOSE
+            stop_price_decimal = Decimal(new_cents) / 100
+            template = position._stop_order_template
+            if template is None:
+                instrument = position._cached_instrument
+                if instrument is None:
+                    instrument = await self._resolve_stop_instrument(position, session)
+                    if instrument is None:
+                        return
+                    position._cached_instrument = instrument
+                
+                # Build the leg and order once; later updates only change the stop price
+                stop_leg = instrument.build_leg(position._close_quantity, position._close_action)
+                stop_order = NewOrder(
+                    order_type=OrderType.STOP,
+                    time_in_force=OrderTimeInForce.DAY,
+                    legs=[stop_leg],
+                    stop_trigger=stop_price_decimal
+                )
+                position._stop_order_template = stop_order
             else:
-                # Equity
-                order_action = OrderAction.BUY if 'buy' in stop_action.lower() else OrderAction.SELL
-            
-            stop_leg = instrument.build_leg(Decimal(str(position.quantity)), order_action)
-            
-            # Build stop order
-            stop_order = NewOrder(
-                order_type=OrderType.STOP,
-                time_in_force=OrderTimeInForce.DAY,
-                legs=[stop_leg],
-                stop_price=Decimal(str(stop_price))
-            )
+                stop_order = template.model_copy(update={"stop_trigger": stop_price_decimal})
             
+            # In paper mode, orders go to sandbox. In live mode, real orders.
+            # The session determines which; dry_run=False means actually place the order.
+            new_order_id: int | None = None
             if position.current_stop_order_id:
-                # Try to replace existing order
+                # Modify the existing stop in place: one request, and no window without a stop
                 try:
-                    from tasty_agent.http_server import build_new_order
-                    # For replace, we'd need the existing order structure
-                    # For simplicity, delete and recreate
-                    await account.a_delete_order(session, position.current_stop_order_id)
-                    position.current_stop_order_id = None
+                    replaced = await account.a_replace_order(session, position.current_stop_order_id, stop_order)
+                    new_order_id = replaced.id
                 except Exception as e:
-                    logger.warning(f"Could not delete old stop order: {e}")
+                    # The old stop may have filled or been canceled; fall back to delete + place
+                    logger.warning(f"Could not replace stop order {position.current_stop_order_id}, placing a new one: {e}")
+                    try:
+                        await account.a_delete_order(session, position.current_stop_order_id)
+                    except Exception as delete_err:
+                        logger.warning(f"Could not delete old stop order: {delete_err}")
+                    position.current_stop_order_id = None
             
-            # Place new stop order (respect sandbox mode - TastyTrade handles this via session)
-            paper_mode = is_sandbox_mode()
-            # In paper mode, orders go to sandbox. In live mode, real orders.
-            # dry_run=False means actually place the order (whether paper or live based on session)
-            result = await account.a_place_order(session, stop_order, dry_run=False)
-            result_dict = result.model_dump() if hasattr(result, 'model_dump') else {}
+            if new_order_id is None:
+                result = await account.a_place_order(session, stop_order, dry_run=False)
+                placed = getattr(result, 'order', None)
+                new_order_id = placed.id if placed is not None else None
             
-            if isinstance(result_dict, dict):
-                new_order_id = result_dict.get('id') or result_dict.get('order_id')
-                if new_order_id:
-                    position.current_stop_order_id = int(new_order_id)
-                    position.current_stop_price = stop_price
-                    paper_mode = is_sandbox_mode()
-                    mode_str = "📝 PAPER" if paper_mode else "💰 LIVE"
-                    logger.info(
-                        f"Updated stop-loss for position {position.order_id} ({position.symbol}): "
-                        f"${stop_price:.2f} - {reason} [{mode_str} MODE]"
-                    )
+            if new_order_id:
+                position.current_stop_order_id = int(new_order_id)
+                position.current_stop_price = stop_price
+                position.current_stop_price_cents = new_cents
+                logger.info(
+                    f"Updated stop-loss for position {position.order_id} ({position.symbol}): "
+                    f"${stop_price:.2f} - {reason} [{self._mode_str} MODE]"
+                )
         except Exception as e:
             logger.error(f"Error updating stop order for position {position.order_id}: {e}", exc_info=True)
 
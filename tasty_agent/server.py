@@ -1,27 +1,34 @@
 import asyncio
 import logging
 import os
+import random
+import time
 from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
-from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
-from typing import Any, Literal
+from enum import IntFlag
+from functools import cached_property, lru_cache
+from operator import attrgetter
+from typing import Any, Literal, cast, get_args
 
 import humanize
 from aiocache import Cache, cached
-from aiocache.serializers import PickleSerializer
+from aiocache.base import BaseCache
+from aiocache.serializers import NullSerializer
 from aiolimiter import AsyncLimiter
 from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.fastmcp.prompts import base
 from pydantic import BaseModel, Field
 from tabulate import tabulate
 from tastytrade import Account, Session
+from tastytrade.account import AccountBalance
 from tastytrade.dxfeed import Greeks, Quote
 from tastytrade.instruments import Equity, Option, a_get_option_chain
 from tastytrade.market_sessions import ExchangeType, MarketStatus, a_get_market_holidays, a_get_market_sessions
 from tastytrade.metrics import a_get_market_metrics
-from tastytrade.order import InstrumentType, NewOrder, OrderAction, OrderTimeInForce, OrderType
+from tastytrade.order import InstrumentType, NewOrder, OrderAction, OrderTimeInForce, OrderType, PlacedOrder
 from tastytrade.search import a_symbol_search
 from tastytrade.streamer import DXLinkStreamer
 from tastytrade.utils import now_in_new_york
@@ -32,7 +39,36 @@ from tasty_agent.utils.session import create_session, is_sandbox_mode, select_ac
 
 logger = get_server_logger()
 
-rate_limiter = AsyncLimiter(2, 1) # 2 requests per second
+rate_limiter = AsyncLimiter(1.9, 1)  # Just under 2 requests per second so clock skew doesn't trip the API limit
+PAGINATE_PREFETCH = 4  # Pages requested concurrently once the first page comes back full
+RATE_LIMIT_RETRIES = 3  # Retries after a rate-limit rejection, backing off 0.5s, 2s, then 8s
+RATE_LIMIT_BACKOFF = 0.5
+TO_TABLE_MAX_TABULATE_ROWS = 500  # Larger tables use the single-pass plain renderer instead of tabulate
+LIVE_ORDERS_CACHE_TTL = 1.5  # Seconds a live-orders fetch is reused by replace_order lookups
+QUOTE_CACHE_MAX_AGE = 60.0  # Seconds before a cached quote is refused and resubscribed
+QUOTE_CACHE_MAX_SYMBOLS = 200  # Subscriptions kept open; the least recently requested are dropped first
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Check whether an API error is a rate-limit rejection (the SDK only exposes the message)."""
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+async def _rate_limited_call[T](call: Callable[[], Awaitable[T]]) -> T:
+    """Run a read-only API call under the rate limiter, retrying rate-limit rejections with jittered backoff."""
+    for attempt in range(RATE_LIMIT_RETRIES):
+        async with rate_limiter:
+            try:
+                return await call()
+            except Exception as e:
+                if not _is_rate_limited(e):
+                    raise
+                delay = RATE_LIMIT_BACKOFF * 4 ** attempt
+                logger.warning(f"Rate limited by Tastytrade, retrying in {delay:.1f}s: {e}")
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+    async with rate_limiter:
+        return await call()
 
 
 async def _stream_events(
@@ -41,50 +77,215 @@ async def _stream_events(
     streamer_symbols: list[str],
     timeout: float
 ) -> list[Any]:
-    """Generic streaming helper for Quote/Greeks events."""
+    """Generic streaming helper for Quote/Greeks events; `timeout` bounds the whole collection, not each event."""
     async with DXLinkStreamer(session) as streamer:
-        await streamer.subscribe(event_type, streamer_symbols)
-        events_by_symbol: dict[str, Any] = {}
-        expected = set(streamer_symbols)
-        while len(events_by_symbol) < len(expected):
-            event = await asyncio.wait_for(streamer.get_event(event_type), timeout=timeout)
-            if event.event_symbol in expected:
+        return await _collect_events(streamer, event_type, streamer_symbols, timeout)
+
+
+async def _collect_events(
+    streamer: DXLinkStreamer,
+    event_type: type[Quote] | type[Greeks],
+    streamer_symbols: list[str],
+    timeout: float
+) -> list[Any]:
+    """Subscribe on an open streamer and collect one event per symbol, in the order requested."""
+    await streamer.subscribe(event_type, streamer_symbols)
+    events_by_symbol: dict[str, Any] = {}
+    remaining = set(streamer_symbols)
+    async with asyncio.timeout(timeout):
+        while remaining:
+            event = await streamer.get_event(event_type)
+            if event.event_symbol in remaining:
                 events_by_symbol[event.event_symbol] = event
-        return [events_by_symbol[s] for s in streamer_symbols]
+                remaining.discard(event.event_symbol)
+    return [events_by_symbol[s] for s in streamer_symbols]
 
 
 async def _paginate[T](
     fetch_fn: Callable[[int], Awaitable[list[T]]],
     page_size: int
 ) -> list[T]:
-    """Generic pagination helper for API calls."""
-    all_items: list[T] = []
-    offset = 0
-    while True:
-        async with rate_limiter:
-            items = await fetch_fn(offset)
-        all_items.extend(items or [])
-        if not items or len(items) < page_size:
-            break
-        offset += page_size
+    """Generic pagination helper for API calls. `fetch_fn` receives the page index (the API's page-offset).
+    
+    The page count isn't known up front, so after a full first page the next PAGINATE_PREFETCH
+    pages are fetched concurrently (still under the rate limiter) until a short page ends the results.
+    """
+    async def fetch_page(page: int) -> list[T]:
+        return list(await _rate_limited_call(lambda: fetch_fn(page)) or [])
+
+    all_items = await fetch_page(0)
+    next_page = 1
+    more = len(all_items) >= page_size
+    while more:
+        pages = await asyncio.gather(*[fetch_page(p) for p in range(next_page, next_page + PAGINATE_PREFETCH)])
+        for items in pages:
+            all_items.extend(items)
+            if len(items) < page_size:
+                more = False
+                break
+        next_page += PAGINATE_PREFETCH
     return all_items
 
 
+def _fast_plain_table(rows: Sequence[Sequence[Any]], headers: Sequence[str]) -> str:
+    """Render rows in tabulate's 'plain' layout (no number parsing) with a single width pass."""
+    cells = [["" if value is None else str(value) for value in row] for row in rows]
+    widths = [len(header) + 2 for header in headers]
+    for row in cells:
+        for i, cell in enumerate(row):
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+    lines = ["  ".join(header.ljust(width) for header, width in zip(headers, widths, strict=True)).rstrip()]
+    lines.extend("  ".join(cell.ljust(width) for cell, width in zip(row, widths, strict=True)).rstrip() for row in cells)
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=64)
+def _table_columns(model: type[BaseModel]) -> tuple[tuple[str, ...], Callable[[BaseModel], tuple]]:
+    """Column names and a row getter for a model class, introspected once per class."""
+    keys = tuple(model.model_fields)
+    if len(keys) > 1:
+        return keys, attrgetter(*keys)
+    return keys, lambda item: tuple(getattr(item, key) for key in keys)
+
+
 def to_table(data: Sequence[BaseModel]) -> str:
-    """Format list of Pydantic models as a plain table."""
+    """Format list of Pydantic models as a plain table (large tables bypass tabulate)."""
     if not data:
         return "No data"
-    return tabulate([item.model_dump() for item in data], headers='keys', tablefmt='plain')
+    keys, row_getter = _table_columns(type(data[0]))
+    rows = [row_getter(item) for item in data]
+    if len(rows) > TO_TABLE_MAX_TABULATE_ROWS:
+        return _fast_plain_table(rows, keys)
+    return tabulate(rows, headers=keys, tablefmt='plain')
+
+class QuoteCache:
+    """Long-lived quote streamer holding the latest quote per subscribed streamer symbol.
+
+    DXLink pushes a quote whenever it changes, so while a symbol stays subscribed its latest
+    event is its current quote. Only symbols not yet subscribed wait on the stream; quotes
+    older than QUOTE_CACHE_MAX_AGE are resubscribed so DXLink resends a fresh snapshot, and
+    the least recently requested symbols are unsubscribed past QUOTE_CACHE_MAX_SYMBOLS.
+    """
+
+    def __init__(self, session: Session):
+        self._session = session
+        self._stack: AsyncExitStack | None = None
+        self._streamer: DXLinkStreamer | None = None
+        self._listener: asyncio.Task | None = None
+        self._quotes: dict[str, tuple[float, Quote]] = {}  # symbol -> (time.monotonic() at receipt, quote)
+        self._subscribed: dict[str, None] = {}  # Ordered least to most recently requested
+        self._updated = asyncio.Condition()
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> DXLinkStreamer:
+        """Open the streamer if it isn't running (reopening after a dropped connection)."""
+        async with self._lock:
+            if self._streamer is not None and self._listener is not None and not self._listener.done():
+                return self._streamer
+            await self._reset()
+            stack = AsyncExitStack()
+            try:
+                streamer = await stack.enter_async_context(DXLinkStreamer(self._session))
+            except BaseException:
+                await stack.aclose()
+                raise
+            self._stack, self._streamer = stack, streamer
+            self._listener = asyncio.create_task(self._listen(streamer))
+            return streamer
+
+    async def get_quotes(self, streamer_symbols: list[str], timeout: float = 10.0) -> list[Quote]:
+        """Return the current quote for each symbol, subscribing to any not yet streaming."""
+        streamer = await self.connect()
+        listener = self._listener
+        wanted = list(dict.fromkeys(streamer_symbols))
+        now = time.monotonic()
+        stale = [s for s in wanted if s in self._quotes and now - self._quotes[s][0] > QUOTE_CACHE_MAX_AGE]
+        if stale:
+            await self._drop(streamer, stale)
+        missing = [s for s in wanted if s not in self._subscribed]
+        if missing:
+            await streamer.subscribe(Quote, missing)
+        for s in wanted:  # Mark as most recently requested
+            self._subscribed.pop(s, None)
+            self._subscribed[s] = None
+        if len(self._subscribed) > QUOTE_CACHE_MAX_SYMBOLS:
+            await self._drop(streamer, list(self._subscribed)[:len(self._subscribed) - QUOTE_CACHE_MAX_SYMBOLS])
+
+        def ready() -> bool:
+            return listener is None or listener.done() or all(s in self._quotes for s in wanted)
+
+        if not ready():
+            try:
+                async with asyncio.timeout(timeout), self._updated:
+                    await self._updated.wait_for(ready)
+            except TimeoutError:
+                # Don't keep streaming symbols that never produced a quote
+                await self._drop(streamer, [s for s in wanted if s not in self._quotes])
+                raise
+        quotes = self._quotes
+        if any(s not in quotes for s in wanted):
+            raise ConnectionError("Quote stream closed before all quotes arrived")
+        return [quotes[s][1] for s in streamer_symbols]
+
+    async def close(self) -> None:
+        """Stop listening and close the streamer."""
+        async with self._lock:
+            await self._reset()
+
+    async def _drop(self, streamer: DXLinkStreamer, symbols: list[str]) -> None:
+        """Unsubscribe symbols and forget their quotes."""
+        for s in symbols:
+            self._subscribed.pop(s, None)
+            self._quotes.pop(s, None)
+        try:
+            await streamer.unsubscribe(Quote, symbols)
+        except Exception as e:
+            logger.warning(f"Error unsubscribing quotes for {symbols}: {e}")
+
+    async def _listen(self, streamer: DXLinkStreamer) -> None:
+        try:
+            async for quote in streamer.listen(Quote):
+                self._quotes[quote.event_symbol] = (time.monotonic(), quote)
+                async with self._updated:
+                    self._updated.notify_all()
+        finally:
+            async with self._updated:  # Wake waiters so they fail fast instead of timing out
+                self._updated.notify_all()
+
+    async def _reset(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        if self._stack is not None:
+            try:
+                await self._stack.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing quote streamer: {e}")
+        self._stack = None
+        self._streamer = None
+        self._listener = None
+        self._quotes = {}
+        self._subscribed = {}
+
 
 @dataclass
 class ServerContext:
     session: Session
     account: Account
+    session_refreshed: asyncio.Event = field(default_factory=asyncio.Event)  # Wakes keep_session_alive after an inline refresh
+    quote_cache: QuoteCache | None = None  # Shared quote streamer for auto-priced orders (None: stream per call)
+    live_orders: tuple[float, dict[str, PlacedOrder]] | None = None  # (time.monotonic() at fetch, orders by id)
+    live_orders_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    live_orders_generation: int = 0  # Bumped on invalidation so an in-flight fetch isn't cached over it
 
 
 def get_context(ctx: Context) -> ServerContext:
-    """Extract context from request."""
-    return ctx.request_context.lifespan_context
+    """Extract context from request, failing fast when no account is configured."""
+    context = ctx.request_context.lifespan_context
+    if not context or not context.account:
+        raise ValueError("Account context not available. Please check TastyTrade credentials and account configuration.")
+    return context
 
 
 def get_valid_session(ctx: Context) -> Session:
@@ -102,32 +303,43 @@ def get_valid_session(ctx: Context) -> Session:
         logger.info(f"Session expiring in {time_until_expiry:.0f}s, refreshing...")
         session.refresh()
         logger.info(f"Session refreshed, new expiration: {session.session_expiration}")
+        context.session_refreshed.set()
 
     return session
 
 
-async def keep_session_alive(session: Session):
-    """Background task to periodically refresh session before it expires."""
-    # Check every 5 minutes (sessions expire after 15 minutes)
-    check_interval = 5 * 60  # 5 minutes in seconds
-    
+SESSION_REFRESH_MARGIN = 10 * 60  # Refresh once less than 10 minutes remain (sessions last 15)
+SESSION_MIN_CHECK_INTERVAL = 30  # Floor between keep-alive checks, also used after a failed refresh
+
+
+async def keep_session_alive(session: Session, refreshed: asyncio.Event):
+    """Background task to refresh the session before it expires.
+
+    Sleeps until the session enters the refresh margin instead of polling on a fixed interval;
+    `refreshed` is set when a tool refreshes the session inline, so the schedule is recomputed.
+    """
     while True:
         try:
-            await asyncio.sleep(check_interval)
-            
             time_until_expiry = (session.session_expiration - now_in_new_york()).total_seconds()
-            
-            # Refresh if expiring within 10 minutes (buffer for network issues)
-            if time_until_expiry < 10 * 60:
+            if time_until_expiry < SESSION_REFRESH_MARGIN:
                 logger.info(f"Refreshing session (expires in {time_until_expiry/60:.1f} min)")
                 session.refresh()
                 logger.debug(f"Session refreshed, new expiration: {session.session_expiration}")
+                time_until_expiry = (session.session_expiration - now_in_new_york()).total_seconds()
+            sleep_for = max(SESSION_MIN_CHECK_INTERVAL, time_until_expiry - SESSION_REFRESH_MARGIN)
+        except Exception as e:
+            logger.error(f"Error refreshing session in keep-alive task: {e}")
+            # Keep running; retry after the minimum interval
+            sleep_for = SESSION_MIN_CHECK_INTERVAL
+
+        try:
+            await asyncio.wait_for(refreshed.wait(), timeout=sleep_for)
+            refreshed.clear()
+        except TimeoutError:
+            pass
         except asyncio.CancelledError:
             logger.info("Session keep-alive task cancelled")
             break
-        except Exception as e:
-            logger.error(f"Error refreshing session in keep-alive task: {e}")
-            # Continue running even if there's an error
 
 
 @asynccontextmanager
@@ -176,11 +388,12 @@ async def lifespan(_) -> AsyncIterator[ServerContext]:
 
     context = ServerContext(
         session=session,
-        account=account
+        account=account,
+        quote_cache=QuoteCache(session)
     )
     
     # Start background task to keep session alive
-    keep_alive_task = asyncio.create_task(keep_session_alive(session))
+    keep_alive_task = asyncio.create_task(keep_session_alive(session, context.session_refreshed))
     
     yield context
     
@@ -190,6 +403,8 @@ async def lifespan(_) -> AsyncIterator[ServerContext]:
         await keep_alive_task
     except asyncio.CancelledError:
         pass
+    if context.quote_cache is not None:
+        await context.quote_cache.close()
 
 mcp_app = FastMCP("TastyTrade", lifespan=lifespan)
 
@@ -197,16 +412,31 @@ mcp_app = FastMCP("TastyTrade", lifespan=lifespan)
 # ACCOUNT & POSITION TOOLS
 # =============================================================================
 
+# AccountBalance fields classified once: numeric fields are dropped when zero or None, the rest only when None
+_BALANCE_FIELDS: tuple[tuple[str, bool], ...] = tuple(
+    (name, Decimal in (info.annotation, *get_args(info.annotation)))
+    for name, info in AccountBalance.model_fields.items()
+)
+
+
+def _nonzero_balances(balances: AccountBalance) -> dict[str, Any]:
+    """Collect balance fields that carry information (non-zero amounts, non-None everything else)."""
+    result: dict[str, Any] = {}
+    for name, numeric in _BALANCE_FIELDS:
+        value = getattr(balances, name)
+        if value if numeric else value is not None:
+            result[name] = value
+    return result
+
+
 @mcp_app.tool()
 async def get_balances(ctx: Context) -> dict[str, Any]:
     """Get account balances including cash, buying power, and net liquidating value."""
     try:
         context = get_context(ctx)
-        if not context or not context.account:
-            raise ValueError("Account context not available. Please check TastyTrade credentials and account configuration.")
         session = get_valid_session(ctx)
         balances = await context.account.a_get_balances(session)
-        result = {k: v for k, v in balances.model_dump().items() if v is not None and v != 0}
+        result = _nonzero_balances(balances)
         if not result:
             return {"message": "No balance data available", "account_number": context.account.account_number}
         return result
@@ -343,6 +573,11 @@ class OrderLeg(BaseModel):
     strike_price: float | None = Field(None, description="Strike price (required for options)")
     expiration_date: str | None = Field(None, description="Expiration date in YYYY-MM-DD format (required for options)")
 
+    @cached_property
+    def signed_quantity(self) -> int:
+        """Quantity signed by cash flow: negative when buying (debit), positive when selling (credit)."""
+        return -self.quantity if self.action.startswith('Buy') else self.quantity
+
 
 class WatchlistSymbol(BaseModel):
     """Symbol specification for watchlist operations."""
@@ -350,10 +585,14 @@ class WatchlistSymbol(BaseModel):
     instrument_type: str = Field(..., description="One of: 'Equity', 'Equity Option', 'Future', 'Future Option', 'Cryptocurrency', 'Warrant'")
 
 
+@lru_cache(maxsize=4096)
 def validate_date_format(date_string: str) -> date:
-    """Validate date format and return date object."""
+    """Validate date format and return date object (memoized; legs often share expirations)."""
     try:
-        return datetime.strptime(date_string, "%Y-%m-%d").date()
+        # fromisoformat also accepts compact and week dates (20241220, 2024-W51-5), so pin the layout first
+        if len(date_string) != 10 or date_string[4] != '-' or date_string[7] != '-':
+            raise ValueError(date_string)
+        return date.fromisoformat(date_string)
     except ValueError as e:
         raise ValueError(f"Invalid date format '{date_string}'. Expected YYYY-MM-DD format.") from e
 
@@ -374,15 +613,98 @@ def _option_chain_key_builder(fn, session: Session, symbol: str):
     return f"option_chain:{symbol}"
 
 
-@cached(ttl=86400, cache=Cache.MEMORY, serializer=PickleSerializer(), key_builder=_option_chain_key_builder)
-async def get_cached_option_chain(session: Session, symbol: str):
-    """Cache option chains for 24 hours as they rarely change during that timeframe."""
+@cached(ttl=86400, cache=Cache.MEMORY, serializer=NullSerializer(), key_builder=_option_chain_key_builder)
+async def _get_cached_option_chain(session: Session, symbol: str):
+    """Cache option chains for 24 hours as they rarely change during that timeframe.
+    
+    The memory cache stores the chain object itself (no per-hit pickling), so callers must not mutate it.
+    """
     return await a_get_option_chain(session, symbol)
 
 
-async def get_instrument_details(session: Session, instrument_specs: list[InstrumentSpec]) -> list[InstrumentDetail]:
-    """Get instrument details with validation and caching."""
-    async def lookup_single_instrument(spec: InstrumentSpec) -> InstrumentDetail:
+# In-flight chain fetches by symbol, so concurrent cache misses share one request
+_option_chain_inflight: dict[str, asyncio.Task] = {}
+
+
+async def get_cached_option_chain(session: Session, symbol: str):
+    """Get the cached option chain, coalescing concurrent misses for a symbol into a single fetch."""
+    task = _option_chain_inflight.get(symbol)
+    if task is None:
+        task = asyncio.create_task(_get_cached_option_chain(session, symbol))
+        _option_chain_inflight[symbol] = task
+        task.add_done_callback(lambda _: _option_chain_inflight.pop(symbol, None))
+    # Shield so one caller's cancellation doesn't abort the fetch the others are waiting on
+    return await asyncio.shield(task)
+
+
+def _option_chain_index_key_builder(fn, session: Session, symbol: str):
+    """Build cache key for the option chain index using only symbol."""
+    return f"option_chain_index:{symbol}"
+
+
+def _strike_cents(strike_price: Any) -> int:
+    """Convert a strike to integer cents so index keys compare exactly (150.5 and Decimal('150.50') match)."""
+    return int(round(float(strike_price) * 100))
+
+
+@cached(ttl=86400, cache=Cache.MEMORY, serializer=NullSerializer(), key_builder=_option_chain_index_key_builder)
+async def get_cached_option_chain_index(session: Session, symbol: str) -> dict[tuple[date, str, int], Option]:
+    """Index the cached option chain by (expiration, option type, strike in cents) for O(1) contract lookup."""
+    chain = await get_cached_option_chain(session, symbol)
+    return {
+        (exp_date, option.option_type.value, _strike_cents(option.strike_price)): option
+        for exp_date, options in chain.items()
+        for option in options
+    }
+
+
+def _equity_key_builder(fn, session: Session, symbol: str):
+    """Build cache key using only symbol (equity metadata is stable for the trading day)."""
+    return f"equity:{symbol}"
+
+
+@cached(ttl=86400, cache=Cache.MEMORY, serializer=NullSerializer(), key_builder=_equity_key_builder)
+async def _get_cached_equity(session: Session, symbol: str) -> Equity:
+    """Cache equity instruments for 24 hours so stock legs skip the instrument lookup on repeat calls."""
+    return await Equity.a_get(session, symbol)
+
+
+async def _get_cached_equities(session: Session, symbols: list[str]) -> dict[str, Equity]:
+    """Resolve equities from the per-symbol cache, fetching every miss in one batched request."""
+    cache = cast(BaseCache, _get_cached_equity.cache)  # Set by @cached; shared with the single-symbol lookup
+    cached_equities = await cache.multi_get([_equity_key_builder(None, session, s) for s in symbols])
+    equities = {s: e for s, e in zip(symbols, cached_equities, strict=True) if e is not None}
+    missing = [s for s in symbols if s not in equities]
+    if missing:
+        fetched = await Equity.a_get(session, missing)
+        fetched = fetched if isinstance(fetched, list) else [fetched]
+        await cache.multi_set([(_equity_key_builder(None, session, e.symbol), e) for e in fetched], ttl=86400)
+        equities.update((e.symbol, e) for e in fetched)
+        # Symbols the batch didn't return go through the single lookup so the API's error surfaces as before
+        for symbol in missing:
+            if symbol not in equities:
+                equities[symbol] = await _get_cached_equity(session, symbol)
+    return equities
+
+
+# Recently resolved contracts keyed by (trading day, spec fields), so repeat orders skip the lookups.
+# The trading day in the key retires entries at the date change; OCC symbology is stable intraday.
+INSTRUMENT_DETAIL_CACHE_SIZE = 4096
+_instrument_detail_cache: dict[tuple, InstrumentDetail] = {}
+
+
+def _remember_instrument_detail(key: tuple, detail: InstrumentDetail) -> None:
+    """Store a resolved instrument, evicting the least recently used entry when full."""
+    _instrument_detail_cache[key] = detail
+    if len(_instrument_detail_cache) > INSTRUMENT_DETAIL_CACHE_SIZE:
+        del _instrument_detail_cache[next(iter(_instrument_detail_cache))]
+
+
+async def get_instrument_details(
+    session: Session, instrument_specs: Sequence[InstrumentSpec | OrderLeg]
+) -> list[InstrumentDetail]:
+    """Get instrument details with validation and caching. Order legs carry the same lookup fields as specs."""
+    async def lookup_single_instrument(spec: InstrumentSpec | OrderLeg) -> InstrumentDetail:
         symbol = spec.symbol.upper()
         option_type = spec.option_type
 
@@ -398,25 +720,62 @@ async def get_instrument_details(session: Session, instrument_specs: list[Instru
             if option_type not in ['C', 'P']:
                 raise ValueError(f"Invalid option_type '{option_type}'. Expected 'C' or 'P'.")
 
-            # Get cached option chain and find specific option
+            # Find the specific option via the prefetched chain index
+            index = chain_indexes[symbol]
+            option = index.get((target_date, option_type, _strike_cents(strike_price)))
+            if option is not None:
+                return InstrumentDetail(option.streamer_symbol, option)
+
+            # Not found - consult the full chain to build a helpful error
             chain = await get_cached_option_chain(session, symbol)
             if target_date not in chain:
                 available_dates = sorted(chain.keys())
                 raise ValueError(f"No options found for {symbol} expiration {expiration_date}. Available: {available_dates}")
 
-            for option in chain[target_date]:
-                if (option.strike_price == strike_price and
-                    option.option_type.value == option_type):
-                    return InstrumentDetail(option.streamer_symbol, option)
-
-            available_strikes = [opt.strike_price for opt in chain[target_date] if opt.option_type.value == option_type]
-            raise ValueError(f"Option not found: {symbol} {expiration_date} {option_type} {strike_price}. Available strikes: {sorted(set(available_strikes))}")
+            available_strikes = sorted({opt.strike_price for opt in chain[target_date] if opt.option_type.value == option_type})
+            raise ValueError(f"Option not found: {symbol} {expiration_date} {option_type} {strike_price}. Available strikes: {available_strikes}")
         else:
-            # Get equity instrument
-            instrument = await Equity.a_get(session, symbol)
-            return InstrumentDetail(symbol, instrument)
-
-    return await asyncio.gather(*[lookup_single_instrument(spec) for spec in instrument_specs])
+            # Get equity instrument from the batched prefetch
+            return InstrumentDetail(symbol, equities[symbol])
+
+    # Resolve each distinct spec once (callers may repeat a contract), serving recent contracts from the cache
+    trading_day = now_in_new_york().date()
+    spec_keys = [
+        (trading_day, spec.symbol.upper(), spec.option_type, spec.strike_price, spec.expiration_date)
+        for spec in instrument_specs
+    ]
+    details: dict[tuple, InstrumentDetail] = {}
+    unique_specs: dict[tuple, InstrumentSpec | OrderLeg] = {}
+    for key, spec in zip(spec_keys, instrument_specs, strict=True):
+        if key in details or key in unique_specs:
+            continue
+        cached_detail = _instrument_detail_cache.pop(key, None)
+        if cached_detail is not None:
+            _instrument_detail_cache[key] = cached_detail  # Re-insert as most recently used
+            details[key] = cached_detail
+        else:
+            unique_specs[key] = spec
+    if not unique_specs:
+        return [details[key] for key in spec_keys]
+
+    # Prefetch each distinct underlying's chain index once (multi-leg strategies share an underlying)
+    pending = unique_specs.values()
+    option_symbols = list(dict.fromkeys(spec.symbol.upper() for spec in pending if spec.option_type))
+    chain_indexes = dict(zip(
+        option_symbols,
+        await asyncio.gather(*[get_cached_option_chain_index(session, s) for s in option_symbols]),
+        strict=True
+    ))
+
+    # Fetch all distinct equities in a single batched lookup (cached per symbol)
+    equity_symbols = list(dict.fromkeys(spec.symbol.upper() for spec in pending if not spec.option_type))
+    equities = await _get_cached_equities(session, equity_symbols) if equity_symbols else {}
+
+    resolved = await asyncio.gather(*[lookup_single_instrument(spec) for spec in pending])
+    for key, detail in zip(unique_specs, resolved, strict=True):
+        details[key] = detail
+        _remember_instrument_detail(key, detail)
+    return [details[key] for key in spec_keys]
 
 
 @mcp_app.tool()
@@ -522,9 +881,9 @@ async def get_transaction_history(
     start = date.today() - timedelta(days=days)
 
     trades = await _paginate(
-        lambda offset: context.account.a_get_history(
+        lambda page: context.account.a_get_history(
             session, start_date=start, underlying_symbol=underlying_symbol,
-            type=transaction_type, per_page=250, page_offset=offset
+            type=transaction_type, per_page=250, page_offset=page
         ),
         page_size=250
     )
@@ -543,9 +902,9 @@ async def get_order_history(
     start = date.today() - timedelta(days=days)
 
     orders = await _paginate(
-        lambda offset: context.account.a_get_order_history(
+        lambda page: context.account.a_get_order_history(
             session, start_date=start, underlying_symbol=underlying_symbol,
-            per_page=50, page_offset=offset
+            per_page=50, page_offset=page
         ),
         page_size=50  # Order history API max is 50 per page
     )
@@ -565,20 +924,40 @@ async def get_market_metrics(ctx: Context, symbols: list[str]) -> str:
     return to_table(metrics)
 
 
-def _get_next_open_time(session, current_time: datetime) -> datetime | None:
-    """Determine next market open time based on current status."""
-    if session.status == MarketStatus.PRE_MARKET:
+def _closed_next_open(session, current_time: datetime) -> datetime | None:
+    """Next open for a closed session: today's open if still ahead, else the next session's open."""
+    if session.open_at and current_time < session.open_at:
         return session.open_at
-    if session.status == MarketStatus.CLOSED:
-        if session.open_at and current_time < session.open_at:
-            return session.open_at
-        if session.close_at and current_time > session.close_at and session.next_session:
-            return session.next_session.open_at
-    if session.status == MarketStatus.EXTENDED and session.next_session:
+    if session.close_at and current_time > session.close_at and session.next_session:
         return session.next_session.open_at
     return None
 
 
+# Next-open resolver per market status; statuses not listed (e.g. OPEN) have no next open
+_NEXT_OPEN_BY_STATUS: dict[MarketStatus, Callable[[Any, datetime], datetime | None]] = {
+    MarketStatus.PRE_MARKET: lambda session, _: session.open_at,
+    MarketStatus.CLOSED: _closed_next_open,
+    MarketStatus.EXTENDED: lambda session, _: session.next_session.open_at if session.next_session else None,
+}
+
+
+def _get_next_open_time(session, current_time: datetime) -> datetime | None:
+    """Determine next market open time based on current status."""
+    resolver = _NEXT_OPEN_BY_STATUS.get(session.status)
+    return resolver(session, current_time) if resolver else None
+
+
+def _market_holidays_key_builder(fn, session: Session):
+    """Build cache key from today's date so the calendar is refetched once the day rolls over."""
+    return f"market_holidays:{date.today().isoformat()}"
+
+
+@cached(ttl=3600, cache=Cache.MEMORY, serializer=NullSerializer(), key_builder=_market_holidays_key_builder)
+async def get_cached_market_holidays(session: Session):
+    """Cache the market holiday calendar as it is stable day-over-day."""
+    return await a_get_market_holidays(session)
+
+
 @mcp_app.tool()
 async def market_status(ctx: Context, exchanges: list[Literal['Equity', 'CME', 'CFE', 'Smalls']] | None = None):
     """
@@ -595,7 +974,7 @@ async def market_status(ctx: Context, exchanges: list[Literal['Equity', 'CME', '
         raise ValueError("No market sessions found")
 
     current_time = datetime.now(UTC)
-    calendar = await a_get_market_holidays(session)
+    calendar = await get_cached_market_holidays(session)
     is_holiday = current_time.date() in calendar.holidays
     is_half_day = current_time.date() in calendar.half_days
 
@@ -624,8 +1003,7 @@ async def market_status(ctx: Context, exchanges: list[Literal['Equity', 'CME', '
 async def search_symbols(ctx: Context, symbol: str) -> str:
     """Search for symbols similar to the given search phrase."""
     session = get_valid_session(ctx)
-    async with rate_limiter:
-        results = await a_symbol_search(session, symbol)
+    results = await _rate_limited_call(lambda: a_symbol_search(session, symbol))
     return to_table(results)
 
 
@@ -633,22 +1011,102 @@ async def search_symbols(ctx: Context, symbol: str) -> str:
 # TRADING TOOLS
 # =============================================================================
 
+# Stock legs only take Buy/Sell; option-style actions map by direction
+_EQUITY_ACTION: dict[str, OrderAction] = {
+    action.value: OrderAction.BUY if action.value.startswith('Buy') else OrderAction.SELL for action in OrderAction
+}
+
+
+def _equity_action(action: str) -> OrderAction:
+    """Resolve a stock leg's action, rejecting anything that isn't a buy or sell."""
+    try:
+        return _EQUITY_ACTION[action]
+    except KeyError:
+        raise ValueError(f"Invalid action '{action}' for stock leg. Expected 'Buy' or 'Sell'.") from None
+
+
+@lru_cache(maxsize=256)
+def _quantity_decimal(quantity: int) -> Decimal:
+    """Convert a leg quantity to Decimal (memoized; strategies reuse a few sizes)."""
+    return Decimal(quantity)
+
+
 def build_order_legs(instrument_details: list[InstrumentDetail], legs: list[OrderLeg]) -> list:
     """Build order legs from instrument details and leg specifications."""
     if len(instrument_details) != len(legs):
         raise ValueError(f"Mismatched legs: {len(instrument_details)} instruments vs {len(legs)} leg specs")
 
     built_legs = []
-    for detail, leg_spec in zip(instrument_details, legs, strict=True):
+    for detail, leg_spec in zip(instrument_details, legs, strict=False):  # Lengths checked above
         instrument = detail.instrument
         order_action = (
-            OrderAction(leg_spec.action) if isinstance(instrument, Option)
-            else OrderAction.BUY if leg_spec.action == 'Buy' else OrderAction.SELL
+            OrderAction(leg_spec.action) if isinstance(instrument, Option) else _equity_action(leg_spec.action)
         )
-        built_legs.append(instrument.build_leg(Decimal(str(leg_spec.quantity)), order_action))
+        built_legs.append(instrument.build_leg(_quantity_decimal(leg_spec.quantity), order_action))
     return built_legs
 
 
+def _to_decimal(value: float | Decimal | None) -> Decimal | None:
+    """Convert an optional float price to Decimal via its string form (avoids binary float artifacts)."""
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+class _OrderCategory(IntFlag):
+    """Price requirements of an order type, combined as bit flags."""
+    MARKET = 1
+    LIMIT = 2
+    STOP = 4
+    TRAILING = 8
+    STOP_LIMIT = STOP | LIMIT
+
+
+# Built once at import; TRAILING_STOP is only present in some tastytrade SDK versions
+_ORDER_TYPE_CATEGORY: dict[OrderType, _OrderCategory] = {
+    order_type: category
+    for name, category in (
+        ('MARKET', _OrderCategory.MARKET),
+        ('MARKETABLE_LIMIT', _OrderCategory.MARKET),
+        ('NOTIONAL_MARKET', _OrderCategory.MARKET),
+        ('LIMIT', _OrderCategory.LIMIT),
+        ('STOP', _OrderCategory.STOP),
+        ('STOP_LIMIT', _OrderCategory.STOP_LIMIT),
+        ('TRAILING_STOP', _OrderCategory.TRAILING),
+    )
+    if (order_type := getattr(OrderType, name, None)) is not None
+}
+
+
+def _order_type_key(order_type: str) -> str:
+    """Normalize an order type name so 'StopLimit', 'stop_limit' and 'Stop Limit' compare equal."""
+    return order_type.upper().replace('_', '').replace(' ', '')
+
+
+# Enum lookups built once at import, keyed by both member names and values
+_ORDER_TYPE_BY_KEY: dict[str, OrderType] = {
+    _order_type_key(key): member for member in OrderType for key in (member.name, member.value)
+}
+# Exact spellings (values, names and the tools' CamelCase literals like 'StopLimit') resolve without normalizing
+_ORDER_TYPE_EXACT: dict[str, OrderType] = {
+    key: member for member in OrderType for key in (member.value, member.name, member.value.replace(' ', ''))
+}
+_TIME_IN_FORCE_BY_VALUE: dict[str, OrderTimeInForce] = {member.value: member for member in OrderTimeInForce}
+
+
+def _resolve_order_type(order_type: str) -> OrderType | None:
+    """Resolve an order type string, normalizing only spellings outside the exact table."""
+    order_type_enum = _ORDER_TYPE_EXACT.get(order_type)
+    if order_type_enum is None:
+        order_type_enum = _ORDER_TYPE_BY_KEY.get(_order_type_key(order_type))
+    return order_type_enum
+
+
+def _price_fields(order_type: str) -> _OrderCategory:
+    """Price fields an order type uses; unknown types keep price and stop price, like build_new_order's fallback."""
+    return _ORDER_TYPE_CATEGORY.get(_resolve_order_type(order_type), _OrderCategory.STOP_LIMIT)
+
+
 def build_new_order(
     order_type: str,
     legs: list,
@@ -673,34 +1131,13 @@ def build_new_order(
     Returns:
         Configured NewOrder object
     """
-    # Convert string order_type to enum, handling different naming conventions
-    order_type_upper = order_type.upper().replace('_', '')
-    order_type_mapping = {
-        'MARKET': 'MARKET',
-        'LIMIT': 'LIMIT',
-        'STOP': 'STOP',
-        'STOPLIMIT': 'STOP_LIMIT',
-        'STOP_LIMIT': 'STOP_LIMIT',
-        'TRAILINGSTOP': 'TRAILING_STOP',
-        'TRAILING_STOP': 'TRAILING_STOP'
-    }
-    
-    enum_name = order_type_mapping.get(order_type_upper)
-    if enum_name is None:
-        # Try to use the order_type string directly as enum value name
-        try:
-            order_type_enum = OrderType[order_type_upper]
-        except (KeyError, AttributeError):
-            # Fall back to using the string directly and let OrderType constructor handle it
-            order_type_enum = OrderType(order_type)
-    else:
-        try:
-            order_type_enum = OrderType[enum_name]
-        except (KeyError, AttributeError):
-            # Fall back to using the string directly
-            order_type_enum = OrderType(order_type)
-    
-    time_in_force_enum = OrderTimeInForce(time_in_force)
+    # Resolve enums from the import-time tables; unknown strings go to the enum constructors for their usual error
+    order_type_enum = _resolve_order_type(order_type)
+    if order_type_enum is None:
+        order_type_enum = OrderType(order_type)
+    time_in_force_enum = _TIME_IN_FORCE_BY_VALUE.get(time_in_force)
+    if time_in_force_enum is None:
+        time_in_force_enum = OrderTimeInForce(time_in_force)
     
     # Build base order kwargs
     order_kwargs = {
@@ -709,70 +1146,60 @@ def build_new_order(
         "legs": legs
     }
     
-    # Add parameters based on order type (try enum comparison first, then string fallback)
-    order_type_str = str(order_type_enum).upper()
-    if hasattr(order_type_enum, 'value'):
-        order_type_str = str(order_type_enum.value).upper()
-    
-    # Determine order type category using string matching (works regardless of enum naming)
-    is_market = 'MARKET' in order_type_str
-    is_limit_only = 'LIMIT' in order_type_str and 'STOP' not in order_type_str
-    is_stop_limit = 'STOP' in order_type_str and 'LIMIT' in order_type_str
-    is_stop_only = 'STOP' in order_type_str and 'TRAILING' not in order_type_str and 'LIMIT' not in order_type_str
-    is_trailing_stop = 'TRAILING' in order_type_str or 'TRAIL' in order_type_str
-    
-    if is_market:
-        # Market orders don't need price
-        pass
-    elif is_limit_only:
-        if price is None:
-            raise ValueError("price is required for Limit orders")
-        order_kwargs["price"] = price
-    elif is_stop_limit:
-        if price is None:
-            raise ValueError("price is required for StopLimit orders")
-        if stop_price is None:
-            raise ValueError("stop_price is required for StopLimit orders")
-        order_kwargs["price"] = price
-        order_kwargs["stop_price"] = stop_price
-    elif is_stop_only:
-        if stop_price is None:
-            raise ValueError("stop_price is required for Stop orders")
-        order_kwargs["stop_price"] = stop_price
-    elif is_trailing_stop:
-        if trail_price is None and trail_percent is None:
-            raise ValueError("trail_price or trail_percent is required for TrailingStop orders")
-        if trail_price is not None:
-            order_kwargs["trail_price"] = trail_price
-        if trail_percent is not None:
-            order_kwargs["trail_percent"] = trail_percent
-    else:
-        # For unknown order types, try to use price if provided
-        if price is not None:
+    # Attach price fields by category (NewOrder calls the stop price stop_trigger)
+    match _ORDER_TYPE_CATEGORY.get(order_type_enum):
+        case _OrderCategory.MARKET:
+            # Market orders don't need price
+            pass
+        case _OrderCategory.LIMIT:
+            if price is None:
+                raise ValueError("price is required for Limit orders")
             order_kwargs["price"] = price
-        if stop_price is not None:
-            order_kwargs["stop_price"] = stop_price
-    
-    return NewOrder(**order_kwargs)
-
+        case _OrderCategory.STOP_LIMIT:
+            if price is None:
+                raise ValueError("price is required for StopLimit orders")
+            if stop_price is None:
+                raise ValueError("stop_price is required for StopLimit orders")
+            order_kwargs["price"] = price
+            order_kwargs["stop_trigger"] = stop_price
+        case _OrderCategory.STOP:
+            if stop_price is None:
+                raise ValueError("stop_price is required for Stop orders")
+            order_kwargs["stop_trigger"] = stop_price
+        case _OrderCategory.TRAILING:
+            if trail_price is None and trail_percent is None:
+                raise ValueError("trail_price or trail_percent is required for TrailingStop orders")
+            if trail_price is not None:
+                order_kwargs["trail_price"] = trail_price
+            if trail_percent is not None:
+                order_kwargs["trail_percent"] = trail_percent
+        case _:
+            # For unknown order types, try to use price if provided
+            if price is not None:
+                order_kwargs["price"] = price
+            if stop_price is not None:
+                order_kwargs["stop_trigger"] = stop_price
 
-async def _fetch_quotes_raw(session: Session, instrument_details: list[InstrumentDetail], timeout: float = 10.0) -> list[Any]:
-    """Fetch raw Quote objects for price calculations (internal use)."""
-    return await _stream_events(session, Quote, [d.streamer_symbol for d in instrument_details], timeout)
+    return NewOrder(**order_kwargs)
 
 
 async def calculate_net_price(ctx: Context, instrument_details: list[InstrumentDetail], legs: list[OrderLeg]) -> float:
-    """Calculate net price from current market quotes."""
-    session = get_valid_session(ctx)
-    quotes = await _fetch_quotes_raw(session, instrument_details)
+    """Calculate net price from current market quotes, served by the shared quote cache when available."""
+    quote_cache = get_context(ctx).quote_cache
+    streamer_symbols = [d.streamer_symbol for d in instrument_details]
+    if quote_cache is not None:
+        quotes = await quote_cache.get_quotes(streamer_symbols)
+    else:
+        quotes = await _stream_events(get_valid_session(ctx), Quote, streamer_symbols, 10.0)
+
+    if not len(quotes) == len(instrument_details) == len(legs):
+        raise ValueError(f"Mismatched legs: {len(quotes)} quotes, {len(instrument_details)} instruments, {len(legs)} leg specs")
 
+    # Validate and accumulate in one pass; buying pays the mid (debit), selling receives it (credit)
     net_price = 0.0
-    for quote, detail, leg in zip(quotes, instrument_details, legs, strict=True):
-        if quote.bid_price is not None and quote.ask_price is not None:
-            mid_price = float(quote.bid_price + quote.ask_price) / 2
-            leg_price = -mid_price if leg.action.startswith('Buy') else mid_price
-            net_price += leg_price * leg.quantity
-        else:
+    for quote, detail, leg in zip(quotes, instrument_details, legs, strict=False):  # Lengths checked above
+        bid, ask = quote.bid_price, quote.ask_price
+        if bid is None or ask is None:
             inst = detail.instrument
             symbol_info = (
                 f"{inst.underlying_symbol} {inst.option_type.value}{inst.strike_price} {inst.expiration_date}"
@@ -780,16 +1207,39 @@ async def calculate_net_price(ctx: Context, instrument_details: list[InstrumentD
             )
             logger.warning(f"Could not get bid/ask prices for {symbol_info}")
             raise ValueError(f"Could not get bid/ask for {symbol_info}")
+        net_price += float(bid + ask) * leg.signed_quantity
+    net_price /= 2  # Halve once after summing bid+ask
 
     return round(net_price * 100) / 100
 
 
+def invalidate_live_orders(context: ServerContext) -> None:
+    """Drop the cached live orders after an order mutation."""
+    context.live_orders = None
+    context.live_orders_generation += 1
+
+
+async def get_live_orders_by_id(context: ServerContext, session: Session) -> dict[str, PlacedOrder]:
+    """Get live orders indexed by id, refetching only when the cached fetch is older than the TTL."""
+    # Serialize refreshes so concurrent callers share one fetch
+    async with context.live_orders_lock:
+        if context.live_orders and time.monotonic() - context.live_orders[0] < LIVE_ORDERS_CACHE_TTL:
+            return context.live_orders[1]
+        generation = context.live_orders_generation
+        orders = await context.account.a_get_live_orders(session)
+        orders_by_id = {str(order.id): order for order in orders}
+        # An order mutated during the fetch may be missing from it, so only cache a fetch nothing invalidated
+        if context.live_orders_generation == generation:
+            context.live_orders = (time.monotonic(), orders_by_id)
+        return orders_by_id
+
+
 @mcp_app.tool()
 async def get_live_orders(ctx: Context) -> str:
     context = get_context(ctx)
     session = get_valid_session(ctx)
-    orders = await context.account.a_get_live_orders(session)
-    return to_table(orders)
+    orders = await get_live_orders_by_id(context, session)
+    return to_table(list(orders.values()))
 
 
 @mcp_app.tool()
@@ -841,35 +1291,39 @@ async def place_order(
 
         context = get_context(ctx)
         session = get_valid_session(ctx)
-        # Convert OrderLeg to InstrumentSpec for instrument lookup
-        instrument_specs = [
-            InstrumentSpec(
-                symbol=leg.symbol,
-                option_type=leg.option_type,
-                strike_price=leg.strike_price,
-                expiration_date=leg.expiration_date
-            )
-            for leg in legs
-        ]
-        instrument_details = await get_instrument_details(session, instrument_specs)
-        built_legs = build_order_legs(instrument_details, legs)
         
-        # Convert prices to Decimal
-        price_decimal = Decimal(str(price)) if price is not None else None
-        stop_price_decimal = Decimal(str(stop_price)) if stop_price is not None else None
-        trail_price_decimal = Decimal(str(trail_price)) if trail_price is not None else None
-        trail_percent_decimal = Decimal(str(trail_percent)) if trail_percent is not None else None
+        # Convert only the prices this order type uses (Market orders need none)
+        price_fields = _price_fields(order_type)
+        price_decimal = _to_decimal(price) if price_fields & _OrderCategory.LIMIT else None
+        stop_price_decimal = _to_decimal(stop_price) if price_fields & _OrderCategory.STOP else None
+        trail_price_decimal = _to_decimal(trail_price) if price_fields & _OrderCategory.TRAILING else None
+        trail_percent_decimal = _to_decimal(trail_percent) if price_fields & _OrderCategory.TRAILING else None
         
-        # For Limit and StopLimit orders, calculate price if not provided
+        # Legs expose the same lookup fields as InstrumentSpec, so resolve them directly.
+        # For Limit and StopLimit orders without a price, the net mid-price is calculated from quotes.
         if order_type in ['Limit', 'StopLimit'] and price_decimal is None:
+            # Connect the shared quote streamer (a no-op once open) while instruments resolve
+            connecting = context.quote_cache.connect() if context.quote_cache is not None else asyncio.sleep(0)
+            instrument_details, connected = await asyncio.gather(
+                get_instrument_details(session, legs),
+                connecting,
+                return_exceptions=True
+            )
+            if isinstance(instrument_details, BaseException):
+                raise instrument_details
             try:
+                if isinstance(connected, BaseException):
+                    raise connected
                 calculated_price = await calculate_net_price(ctx, instrument_details, legs)
-                price_decimal = Decimal(str(calculated_price))
-                await ctx.info(f"💰 Auto-calculated net mid-price: ${float(price_decimal):.2f}")
-                logger.info(f"Auto-calculated price ${float(price_decimal):.2f} for {len(legs)}-leg {order_type} order")
             except Exception as e:
                 logger.warning(f"Failed to auto-calculate price for order legs {[leg.symbol for leg in legs]}: {e!s}")
                 raise ValueError(f"Could not fetch quotes for price calculation: {e!s}. Please provide a price.") from e
+            price_decimal = Decimal(str(calculated_price))
+            await ctx.info(f"💰 Auto-calculated net mid-price: ${float(price_decimal):.2f}")
+            logger.info(f"Auto-calculated price ${float(price_decimal):.2f} for {len(legs)}-leg {order_type} order")
+        else:
+            instrument_details = await get_instrument_details(session, legs)
+        built_legs = build_order_legs(instrument_details, legs)
         
         # Build and place the order
         try:
@@ -889,7 +1343,10 @@ async def place_order(
 
         try:
             result = await context.account.a_place_order(session, new_order, dry_run=dry_run)
-            return result.model_dump()
+            if not dry_run:
+                invalidate_live_orders(context)
+            # Unset fields are mostly null on order responses; leaving them out trims the tool output
+            return result.model_dump(exclude_none=True)
         except Exception as e:
             error_msg = f"Failed to place order: {str(e)}"
             logger.error(f"place_order tool execution error: {error_msg}", exc_info=True)
@@ -920,26 +1377,35 @@ async def replace_order(
         context = get_context(ctx)
         session = get_valid_session(ctx)
 
-        # Get the existing order
-        live_orders = await context.account.a_get_live_orders(session)
-        existing_order = next((order for order in live_orders if str(order.id) == order_id), None)
+        # Get the existing order from the cached index; refetch once on a miss in case it is stale
+        live_orders = await get_live_orders_by_id(context, session)
+        existing_order = live_orders.get(order_id)
+        if existing_order is None:
+            invalidate_live_orders(context)
+            live_orders = await get_live_orders_by_id(context, session)
+            existing_order = live_orders.get(order_id)
 
         if not existing_order:
-            live_order_ids = [str(order.id) for order in live_orders]
+            live_order_ids = list(live_orders)
             logger.warning(f"Order {order_id} not found in live orders. Available orders: {live_order_ids}")
             raise ValueError(f"Order {order_id} not found in live orders")
 
         # Replace order with modified price
-        return (await context.account.a_replace_order(
+        result = await context.account.a_replace_order(
             session,
             int(order_id),
             NewOrder(
                 time_in_force=existing_order.time_in_force,
                 order_type=existing_order.order_type,
                 legs=existing_order.legs,
-                price=Decimal(str(price))
+                price=Decimal(str(price)),
+                # Carry over the trigger and GTD date so stop and GTD orders keep their terms
+                stop_trigger=Decimal(existing_order.stop_trigger) if existing_order.stop_trigger else None,
+                gtc_date=existing_order.gtc_date
             )
-        )).model_dump()
+        )
+        invalidate_live_orders(context)
+        return result.model_dump(exclude_none=True)
 
 
 @mcp_app.tool()
@@ -948,9 +1414,44 @@ async def delete_order(ctx: Context, order_id: str) -> dict[str, Any]:
     context = get_context(ctx)
     session = get_valid_session(ctx)
     await context.account.a_delete_order(session, int(order_id))
+    invalidate_live_orders(context)
     return {"success": True, "order_id": order_id}
 
 
+@mcp_app.tool()
+async def delete_orders(ctx: Context, order_ids: list[str]) -> dict[str, Any]:
+    """
+    Cancel several orders concurrently.
+
+    Args:
+        order_ids: IDs of the orders to cancel
+
+    Returns per-order results; one failed cancellation doesn't stop the others.
+    """
+    if not order_ids:
+        raise ValueError("At least one order_id is required")
+
+    context = get_context(ctx)
+    session = get_valid_session(ctx)
+
+    async def cancel(order_id: str) -> None:
+        # The shared limiter paces the concurrent deletes under the API rate limit
+        async with rate_limiter:
+            await context.account.a_delete_order(session, int(order_id))
+
+    outcomes = await asyncio.gather(*[cancel(order_id) for order_id in order_ids], return_exceptions=True)
+    invalidate_live_orders(context)
+
+    results = []
+    for order_id, outcome in zip(order_ids, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            logger.warning(f"Failed to cancel order {order_id}: {outcome}")
+            results.append({"order_id": order_id, "success": False, "error": str(outcome)})
+        else:
+            results.append({"order_id": order_id, "success": True})
+    return {"success": all(r["success"] for r in results), "results": results}
+
+
 # =============================================================================
 # WATCHLIST TOOLS
 # =============================================================================
@@ -975,6 +1476,12 @@ async def get_watchlists(
     return [w.model_dump() for w in await watchlist_class.a_get(session)]
 
 
+@lru_cache(maxsize=16)
+def _instrument_type(value: str) -> InstrumentType:
+    """Resolve an instrument type string to its enum member (memoized; only a handful exist)."""
+    return InstrumentType(value)
+
+
 @mcp_app.tool()
 async def manage_private_watchlist(
     ctx: Context,
@@ -1011,10 +1518,10 @@ async def manage_private_watchlist(
     if action == "add":
         try:
             watchlist = await PrivateWatchlist.a_get(session, name)
-            for symbol_spec in symbols:
-                symbol = symbol_spec.symbol
-                instrument_type = InstrumentType(symbol_spec.instrument_type)
-                watchlist.add_symbol(symbol, instrument_type)
+            # Bulk-append entries in the same shape PrivateWatchlist.add_symbol uses
+            watchlist.watchlist_entries = (watchlist.watchlist_entries or []) + [
+                {"symbol": s.symbol, "instrument-type": _instrument_type(s.instrument_type)} for s in symbols
+            ]
             await watchlist.a_update(session)
             logger.info(f"Added {len(symbols)} symbols to existing watchlist '{name}'")
 
@@ -1035,10 +1542,16 @@ async def manage_private_watchlist(
     else:
         try:
             watchlist = await PrivateWatchlist.a_get(session, name)
-            for symbol_spec in symbols:
-                symbol = symbol_spec.symbol
-                instrument_type = InstrumentType(symbol_spec.instrument_type)
-                watchlist.remove_symbol(symbol, instrument_type)
+            # Filter entries in one pass instead of a list.remove() scan per symbol
+            to_remove = {(s.symbol, _instrument_type(s.instrument_type).value) for s in symbols}
+            entries = watchlist.watchlist_entries or []
+            present = {(e["symbol"], _instrument_type(e["instrument-type"]).value) for e in entries}
+            missing = to_remove - present
+            if missing:
+                raise ValueError(f"Symbols not in watchlist: {sorted(missing)}")
+            watchlist.watchlist_entries = [
+                e for e in entries if (e["symbol"], _instrument_type(e["instrument-type"]).value) not in to_remove
+            ]
             await watchlist.a_update(session)
             logger.info(f"Removed {len(symbols)} symbols from watchlist '{name}'")
 
@@ -2,15 +2,77 @@
 Supabase database client for tasty-agent
 Handles direct database queries for API key validation and credential lookup
 """
+import asyncio
 import os
+import hashlib
+import hmac
 import logging
-from typing import Optional, Dict, Any
+import secrets
+import time
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
+from ipaddress import IPv4Address, IPv6Address, ip_address, ip_network
 import asyncpg
 import bcrypt
 
 logger = logging.getLogger(__name__)
 
+# Successful validations are reused for the same key and client IP for this long, skipping
+# bcrypt and the database round-trip on repeat requests
+VALIDATION_CACHE_TTL = 60.0
+VALIDATION_CACHE_SIZE = 1024
+VERIFIED_HASH_CACHE_SIZE = 1024
+REJECTED_HASH_CACHE_SIZE = 4096
+
+# Private and loopback ranges a reverse proxy would forward from, and Tailscale's CGNAT range
+_INTERNAL_NETWORKS = tuple(
+    ip_network(n) for n in ("10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16", "127.0.0.0/8", "::1/128")
+)
+_TAILSCALE_NETWORK = ip_network("100.64.0.0/10")
+
+
+def _parse_ip(value: str) -> Optional[IPv4Address | IPv6Address]:
+    """Parse an IP address string, returning None for hostnames and malformed values."""
+    try:
+        return ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+# Validation queries. asyncpg prepares each statement once per pooled connection and reuses it
+# from the connection's statement cache on every later call with the same text.
+API_KEY_DEVICES_SQL = """
+    SELECT 
+        d.id as device_id,
+        d.device_id as device_identifier,
+        d.api_key_hash,
+        d.api_key_prefix,
+        d.api_key_expires_at,
+        d.tailscale_ip
+    FROM public.gamma_devices d
+    WHERE d.api_key_hash IS NOT NULL
+"""
+DEVICE_CREDENTIALS_SQL = """
+    SELECT 
+        d.id as device_id,
+        d.device_id as device_identifier,
+        d.user_id,
+        d.tastytrade_account_id,
+        d.tastytrade_client_secret,
+        d.tastytrade_refresh_token,
+        bc.account_id,
+        bc.client_secret,
+        bc.refresh_token
+    FROM public.gamma_devices d
+    LEFT JOIN public.broker_connections bc ON d.user_id = bc.user_id AND bc.is_active = true
+    WHERE d.id = $1
+"""
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Decode uuid columns straight to text on every pooled connection (ids are only used as strings)."""
+    await conn.set_type_codec('uuid', encoder=str, decoder=str, schema='pg_catalog', format='text')
+
 
 class SupabaseClient:
     """Client for querying Supabase PostgreSQL database"""
@@ -33,16 +95,30 @@ class SupabaseClient:
             pass
         
         self._pool: Optional[asyncpg.Pool] = None
+        # (sha256(api_key), client_ip) -> (monotonic time cached, key expiry, validation result)
+        self._validation_cache: Dict[Tuple[bytes, Optional[str]], Tuple[float, Optional[datetime], Dict[str, Any]]] = {}
+        # Stored bcrypt hash -> HMAC of the key it verified, under a per-process secret. Later checks
+        # against an unchanged hash compare HMACs in constant time instead of re-running bcrypt.
+        self._hmac_secret = secrets.token_bytes(32)
+        self._verified_hashes: Dict[str, bytes] = {}
+        # (HMAC of key, stored hash) pairs bcrypt has already rejected, so retries of the same key
+        # skip the non-matching devices' hashes. A bcrypt mismatch for a fixed pair never changes.
+        self._rejected_hashes: Dict[Tuple[bytes, str], None] = {}
+        # Concurrent bcrypt checks (each holds a worker thread), across all requests
+        self._bcrypt_slots = asyncio.Semaphore(os.cpu_count() or 4)
     
     async def connect(self):
         """Create database connection pool"""
         if self._pool is None:
             try:
+                # Postgres max_connections must cover DB_POOL_MAX across every server worker
                 self._pool = await asyncpg.create_pool(
                     self.database_url,
-                    min_size=1,
-                    max_size=5,
-                    command_timeout=60
+                    min_size=int(os.getenv("DB_POOL_MIN", "5")),
+                    max_size=int(os.getenv("DB_POOL_MAX", "25")),
+                    max_inactive_connection_lifetime=300,
+                    command_timeout=30,
+                    init=_init_connection
                 )
                 logger.info("Connected to Supabase database")
             except Exception as e:
@@ -56,12 +132,33 @@ class SupabaseClient:
             self._pool = None
             logger.info("Closed Supabase database connection")
     
+    @staticmethod
+    def _api_key_digest(api_key: str) -> bytes:
+        """Digest identifying an API key in the validation cache (the plaintext is never stored)."""
+        return hashlib.sha256(api_key.encode('utf-8')).digest()
+    
+    def _key_hmac(self, api_key: str) -> bytes:
+        """HMAC of an API key under the per-process secret, used to remember hash check results."""
+        return hmac.new(self._hmac_secret, api_key.encode('utf-8'), hashlib.sha256).digest()
+    
+    def invalidate(self, api_key: str) -> None:
+        """Drop cached validations and hash check results for an API key (for every client IP), e.g. after its credentials change."""
+        digest = self._api_key_digest(api_key)
+        for cache_key in [k for k in self._validation_cache if k[0] == digest]:
+            del self._validation_cache[cache_key]
+        key_hmac = self._key_hmac(api_key)
+        for pair in [p for p in self._rejected_hashes if p[0] == key_hmac]:
+            del self._rejected_hashes[pair]
+    
     async def validate_kiosk_api_key(
         self, api_key: str, client_ip: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Validate API key and return device/user information.
         
+        Successful validations are cached per key and client IP for VALIDATION_CACHE_TTL seconds;
+        cache hits still enforce the key's expiry.
+        
         Args:
             api_key: Plain text API key to validate
             client_ip: Client IP address for validation (optional, but recommended)
@@ -70,142 +167,196 @@ class SupabaseClient:
             Dict with device_id, user_id, account_id, client_secret, refresh_token
             or None if invalid or IP mismatch
         """
+        cache_key = (self._api_key_digest(api_key), client_ip)
+        cached = self._validation_cache.get(cache_key)
+        if cached:
+            cached_at, expires_at, info = cached
+            if (time.monotonic() - cached_at < VALIDATION_CACHE_TTL
+                    and not (expires_at and expires_at < datetime.now(timezone.utc))):
+                return dict(info)
+            del self._validation_cache[cache_key]
+        
+        verified = await self._verify_kiosk_api_key(api_key, client_ip)
+        if verified is None:
+            return None
+        info, expires_at = verified
+        self._validation_cache[cache_key] = (time.monotonic(), expires_at, info)
+        if len(self._validation_cache) > VALIDATION_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            del self._validation_cache[next(iter(self._validation_cache))]
+        return dict(info)
+    
+    async def _check_api_key_hash(self, api_key: str, key_hmac: bytes, api_key_hash: str) -> bool:
+        """Check an API key against a stored bcrypt hash, using bcrypt only the first time a key/hash pair is seen."""
+        known_hmac = self._verified_hashes.get(api_key_hash)
+        if known_hmac is not None:
+            return hmac.compare_digest(known_hmac, key_hmac)
+        if (key_hmac, api_key_hash) in self._rejected_hashes:
+            return False
+        
+        # bcrypt is deliberately slow; run it off the event loop
+        if not await asyncio.to_thread(bcrypt.checkpw, api_key.encode('utf-8'), api_key_hash.encode('utf-8')):
+            self._rejected_hashes[(key_hmac, api_key_hash)] = None
+            if len(self._rejected_hashes) > REJECTED_HASH_CACHE_SIZE:
+                del self._rejected_hashes[next(iter(self._rejected_hashes))]
+            return False
+        self._verified_hashes[api_key_hash] = key_hmac
+        if len(self._verified_hashes) > VERIFIED_HASH_CACHE_SIZE:
+            del self._verified_hashes[next(iter(self._verified_hashes))]
+        return True
+    
+    async def _checked_hash(self, api_key: str, key_hmac: bytes, api_key_hash: str) -> bool:
+        """Hash check bounded to one bcrypt per CPU, treating a malformed stored hash as a mismatch."""
+        async with self._bcrypt_slots:
+            try:
+                return await self._check_api_key_hash(api_key, key_hmac, api_key_hash)
+            except ValueError as e:
+                # Malformed stored hash (bcrypt raises "Invalid salt"); skip this device
+                logger.debug(f"Failed to verify API key hash: {e}")
+                return False
+    
+    async def _find_device_row(self, api_key: str, rows: list) -> Optional[Any]:
+        """Return the device row whose stored hash matches the API key, or None."""
+        # Devices store the key's plaintext prefix next to its hash. Verify prefix matches first so
+        # a valid key usually costs one bcrypt check; the rest are still tried in case the prefix
+        # is missing or stored in a different form.
+        prefixed, others = [], []
+        for row in rows:
+            if not row['api_key_hash']:
+                continue
+            prefix = row['api_key_prefix']
+            (prefixed if prefix and api_key.startswith(prefix) else others).append(row)
+        
+        # bcrypt releases the GIL, so each batch is checked in parallel threads
+        key_hmac = self._key_hmac(api_key)
+        for batch in (prefixed, others):
+            results = await asyncio.gather(
+                *(self._checked_hash(api_key, key_hmac, row['api_key_hash']) for row in batch)
+            )
+            for row, matched in zip(batch, results, strict=True):
+                if matched:
+                    return row
+        return None
+    
+    async def _verify_kiosk_api_key(
+        self, api_key: str, client_ip: Optional[str]
+    ) -> Optional[Tuple[Dict[str, Any], Optional[datetime]]]:
+        """Look up and verify an API key against the database, returning the result and the key's expiry."""
         if not self._pool:
             await self.connect()
         
-        # Get all devices with API keys and check each one
+        # Get the hash and IP binding of every device with an API key (credentials are only fetched
+        # for the matching device), releasing the connection before the (slow) hash checks
         async with self._pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT 
-                    d.id as device_id,
-                    d.device_id as device_identifier,
-                    d.api_key_hash,
-                    d.api_key_expires_at,
-                    d.tailscale_ip,
-                    d.user_id,
-                    d.tastytrade_account_id,
-                    d.tastytrade_client_secret,
-                    d.tastytrade_refresh_token,
-                    bc.account_id,
-                    bc.client_secret,
-                    bc.refresh_token
-                FROM public.gamma_devices d
-                LEFT JOIN public.broker_connections bc ON d.user_id = bc.user_id AND bc.is_active = true
-                WHERE d.api_key_hash IS NOT NULL
-            """)
+            rows = await conn.fetch(API_KEY_DEVICES_SQL)
             
-            # Check each device's API key hash
-            for row in rows:
-                api_key_hash = row['api_key_hash']
-                if not api_key_hash:
-                    continue
-                
-                # Verify API key against hash
-                try:
-                    api_key_bytes = api_key.encode('utf-8')
-                    hash_bytes = api_key_hash.encode('utf-8')
-                    if bcrypt.checkpw(api_key_bytes, hash_bytes):
-                        # Check expiration
-                        expires_at = row['api_key_expires_at']
-                        if expires_at and expires_at < datetime.now(timezone.utc):
-                            logger.warning(f"API key for device {row['device_identifier']} has expired")
-                            return None
-                        
-                        # Validate IP address - REQUIRED if device has tailscale_ip configured
-                        tailscale_ip = row['tailscale_ip']
-                        if tailscale_ip:
-                            if not client_ip or client_ip == "unknown":
-                                logger.error(
-                                    f"❌ Device {row['device_identifier']} requires IP validation "
-                                    f"(tailscale_ip: {tailscale_ip}) but no valid client IP provided (got: {client_ip})"
-                                )
-                                return None
-                            
-                            # Reject if client IP looks like a proxy/internal IP and doesn't match
-                            # This prevents validation bypass when reverse proxy doesn't forward real IP
-                            is_internal_ip = (
-                                client_ip.startswith("192.168.") or
-                                client_ip.startswith("10.") or
-                                client_ip.startswith("172.") or
-                                client_ip.startswith("127.") or
-                                client_ip == "localhost"
-                            )
-                            
-                            # Allow direct local network access for 192.168.1.175 (testing/dev)
-                            if client_ip == "192.168.1.175":
-                                logger.info(f"✅ Allowing direct access from 192.168.1.175 for device {row['device_identifier']}")
-                                # Continue to IP matching below
-                            # If we got an internal IP but the tailscale_ip is a Tailscale IP (100.x.x.x),
-                            # this means the reverse proxy isn't forwarding the real client IP
-                            elif is_internal_ip and tailscale_ip.startswith("100."):
-                                logger.error(
-                                    f"❌ SECURITY: Device {row['device_identifier']} requires Tailscale IP validation "
-                                    f"(tailscale_ip: {tailscale_ip}) but got internal/proxy IP '{client_ip}'. "
-                                    f"Reverse proxy is not forwarding real client IP. REJECTING REQUEST."
-                                )
-                                return None
-                            
-                            # Strict IP comparison - must match exactly
-                            # Allow 192.168.1.175 for direct local access (testing/dev)
-                            if client_ip.strip() == "192.168.1.175":
-                                logger.info(f"✅ Allowing direct access from 192.168.1.175 for device {row['device_identifier']}")
-                            elif client_ip.strip() != tailscale_ip.strip():
-                                logger.error(
-                                    f"❌ IP MISMATCH for device {row['device_identifier']}: "
-                                    f"expected '{tailscale_ip}', got '{client_ip}' - REJECTING REQUEST"
-                                )
-                                return None
-                            
-                            logger.info(
-                                f"✅ IP validation passed for device {row['device_identifier']}: "
-                                f"client IP '{client_ip}' matches tailscale_ip '{tailscale_ip}'"
-                            )
-                        else:
-                            # Device has no tailscale_ip configured - this is a security risk
-                            logger.warning(
-                                f"⚠️  Device {row['device_identifier']} has no tailscale_ip configured - "
-                                f"IP validation is DISABLED (client IP: {client_ip}). "
-                                f"This is a security risk and should be configured."
-                            )
-                        
-                        # Prioritize direct TastyTrade credentials on the device
-                        if (row['tastytrade_account_id'] and 
-                            row['tastytrade_client_secret'] and 
-                            row['tastytrade_refresh_token']):
-                            logger.info(f"API key validated for device {row['device_identifier']} using direct credentials")
-                            return {
-                                'device_id': str(row['device_id']),
-                                'device_identifier': row['device_identifier'],
-                                'user_id': str(row['user_id']) if row['user_id'] else "N/A",
-                                'account_id': row['tastytrade_account_id'],
-                                'client_secret': row['tastytrade_client_secret'],
-                                'refresh_token': row['tastytrade_refresh_token']
-                            }
-                        
-                        # Fallback to user_id and broker_connections if direct credentials are not present
-                        if not row['user_id']:
-                            logger.warning(f"Device {row['device_identifier']} is not linked to a user and has no direct credentials")
-                            return None
-                        
-                        if not row['account_id'] or not row['client_secret'] or not row['refresh_token']:
-                            logger.warning(f"User {row['user_id']} does not have active broker connection")
-                            return None
-                        
-                        logger.info(f"API key validated for device {row['device_identifier']}, user {row['user_id']} using broker connection")
-                        
-                        return {
-                            'device_id': str(row['device_id']),
-                            'device_identifier': row['device_identifier'],
-                            'user_id': str(row['user_id']),
-                            'account_id': row['account_id'],
-                            'client_secret': row['client_secret'],
-                            'refresh_token': row['refresh_token']
-                        }
-                except (ValueError, TypeError, Exception) as e:
-                    logger.debug(f"Failed to verify API key hash: {e}")
-                    continue
+        row = await self._find_device_row(api_key, rows)
+        if row is None:
+            return None
         
-        return None
+        # Check expiration
+        expires_at = row['api_key_expires_at']
+        if expires_at and expires_at < datetime.now(timezone.utc):
+            logger.warning(f"API key for device {row['device_identifier']} has expired")
+            return None
+        
+        # Validate IP address - REQUIRED if device has tailscale_ip configured
+        tailscale_ip = row['tailscale_ip']
+        if tailscale_ip:
+            if not client_ip or client_ip == "unknown":
+                logger.error(
+                    f"❌ Device {row['device_identifier']} requires IP validation "
+                    f"(tailscale_ip: {tailscale_ip}) but no valid client IP provided (got: {client_ip})"
+                )
+                return None
+            
+            # Reject if client IP looks like a proxy/internal IP and doesn't match
+            # This prevents validation bypass when reverse proxy doesn't forward real IP
+            client_addr = _parse_ip(client_ip)
+            is_internal_ip = client_ip == "localhost" or (
+                client_addr is not None and any(client_addr in net for net in _INTERNAL_NETWORKS)
+            )
+            tailscale_addr = _parse_ip(tailscale_ip)
+            is_tailscale_ip = tailscale_addr is not None and tailscale_addr in _TAILSCALE_NETWORK
+            
+            # Allow direct local network access for 192.168.1.175 (testing/dev)
+            if client_ip == "192.168.1.175":
+                logger.info(f"✅ Allowing direct access from 192.168.1.175 for device {row['device_identifier']}")
+                # Continue to IP matching below
+            # If we got an internal IP but the tailscale_ip is a Tailscale IP (100.x.x.x),
+            # this means the reverse proxy isn't forwarding the real client IP
+            elif is_internal_ip and is_tailscale_ip:
+                logger.error(
+                    f"❌ SECURITY: Device {row['device_identifier']} requires Tailscale IP validation "
+                    f"(tailscale_ip: {tailscale_ip}) but got internal/proxy IP '{client_ip}'. "
+                    f"Reverse proxy is not forwarding real client IP. REJECTING REQUEST."
+                )
+                return None
+            
+            # Strict IP comparison - must match exactly
+            # Allow 192.168.1.175 for direct local access (testing/dev)
+            if client_ip.strip() == "192.168.1.175":
+                logger.info(f"✅ Allowing direct access from 192.168.1.175 for device {row['device_identifier']}")
+            elif client_ip.strip() != tailscale_ip.strip():
+                logger.error(
+                    f"❌ IP MISMATCH for device {row['device_identifier']}: "
+                    f"expected '{tailscale_ip}', got '{client_ip}' - REJECTING REQUEST"
+                )
+                return None
+            
+            logger.info(
+                f"✅ IP validation passed for device {row['device_identifier']}: "
+                f"client IP '{client_ip}' matches tailscale_ip '{tailscale_ip}'"
+            )
+        else:
+            # Device has no tailscale_ip configured - this is a security risk
+            logger.warning(
+                f"⚠️  Device {row['device_identifier']} has no tailscale_ip configured - "
+                f"IP validation is DISABLED (client IP: {client_ip}). "
+                f"This is a security risk and should be configured."
+            )
+        
+        # Fetch credentials for the matched device only
+        async with self._pool.acquire() as conn:
+            row = await conn.fetchrow(DEVICE_CREDENTIALS_SQL, row['device_id'])
+        if row is None:
+            logger.warning("Device was removed while its API key was being validated")
+            return None
+        
+        # Prioritize direct TastyTrade credentials on the device
+        if (row['tastytrade_account_id'] and 
+            row['tastytrade_client_secret'] and 
+            row['tastytrade_refresh_token']):
+            logger.info(f"API key validated for device {row['device_identifier']} using direct credentials")
+            return {
+                'device_id': row['device_id'],
+                'device_identifier': row['device_identifier'],
+                'user_id': row['user_id'] or "N/A",
+                'account_id': row['tastytrade_account_id'],
+                'client_secret': row['tastytrade_client_secret'],
+                'refresh_token': row['tastytrade_refresh_token']
+            }, expires_at
+        
+        # Fallback to user_id and broker_connections if direct credentials are not present
+        if not row['user_id']:
+            logger.warning(f"Device {row['device_identifier']} is not linked to a user and has no direct credentials")
+            return None
+        
+        if not row['account_id'] or not row['client_secret'] or not row['refresh_token']:
+            logger.warning(f"User {row['user_id']} does not have active broker connection")
+            return None
+        
+        logger.info(f"API key validated for device {row['device_identifier']}, user {row['user_id']} using broker connection")
+        
+        return {
+            'device_id': row['device_id'],
+            'device_identifier': row['device_identifier'],
+            'user_id': row['user_id'],
+            'account_id': row['account_id'],
+            'client_secret': row['client_secret'],
+            'refresh_token': row['refresh_token']
+        }, expires_at
+    
     
     async def __aenter__(self):
         await self.connect()
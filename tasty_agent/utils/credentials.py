@@ -18,6 +18,15 @@ def unpack_credentials(creds: dict[str, Any] | tuple[str, str] | list[str]) -> t
         ValueError: If credentials cannot be unpacked or are missing required fields
         TypeError: If credentials are in an unexpected format
     """
+    # Fast path: the credential stores hand back (client_secret, refresh_token) tuples
+    if type(creds) is tuple and len(creds) == 2:
+        client_secret, refresh_token = creds
+        if not client_secret or not refresh_token:
+            raise ValueError(
+                "Missing client_secret or refresh_token in credentials tuple/list"
+            )
+        return creds
+    
     if isinstance(creds, dict):
         client_secret = creds.get('client_secret')
         refresh_token = creds.get('refresh_token')
@@ -2,20 +2,31 @@
 import os
 from typing import Optional
 
+from httpx import AsyncClient, Limits
 from tastytrade import Account, Session
 
+# Connection pool for the async broker API client: enough keep-alive connections for concurrent
+# tool calls, held open long enough between calls to skip a fresh TLS handshake
+HTTP_POOL_LIMITS = Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=75)
+
+_TRUE_VALUES = frozenset({"true", "1", "yes"})
+
+# The environment is fixed for the life of the process, so resolve the mode once at import
+_SANDBOX_MODE = (
+    os.getenv("TASTYTRADE_PAPER_MODE", "false").lower() in _TRUE_VALUES
+    or os.getenv("TASTYTRADE_SANDBOX", "false").lower() in _TRUE_VALUES
+)
+
 
 def is_sandbox_mode() -> bool:
     """
     Determine if we're in sandbox/paper trading mode.
-    Checks environment variables TASTYTRADE_PAPER_MODE and TASTYTRADE_SANDBOX.
+    Checks environment variables TASTYTRADE_PAPER_MODE and TASTYTRADE_SANDBOX (read at import).
     
     Returns:
         True if in sandbox/paper mode, False otherwise
     """
-    paper_mode = os.getenv("TASTYTRADE_PAPER_MODE", "false").lower() in ("true", "1", "yes")
-    sandbox_mode = os.getenv("TASTYTRADE_SANDBOX", "false").lower() in ("true", "1", "yes")
-    return paper_mode or sandbox_mode
+    return _SANDBOX_MODE
 
 
 def create_session(
@@ -38,18 +49,26 @@ def create_session(
     if is_test is None:
         is_test = is_sandbox_mode()
     
-    return Session(client_secret, refresh_token, is_test=is_test)
+    session = Session(client_secret, refresh_token, is_test=is_test)
+    # The SDK builds its async client with httpx's default pool (5s keep-alive); swap in a wider,
+    # longer-lived pool. The default client hasn't sent anything yet (the token refresh is sync).
+    client = session.async_client
+    session.async_client = AsyncClient(
+        base_url=client.base_url, headers=client.headers, proxy=session.proxy, limits=HTTP_POOL_LIMITS
+    )
+    return session
 
 
 def select_account(
-    accounts: list[Account],
+    accounts: list[Account] | dict[str, Account],
     account_id: Optional[str] = None
 ) -> Account:
     """
     Select an account from a list of accounts.
     
     Args:
-        accounts: List of Account objects
+        accounts: List of Account objects, or a dict of them keyed by account number
+                  (lets callers that look up accounts repeatedly build the index once)
         account_id: Optional account number to select. If None, returns first account.
     
     Returns:
@@ -61,14 +80,21 @@ def select_account(
     if not accounts:
         raise ValueError("No accounts available")
     
+    if isinstance(accounts, dict):
+        accounts_by_number = accounts
+    elif account_id:
+        accounts_by_number = {acc.account_number: acc for acc in accounts}
+    else:
+        return accounts[0]
+    
     if account_id:
-        account = next((acc for acc in accounts if acc.account_number == account_id), None)
+        account = accounts_by_number.get(account_id)
         if not account:
-            available_accounts = [acc.account_number for acc in accounts]
+            available_accounts = list(accounts_by_number)
             raise ValueError(
                 f"Account '{account_id}' not found. Available accounts: {available_accounts}"
             )
         return account
     
-    return accounts[0]
+    return next(iter(accounts_by_number.values()))
 
@@ -1,7 +1,15 @@
 """Technical analysis functions: VWAP, support/resistance, breakout detection."""
 import logging
+from functools import singledispatch
 from typing import Literal
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
 try:
     import pandas as pd
     HAS_PANDAS = True
@@ -9,9 +17,64 @@ except ImportError:
     HAS_PANDAS = False
     pd = None
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    njit = None
+
 logger = logging.getLogger(__name__)
 
 
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _vwap_totals_nb(highs, lows, closes, volumes):
+        """Sum typical price × volume and volume in one compiled pass over float64 arrays."""
+        total_price_volume = 0.0
+        total_volume = 0.0
+        for i in range(highs.shape[0]):
+            total_price_volume += (highs[i] + lows[i] + closes[i]) / 3.0 * volumes[i]
+            total_volume += volumes[i]
+        return total_price_volume, total_volume
+
+
+def _upper_columns(candles) -> dict[str, str]:
+    """Map upper-cased DataFrame column names to the actual names, for case-insensitive access."""
+    return {col.upper(): col for col in candles.columns}
+
+
+def _vwap_from_arrays(highs, lows, closes, volumes) -> float:
+    """Compute VWAP from per-candle columns (float64 arrays, or lists when NumPy isn't installed)."""
+    # Calculate typical price and price × volume for each candle
+    if HAS_NUMBA:
+        # JIT-compiled on first use (cached to disk); fuses the whole reduction into one loop
+        total_price_volume, total_volume = _vwap_totals_nb(highs, lows, closes, volumes)
+    elif HAS_NUMPY:
+        typical_prices = (highs + lows + closes) / 3.0
+        total_price_volume = float((typical_prices * volumes).sum())
+        total_volume = float(volumes.sum())
+    else:
+        total_price_volume = 0.0
+        total_volume = 0.0
+        for high, low, close, volume in zip(highs, lows, closes, volumes, strict=False):
+            typical_price = (float(high) + float(low) + float(close)) / 3.0
+            total_price_volume += typical_price * float(volume)
+            total_volume += float(volume)
+    
+    if total_volume == 0:
+        logger.warning("Total volume is zero, cannot calculate VWAP. Using average of closes.")
+        avg_close = sum(float(c) for c in closes) / len(closes) if len(closes) else 0.0
+        return float(avg_close)
+    
+    vwap = total_price_volume / total_volume
+    return float(vwap)
+
+
+_VWAP_COLUMNS = ('HIGH', 'LOW', 'CLOSE', 'VOLUME')
+
+
+@singledispatch
 def calculate_vwap(candles) -> float:
     """
     Calculate VWAP (Volume Weighted Average Price) from candlestick data.
@@ -21,61 +84,32 @@ def calculate_vwap(candles) -> float:
     
     Args:
         candles: DataFrame with columns ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
-                 or ['Open', 'High', 'Low', 'Close', 'Volume']
+                 or ['Open', 'High', 'Low', 'Close', 'Volume'], or a dict keyed by
+                 the upper-case names
     
     Returns:
         VWAP value as float
     """
-    # Handle both DataFrame and dict formats
-    if HAS_PANDAS and isinstance(candles, pd.DataFrame):
-        candles_df = candles.copy()
-        candles_df.columns = [col.upper() for col in candles_df.columns]
-    elif isinstance(candles, dict):
-        # Convert dict to lists for calculation
-        candles_df = candles
-    else:
-        raise ValueError(f"Unsupported candles format: {type(candles)}")
-    
-    # Ensure required columns exist
-    required_cols = ['HIGH', 'LOW', 'CLOSE', 'VOLUME']
-    
-    # Get data as lists
-    if HAS_PANDAS and isinstance(candles_df, pd.DataFrame):
-        for col in required_cols:
-            if col not in candles_df.columns:
-                raise ValueError(f"Missing required column for VWAP calculation: {col}")
-        highs = candles_df['HIGH'].tolist()
-        lows = candles_df['LOW'].tolist()
-        closes = candles_df['CLOSE'].tolist()
-        volumes = candles_df['VOLUME'].tolist()
-    else:
-        # Dict format
-        for col in required_cols:
-            if col not in candles_df:
-                raise ValueError(f"Missing required column for VWAP calculation: {col}")
-        highs = candles_df['HIGH'] if isinstance(candles_df['HIGH'], list) else [candles_df['HIGH']]
-        lows = candles_df['LOW'] if isinstance(candles_df['LOW'], list) else [candles_df['LOW']]
-        closes = candles_df['CLOSE'] if isinstance(candles_df['CLOSE'], list) else [candles_df['CLOSE']]
-        volumes = candles_df['VOLUME'] if isinstance(candles_df['VOLUME'], list) else [candles_df['VOLUME']]
-    
-    # Calculate typical price and price × volume for each candle
-    total_price_volume = 0.0
-    total_volume = 0.0
-    
-    for high, low, close, volume in zip(highs, lows, closes, volumes):
-        typical_price = (float(high) + float(low) + float(close)) / 3.0
-        total_price_volume += typical_price * float(volume)
-        total_volume += float(volume)
-    
-    if total_volume == 0:
-        logger.warning("Total volume is zero, cannot calculate VWAP. Using average of closes.")
-        avg_close = sum(float(c) for c in closes) / len(closes) if closes else 0.0
-        return float(avg_close)
-    
-    vwap = total_price_volume / total_volume
-    return float(vwap)
+    # Implementations are registered per input type below, so the format check happens once at dispatch
+    raise ValueError(f"Unsupported candles format: {type(candles)}")
+
+
+@calculate_vwap.register(dict)
+def _calculate_vwap_dict(candles: dict) -> float:
+    for col in _VWAP_COLUMNS:
+        if col not in candles:
+            raise ValueError(f"Missing required column for VWAP calculation: {col}")
+    highs, lows, closes, volumes = (
+        candles[col] if isinstance(candles[col], list) else [candles[col]] for col in _VWAP_COLUMNS
+    )
+    if HAS_NUMPY:
+        highs, lows, closes, volumes = (
+            np.asarray(values, dtype=np.float64) for values in (highs, lows, closes, volumes)
+        )
+    return _vwap_from_arrays(highs, lows, closes, volumes)
 
 
+@singledispatch
 def calculate_support_resistance(candles) -> tuple[float, float]:
     """
     Calculate support and resistance levels from candlestick data.
@@ -89,27 +123,46 @@ def calculate_support_resistance(candles) -> tuple[float, float]:
     Returns:
         Tuple of (support, resistance) as floats
     """
-    # Handle both DataFrame and dict formats
-    if HAS_PANDAS and isinstance(candles, pd.DataFrame):
-        candles_df = candles.copy()
-        candles_df.columns = [col.upper() for col in candles_df.columns]
-        if 'LOW' not in candles_df.columns or 'HIGH' not in candles_df.columns:
-            raise ValueError("Missing required columns for S/R calculation: HIGH and LOW")
-        support = float(candles_df['LOW'].min())
-        resistance = float(candles_df['HIGH'].max())
-    elif isinstance(candles, dict):
-        if 'LOW' not in candles or 'HIGH' not in candles:
-            raise ValueError("Missing required keys for S/R calculation: HIGH and LOW")
-        lows = candles['LOW'] if isinstance(candles['LOW'], list) else [candles['LOW']]
-        highs = candles['HIGH'] if isinstance(candles['HIGH'], list) else [candles['HIGH']]
+    raise ValueError(f"Unsupported candles format: {type(candles)}")
+
+
+@calculate_support_resistance.register(dict)
+def _calculate_support_resistance_dict(candles: dict) -> tuple[float, float]:
+    if 'LOW' not in candles or 'HIGH' not in candles:
+        raise ValueError("Missing required keys for S/R calculation: HIGH and LOW")
+    lows = candles['LOW'] if isinstance(candles['LOW'], list) else [candles['LOW']]
+    highs = candles['HIGH'] if isinstance(candles['HIGH'], list) else [candles['HIGH']]
+    if HAS_NUMPY:
+        support = float(np.asarray(lows, dtype=np.float64).min())
+        resistance = float(np.asarray(highs, dtype=np.float64).max())
+    else:
         support = float(min(float(l) for l in lows))
         resistance = float(max(float(h) for h in highs))
-    else:
-        raise ValueError(f"Unsupported candles format: {type(candles)}")
     
     return (support, resistance)
 
 
+if HAS_PANDAS:
+    @calculate_vwap.register(pd.DataFrame)
+    def _calculate_vwap_frame(candles: "pd.DataFrame") -> float:
+        # Match column names case-insensitively without copying the frame
+        columns = _upper_columns(candles)
+        for col in _VWAP_COLUMNS:
+            if col not in columns:
+                raise ValueError(f"Missing required column for VWAP calculation: {col}")
+        highs, lows, closes, volumes = (candles[columns[col]].to_numpy(dtype=np.float64) for col in _VWAP_COLUMNS)
+        return _vwap_from_arrays(highs, lows, closes, volumes)
+
+    @calculate_support_resistance.register(pd.DataFrame)
+    def _calculate_support_resistance_frame(candles: "pd.DataFrame") -> tuple[float, float]:
+        columns = _upper_columns(candles)
+        if 'LOW' not in columns or 'HIGH' not in columns:
+            raise ValueError("Missing required columns for S/R calculation: HIGH and LOW")
+        support = float(candles[columns['LOW']].min())
+        resistance = float(candles[columns['HIGH']].max())
+        return (support, resistance)
+
+
 def detect_breakout(
     current_price: float,
     support: float,
@@ -173,6 +226,30 @@ def calculate_vwap_stop_loss(
         raise ValueError(f"Invalid position_direction: {position_direction}. Must be 'long' or 'short'.")
 
 
+def _direction_from_text(action_lower: str) -> Literal['long', 'short'] | None:
+    """Classify a lower-cased order action by its buy/sell wording."""
+    # Long positions
+    if 'buy to open' in action_lower or ('buy' in action_lower and 'sell' not in action_lower):
+        return 'long'
+    
+    # Short positions
+    if 'sell to open' in action_lower or ('sell' in action_lower and 'buy' not in action_lower):
+        return 'short'
+    
+    return None
+
+
+# Directions for the standard order actions (anything else falls back to _direction_from_text)
+_DIRECTION_BY_ACTION: dict[str, Literal['long', 'short']] = {
+    'buy to open': 'long',
+    'buy to close': 'long',
+    'sell to open': 'short',
+    'sell to close': 'short',
+    'buy': 'long',
+    'sell': 'short',
+}
+
+
 def get_position_direction(action: str) -> Literal['long', 'short']:
     """
     Determine position direction from order action.
@@ -184,14 +261,9 @@ def get_position_direction(action: str) -> Literal['long', 'short']:
         'long' or 'short'
     """
     action_lower = action.lower()
-    
-    # Long positions
-    if 'buy to open' in action_lower or ('buy' in action_lower and 'sell' not in action_lower):
-        return 'long'
-    
-    # Short positions
-    if 'sell to open' in action_lower or ('sell' in action_lower and 'buy' not in action_lower):
-        return 'short'
+    direction = _DIRECTION_BY_ACTION.get(action_lower) or _direction_from_text(action_lower)
+    if direction is not None:
+        return direction
     
     # Default to long if unclear
     logger.warning(f"Could not determine position direction from action '{action}', defaulting to 'long'")
@@ -1,9 +1,18 @@
 """ThetaData client for fetching market data (1-minute candles, real-time prices)."""
+import asyncio
+import atexit
+import heapq
+import io
+import json
 import logging
 import os
+import threading
+import time
 from collections import defaultdict
+from collections.abc import Iterable
 from datetime import datetime, timedelta
 from typing import Any
+from urllib.parse import urlencode
 
 try:
     import pandas as pd
@@ -12,18 +21,118 @@ except ImportError:
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
     try:
+        from urllib.error import HTTPError
         from urllib.request import urlopen, Request
-        from urllib.parse import urlencode
         URLLIB_AVAILABLE = True
     except ImportError:
         URLLIB_AVAILABLE = False
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Falls back to the HTTP library's JSON decoding
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts for ThetaData terminal requests
+REQUEST_TIMEOUT = (3.05, 10)
+
+# After this many consecutive connection failures, requests fail fast for CIRCUIT_COOLDOWN seconds
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 30.0
+
+# Trade history endpoint (ThetaData API v3), used for both prices and candles
+TRADE_ENDPOINT = "/v3/stock/history/trade"
+
+# Trade fields used to build candles
+TRADE_COLUMNS = ['timestamp', 'price', 'size']
+
+# Fields that may hold a trade's price, in order of preference
+_PRICE_KEYS = ('price', 'PRICE', 'Price', 'close', 'CLOSE')
+
+# Previous session's closing minutes, requested alongside today's trades for the current price
+PREVIOUS_CLOSE_WINDOW = ("15:55:00", "16:00:00")
+
+# Most ThetaData requests in flight at once per client
+MAX_CONCURRENT_REQUESTS = 10
+
+# How long fetched prices and 1-minute candles are reused for repeat calls (seconds)
+PRICE_CACHE_TTL = 1.0
+CANDLE_CACHE_TTL = 30.0
+
+
+class ThetaDataAPIError(Exception):
+    """Non-200 response from the ThetaData REST API."""
+    
+    def __init__(self, status: int, body: str):
+        super().__init__(f"ThetaData API returned status {status}: {body[:100]}")
+        self.status = status
+        self.body = body
+    
+    @property
+    def no_data(self) -> bool:
+        """Whether the API reported that no data exists for the request (only the start of the body is checked)."""
+        return self.status == 404 or "no data" in self.body[:64].lower()
+
+
+def _no_trades(data: Any) -> bool:
+    """Whether a trade response (ThetaData v3 returns {"response": [trades]}) holds no trades."""
+    return isinstance(data, dict) and not data.get("response", data)
+
+
+def _resample_trades(trades_list: list, count: int) -> "pd.DataFrame":
+    """
+    Aggregate trades into the last `count` 1-minute OHLCV candles with vectorized pandas ops.
+    
+    Trades missing a price or a parseable timestamp are skipped; minutes without trades are dropped.
+    
+    Args:
+        trades_list: Trade dicts with 'timestamp', 'price' and optional 'size'
+        count: Number of most recent candles to return
+    
+    Returns:
+        DataFrame with columns: ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
+    """
+    trades = pd.DataFrame([t for t in trades_list if isinstance(t, dict)], columns=TRADE_COLUMNS)
+    return _resample_trade_frame(trades, count)
+
+
+def _resample_trade_frame(trades: "pd.DataFrame", count: int) -> "pd.DataFrame":
+    """Aggregate a trades DataFrame (TRADE_COLUMNS, 'size' optional) into the last `count` 1-minute candles."""
+    if 'size' not in trades.columns:
+        trades = trades.assign(size=0.0)
+    trades.index = pd.to_datetime(trades['timestamp'], utc=True, format='ISO8601', errors='coerce')
+    trades['price'] = pd.to_numeric(trades['price'], errors='coerce').astype('float64')
+    trades['size'] = pd.to_numeric(trades['size'], errors='coerce').astype('float64').fillna(0.0)
+    trades = trades[trades.index.notna() & trades['price'].notna()]
+    
+    candles = trades.resample('1min').agg(
+        OPEN=('price', 'first'),
+        HIGH=('price', 'max'),
+        LOW=('price', 'min'),
+        CLOSE=('price', 'last'),
+        VOLUME=('size', 'sum'),
+    )
+    return candles.dropna(subset=['OPEN']).tail(count).reset_index(drop=True)
+
 
 class ThetaDataClient:
     """Client for ThetaData REST API to fetch market data."""
@@ -44,7 +153,111 @@ class ThetaDataClient:
         # Remove trailing slash if present
         self.base_url = self.base_url.rstrip('/')
         
-        logger.info(f"ThetaData REST API URL: {self.base_url}")
+        # Keep-alive connection pool shared by every request (requests run in worker threads),
+        # with a couple of quick retries for a terminal that is briefly unavailable
+        self._session = None
+        if REQUESTS_AVAILABLE:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504)),
+            )
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        
+        self._request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Circuit breaker state: consecutive connection failures, and when fail-fast ends
+        self._failure_count = 0
+        self._circuit_open_until = 0.0
+        # Cleared if the terminal rejects format=csv, so candles go straight to JSON afterwards
+        self._csv_supported = HTTPX_AVAILABLE and pd is not None
+        
+        # Full URL per endpoint, built once (requests/httpx encode the query parameters)
+        self._endpoint_urls: dict[str, str] = {TRADE_ENDPOINT: f"{self.base_url}{TRADE_ENDPOINT}"}
+        
+        # Native async client, created on first use so it binds to the running event loop
+        self._aclient: "httpx.AsyncClient | None" = None
+        
+        # (date.toordinal(), today as YYYYMMDD, yesterday as YYYYMMDD), reformatted once a day
+        self._trade_dates: tuple[int, str, str] | None = None
+        
+        # symbol -> (time.monotonic() at fetch, price); (symbol, count) -> (fetch time, candles)
+        self._price_cache: dict[str, tuple[float, float]] = {}
+        self._candle_cache: dict[tuple[str, int], tuple[float, Any]] = {}
+        # One lock per cache key, so concurrent callers for the same data share a single fetch
+        self._fetch_locks: defaultdict[tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        logger.info("ThetaData REST API URL: %s", self.base_url)
+    
+    async def _cached_fetch(self, cache: dict, key: Any, ttl: float, fetch) -> Any:
+        """Return a cached value younger than ttl, otherwise fetch it once for all concurrent callers."""
+        cached = cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        async with self._fetch_locks[(id(cache), key)]:
+            # Another caller may have refreshed the entry while we waited
+            cached = cache.get(key)
+            if cached and time.monotonic() - cached[0] < ttl:
+                return cached[1]
+            value = await fetch()
+            cache[key] = (time.monotonic(), value)
+            return value
+    
+    def _trade_date_strs(self, now: datetime) -> tuple[str, str]:
+        """Today's and yesterday's dates as ThetaData YYYYMMDD strings, formatted once per day."""
+        day = now.toordinal()
+        if self._trade_dates is None or self._trade_dates[0] != day:
+            self._trade_dates = (day, f"{now:%Y%m%d}", f"{now - timedelta(days=1):%Y%m%d}")
+        return self._trade_dates[1], self._trade_dates[2]
+    
+    def close(self) -> None:
+        """Close pooled HTTP connections."""
+        if self._session is not None:
+            self._session.close()
+    
+    async def aclose(self) -> None:
+        """Close the async client's pooled connections."""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+    
+    def _get_aclient(self) -> "httpx.AsyncClient":
+        """Get or create the shared async HTTP client (HTTP/2 when h2 is installed)."""
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0]),
+                # Pool size, HTTP/2 and connect retries are transport settings
+                transport=httpx.AsyncHTTPTransport(
+                    http2=HTTP2_AVAILABLE,
+                    retries=2,
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                ),
+            )
+        return self._aclient
+    
+    def _endpoint_url(self, endpoint: str) -> str:
+        """Full URL for an API endpoint, cached after the first request."""
+        url = self._endpoint_urls.get(endpoint)
+        if url is None:
+            url = self._endpoint_urls[endpoint] = f"{self.base_url}{endpoint}"
+        return url
+    
+    def _check_circuit(self) -> None:
+        """Fail fast while the circuit is open after repeated connection failures."""
+        if time.monotonic() < self._circuit_open_until:
+            raise ConnectionError("ThetaData terminal unreachable (circuit open, retrying after cooldown)")
+    
+    def _record_failure(self) -> None:
+        """Count a connection failure, opening the circuit once the threshold is reached."""
+        self._failure_count += 1
+        if self._failure_count >= CIRCUIT_FAILURE_THRESHOLD:
+            self._circuit_open_until = time.monotonic() + CIRCUIT_COOLDOWN
+            logger.warning(
+                "ThetaData terminal failed %d times in a row; failing fast for %.0fs",
+                self._failure_count, CIRCUIT_COOLDOWN
+            )
     
     def _make_request(self, endpoint: str, params: dict | None = None) -> dict | str:
         """
@@ -55,44 +268,184 @@ class ThetaDataClient:
             params: Query parameters
         
         Returns:
-            JSON response as dict, or error message as string
-        """
-        url = f"{self.base_url}{endpoint}"
+            JSON response as dict, or the body as text if it isn't JSON
         
-        # Build query string
-        if params:
-            query_string = urlencode(params)
-            url = f"{url}?{query_string}" if '?' not in url else f"{url}&{query_string}"
+        Raises:
+            ThetaDataAPIError: If the API returns a non-200 status
+        """
+        self._check_circuit()
+        url = self._endpoint_url(endpoint)
         
         try:
             if REQUESTS_AVAILABLE:
-                response = requests.get(url, timeout=10)
+                response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+                self._failure_count = 0
                 if response.status_code != 200:
                     error_text = response.text
-                    logger.warning(f"ThetaData API returned status {response.status_code}: {error_text[:100]}")
-                    return error_text
+                    logger.warning("ThetaData API returned status %d: %.100s", response.status_code, error_text)
+                    raise ThetaDataAPIError(response.status_code, error_text)
                 try:
-                    return response.json()
+                    return orjson.loads(response.content) if orjson is not None else response.json()
                 except ValueError:
                     return response.text
             elif URLLIB_AVAILABLE:
                 # Use urllib as fallback
+                if params:
+                    query_string = urlencode(params)
+                    url = f"{url}?{query_string}" if '?' not in url else f"{url}&{query_string}"
                 req = Request(url)
-                with urlopen(req, timeout=10) as response:
-                    content = response.read().decode('utf-8')
-                    # Try to parse JSON
-                    try:
-                        import json
-                        return json.loads(content)
-                    except ValueError:
-                        return content
+                try:
+                    with urlopen(req, timeout=10) as response:
+                        raw = response.read()
+                    self._failure_count = 0
+                except HTTPError as e:
+                    self._failure_count = 0
+                    error_text = e.read().decode('utf-8', errors='replace')
+                    logger.warning("ThetaData API returned status %d: %.100s", e.code, error_text)
+                    raise ThetaDataAPIError(e.code, error_text) from e
+                # Try to parse JSON
+                try:
+                    if orjson is not None:
+                        return orjson.loads(raw)
+                    return json.loads(raw)
+                except ValueError:
+                    return raw.decode('utf-8')
             else:
                 raise ImportError("No HTTP library available")
+        except ThetaDataAPIError:
+            raise
         except Exception as e:
-            logger.error(f"ThetaData API request failed: {e}")
+            logger.error("ThetaData API request failed: %s", e)
+            self._record_failure()
             raise
     
+    async def _a_make_request(self, endpoint: str, params: dict | None = None) -> dict | str:
+        """
+        Make a request to ThetaData REST API without blocking the event loop.
+        
+        Uses the shared httpx.AsyncClient; without httpx, runs the blocking request in a worker thread.
+        
+        Args:
+            endpoint: API endpoint (e.g., '/v3/stock/history/trade')
+            params: Query parameters
+        
+        Returns:
+            JSON response as dict, or the body as text if it isn't JSON
+        
+        Raises:
+            ThetaDataAPIError: If the API returns a non-200 status
+        """
+        self._check_circuit()
+        # Bound in-flight requests so bulk lookups don't overwhelm the ThetaData terminal
+        async with self._request_slots:
+            if not HTTPX_AVAILABLE:
+                return await asyncio.to_thread(self._make_request, endpoint, params)
+            
+            try:
+                response = await self._get_aclient().get(self._endpoint_url(endpoint), params=params)
+                self._failure_count = 0
+                if response.status_code != 200:
+                    error_text = response.text
+                    logger.warning("ThetaData API returned status %d: %.100s", response.status_code, error_text)
+                    raise ThetaDataAPIError(response.status_code, error_text)
+                try:
+                    return orjson.loads(response.content) if orjson is not None else response.json()
+                except ValueError:
+                    return response.text
+            except ThetaDataAPIError:
+                raise
+            except Exception as e:
+                logger.error("ThetaData API request failed: %s", e)
+                self._record_failure()
+                raise
+    
+    async def _a_fetch_raw(self, endpoint: str, params: dict) -> bytes:
+        """
+        Fetch a ThetaData response body as raw bytes with the async client.
+        
+        Raises:
+            ThetaDataAPIError: If the API returns a non-200 status
+        """
+        self._check_circuit()
+        async with self._request_slots:
+            try:
+                response = await self._get_aclient().get(self._endpoint_url(endpoint), params=params)
+            except Exception as e:
+                logger.error("ThetaData API request failed: %s", e)
+                self._record_failure()
+                raise
+            self._failure_count = 0
+            if response.status_code != 200:
+                error_text = response.text
+                logger.warning("ThetaData API returned status %d: %.100s", response.status_code, error_text)
+                raise ThetaDataAPIError(response.status_code, error_text)
+            return response.content
+    
+    async def _fetch_1min_candles_csv(
+        self, symbol: str, count: int, date_str: str, date_str_yesterday: str
+    ) -> "pd.DataFrame | None":
+        """
+        Build 1-minute candles from a CSV trade response, parsed straight into a DataFrame.
+        
+        CSV is about a third the size of the JSON response and skips building a dict per trade.
+        
+        Returns:
+            Candles DataFrame, or None to fall back to JSON (the terminal doesn't serve CSV,
+            or this response couldn't be parsed)
+        """
+        endpoint = TRADE_ENDPOINT
+        for date in (date_str, date_str_yesterday):
+            try:
+                raw = await self._a_fetch_raw(endpoint, {"symbol": symbol, "date": date, "format": "csv"})
+            except ThetaDataAPIError as e:
+                if e.no_data and date == date_str:
+                    # Try previous day if today has no data
+                    continue
+                if e.no_data:
+                    raise ValueError(f"No trade data available for {symbol} (tried today and yesterday)") from e
+                if 400 <= e.status < 500:
+                    logger.info("ThetaData CSV responses unavailable (%d), using JSON", e.status)
+                    self._csv_supported = False
+                    return None
+                raise
+            
+            if not raw.strip():
+                # An empty body means no trades for this date, same as a no-data status
+                if date == date_str:
+                    continue
+                raise ValueError(f"No trade data available for {symbol} (tried today and yesterday)")
+            try:
+                trades = pd.read_csv(io.BytesIO(raw), usecols=lambda col: col in TRADE_COLUMNS)
+            except ValueError:
+                # A garbled body says nothing about CSV support, so only this request falls back
+                logger.info("ThetaData CSV response for %s could not be parsed, using JSON", symbol)
+                return None
+            if not {'timestamp', 'price'} <= set(trades.columns):
+                logger.info("ThetaData CSV response lacks trade columns, using JSON")
+                self._csv_supported = False
+                return None
+            
+            candles = _resample_trade_frame(trades, count)
+            if candles.empty:
+                raise ValueError(f"No trade data available for {symbol}")
+            return candles
+        return None
+    
     async def get_current_price(self, symbol: str) -> float:
+        """
+        Get current real-time price for a symbol, reusing a price fetched in the last PRICE_CACHE_TTL seconds.
+        
+        Args:
+            symbol: Stock symbol (e.g., 'AAPL', 'SPY')
+        
+        Returns:
+            Current price (last trade price)
+        """
+        return await self._cached_fetch(
+            self._price_cache, symbol, PRICE_CACHE_TTL, lambda: self._fetch_current_price(symbol)
+        )
+    
+    async def _fetch_current_price(self, symbol: str) -> float:
         """
         Get current real-time price for a symbol using ThetaData REST API v3.
         
@@ -105,35 +458,56 @@ class ThetaDataClient:
         try:
             # ThetaData API v3 format: /v3/stock/history/trade?symbol=SPY&date=YYYYMMDD
             today = datetime.now()
-            date_str = today.strftime("%Y%m%d")  # Format: YYYYMMDD
+            date_str, date_str_yesterday = self._trade_date_strs(today)  # Format: YYYYMMDD
             
             # Get trades from today (last few minutes)
             params = {
                 "symbol": symbol,
                 "date": date_str,
                 "format": "json",
-                "start_time": (today - timedelta(minutes=5)).strftime("%H:%M:%S"),
-                "end_time": today.strftime("%H:%M:%S")
+                "start_time": f"{today - timedelta(minutes=5):%H:%M:%S}",
+                "end_time": f"{today:%H:%M:%S}"
             }
             
-            endpoint = "/v3/stock/history/trade"
-            try:
-                data = self._make_request(endpoint, params)
-            except Exception:
+            endpoint = TRADE_ENDPOINT
+            
+            # Fetch the previous session's closing minutes alongside today's window, so a day
+            # without trades (pre-market, weekend) usually costs one round trip instead of two.
+            # The window keeps the speculative request to a few minutes of trades.
+            params_yesterday = {
+                "symbol": symbol,
+                "date": date_str_yesterday,
+                "format": "json",
+                "start_time": PREVIOUS_CLOSE_WINDOW[0],
+                "end_time": PREVIOUS_CLOSE_WINDOW[1]
+            }
+            data, data_yesterday = await asyncio.gather(
+                self._a_make_request(endpoint, params),
+                self._a_make_request(endpoint, params_yesterday),
+                return_exceptions=True
+            )
+            if isinstance(data, BaseException) and not isinstance(data, ThetaDataAPIError):
                 # Try without time limits to get latest
                 params = {"symbol": symbol, "date": date_str, "format": "json"}
-                data = self._make_request(endpoint, params)
-            
-            # Handle error response
-            if isinstance(data, str) and ("No data" in data or "error" in data.lower()):
-                # Try previous day if today has no data
-                yesterday = today - timedelta(days=1)
-                date_str_yesterday = yesterday.strftime("%Y%m%d")
-                params_yesterday = {"symbol": symbol, "date": date_str_yesterday, "format": "json"}
                 try:
-                    data = self._make_request(endpoint, params_yesterday)
-                except:
-                    raise ValueError(f"No price data available for {symbol} (tried today and yesterday)")
+                    data = await self._a_make_request(endpoint, params)
+                except ThetaDataAPIError as e:
+                    data = e
+            
+            # Handle "no data" response, or no trades today
+            if isinstance(data, ThetaDataAPIError) and not data.no_data:
+                raise data
+            if isinstance(data, ThetaDataAPIError) or _no_trades(data):
+                data = data_yesterday
+                if isinstance(data, BaseException) or _no_trades(data):
+                    # Nothing traded in the closing window; fall back to the whole previous day
+                    params_yesterday = {"symbol": symbol, "date": date_str_yesterday, "format": "json"}
+                    try:
+                        data = await self._a_make_request(endpoint, params_yesterday)
+                    except Exception as e:
+                        raise ValueError(
+                            f"No price data available for {symbol} (tried today and yesterday)"
+                        ) from e
             
             # Parse response - ThetaData v3 returns {"response": [array of trades]}
             trades_list = data.get("response", data) if isinstance(data, dict) else data
@@ -143,104 +517,38 @@ class ThetaDataClient:
             if len(trades_list) > 0:
                 # Get last trade (most recent)
                 last_trade = trades_list[-1]
-                if isinstance(last_trade, dict) and 'price' in last_trade:
-                    return float(last_trade['price'])
-                elif isinstance(last_trade, dict):
-                    # Try alternative field names
-                    for price_field in ['PRICE', 'Price', 'close', 'CLOSE']:
-                        if price_field in last_trade:
-                            return float(last_trade[price_field])
+                if isinstance(last_trade, dict):
+                    # Try 'price', then alternative field names
+                    for price_field in _PRICE_KEYS:
+                        price = last_trade.get(price_field)
+                        if price is not None:
+                            return float(price)
             
             raise ValueError(f"No price data in response for {symbol}")
             
         except Exception as e:
-            logger.error(f"Error getting current price for {symbol}: {e}")
+            logger.error("Error getting current price for %s: %s", symbol, e)
             raise
+    
+    async def get_1min_candles(self, symbol: str, count: int = 10) -> Any:
         """
-        Get current real-time price for a symbol.
+        Get last N one-minute candlesticks, reusing candles fetched in the last CANDLE_CACHE_TTL seconds.
+        
+        The returned candles are shared between callers and must not be modified.
         
         Args:
             symbol: Stock symbol (e.g., 'AAPL', 'SPY')
+            count: Number of 1-minute candles to fetch (default: 10)
         
         Returns:
-            Current price (last trade price)
+            DataFrame with columns: ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
         """
-        await self._ensure_connected()
-        
-        try:
-            # Get the most recent trade/quote
-            # ThetaData API for last trade
-            end_date = datetime.now()
-            start_date = end_date - timedelta(minutes=1)
-            
-            # Use ThetaData's get_hist_stock_v2 for recent data
-            # Note: ThetaData API may vary, this is a common pattern
-            try:
-                data = self._client.get_hist_stock_v2(
-                    req=StockReqType.TRADE,
-                    root=symbol,
-                    start=start_date,
-                    end=end_date
-                )
-            except (AttributeError, TypeError) as e:
-                # Try alternative API method signature
-                logger.debug(f"Trying alternative ThetaData API call: {e}")
-                try:
-                    data = self._client.get_hist_stock(
-                        req=StockReqType.TRADE,
-                        root=symbol,
-                        start=start_date,
-                        end=end_date
-                    )
-                except Exception:
-                    # Last resort: try without req parameter
-                    data = self._client.get_hist_stock_v2(
-                        root=symbol,
-                        start=start_date,
-                        end=end_date
-                    )
-            
-            if data is not None and len(data) > 0:
-                # Return the last price from the most recent trade
-                # Handle different column name variations
-                price_col = None
-                for col in ['PRICE', 'Price', 'price', 'LAST', 'Last', 'last']:
-                    if col in data.columns:
-                        price_col = col
-                        break
-                
-                if price_col:
-                    return float(data.iloc[-1][price_col])
-                else:
-                    # Try first numeric column
-                    numeric_cols = data.select_dtypes(include=['float64', 'int64']).columns
-                    if len(numeric_cols) > 0:
-                        return float(data.iloc[-1][numeric_cols[0]])
-            else:
-                # Fallback: try to get from quote data
-                try:
-                    quote_data = self._client.get_hist_stock_v2(
-                        req=StockReqType.QUOTE,
-                        root=symbol,
-                        start=start_date,
-                        end=end_date
-                    )
-                    if quote_data is not None and len(quote_data) > 0:
-                        # Use mid price from quote
-                        last_quote = quote_data.iloc[-1]
-                        if 'BID' in last_quote.index and 'ASK' in last_quote.index:
-                            return float((last_quote['BID'] + last_quote['ASK']) / 2)
-                        elif 'Bid' in last_quote.index and 'Ask' in last_quote.index:
-                            return float((last_quote['Bid'] + last_quote['Ask']) / 2)
-                except Exception:
-                    pass
-                
-                raise ValueError(f"No price data available for {symbol}")
-        except Exception as e:
-            logger.error(f"Error getting current price for {symbol}: {e}")
-            raise
+        return await self._cached_fetch(
+            self._candle_cache, (symbol, count), CANDLE_CACHE_TTL,
+            lambda: self._fetch_1min_candles(symbol, count)
+        )
     
-    async def get_1min_candles(self, symbol: str, count: int = 10) -> Any:
+    async def _fetch_1min_candles(self, symbol: str, count: int = 10) -> Any:
         """
         Get last N one-minute candlesticks (OHLCV data) using ThetaData REST API v3.
         
@@ -254,8 +562,13 @@ class ThetaDataClient:
             DataFrame with columns: ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
         """
         try:
-            today = datetime.now()
-            date_str = today.strftime("%Y%m%d")  # Format: YYYYMMDD
+            date_str, date_str_yesterday = self._trade_date_strs(datetime.now())  # Format: YYYYMMDD
+            
+            # Prefer the compact CSV format when the terminal serves it
+            if self._csv_supported:
+                candles = await self._fetch_1min_candles_csv(symbol, count, date_str, date_str_yesterday)
+                if candles is not None:
+                    return candles
             
             # Use trade data to build 1-minute candles (more reliable than quote endpoint)
             params = {
@@ -265,18 +578,20 @@ class ThetaDataClient:
             }
             
             # Use trade data to build 1-minute candles
-            endpoint = "/v3/stock/history/trade"
-            response_data = self._make_request(endpoint, params)
-            
-            # Handle error response - try previous day if needed
-            if isinstance(response_data, str) and ("No data" in response_data or "error" in response_data.lower()):
-                yesterday = today - timedelta(days=1)
-                date_str_yesterday = yesterday.strftime("%Y%m%d")
+            endpoint = TRADE_ENDPOINT
+            try:
+                response_data = await self._a_make_request(endpoint, params)
+            except ThetaDataAPIError as e:
+                # Try previous day if today has no data
+                if not e.no_data:
+                    raise
                 params_yesterday = {"symbol": symbol, "date": date_str_yesterday, "format": "json"}
                 try:
-                    response_data = self._make_request(endpoint, params_yesterday)
-                except:
-                    raise ValueError(f"No trade data available for {symbol} (tried today and yesterday)")
+                    response_data = await self._a_make_request(endpoint, params_yesterday)
+                except Exception as e_yesterday:
+                    raise ValueError(
+                        f"No trade data available for {symbol} (tried today and yesterday)"
+                    ) from e_yesterday
             
             # Parse response - ThetaData v3 returns {"response": [array of trades]}
             trades_list = response_data.get("response", response_data) if isinstance(response_data, dict) else response_data
@@ -286,78 +601,135 @@ class ThetaDataClient:
             if not trades_list or len(trades_list) == 0:
                 raise ValueError(f"No trade data available for {symbol}")
             
+            # Aggregate into 1-minute OHLCV bars with pandas when available
+            if pd is not None:
+                candles = _resample_trades(trades_list, count)
+                if candles.empty:
+                    raise ValueError(f"Could not build candles from trade data for {symbol}")
+                return candles
+            
             # Group trades by minute and build OHLCV candles
-            from collections import defaultdict
-            candles_by_minute = defaultdict(lambda: {'prices': [], 'volumes': []})
+            prices_by_minute = defaultdict(list)
+            volumes_by_minute = defaultdict(list)
             
             for trade in trades_list:
-                if not isinstance(trade, dict) or 'price' not in trade:
+                if not isinstance(trade, dict):
+                    continue
+                price = trade.get('price')
+                if price is None:
                     continue
                 
                 timestamp_str = trade.get('timestamp', '')
                 if not timestamp_str:
                     continue
                 
-                # Parse timestamp and get minute
+                # Parse timestamp (fromisoformat accepts a trailing 'Z') and bucket by wall-clock
+                # minute as an integer, which sorts chronologically and skips formatting a string
                 try:
-                    from datetime import datetime as dt
-                    ts = dt.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                    minute_key = ts.strftime("%Y-%m-%d %H:%M")  # Group by minute
-                except:
+                    ts = datetime.fromisoformat(timestamp_str)
+                except (TypeError, ValueError):
                     continue
+                minute_key = ts.toordinal() * 1440 + ts.hour * 60 + ts.minute
                 
-                price = float(trade['price'])
+                price = float(price)
                 size = float(trade.get('size', 0))
-                candles_by_minute[minute_key]['prices'].append(price)
-                candles_by_minute[minute_key]['volumes'].append(size)
+                prices_by_minute[minute_key].append(price)
+                volumes_by_minute[minute_key].append(size)
             
-            # Build OHLCV from grouped data
-            candles_list = []
-            for minute_key in sorted(candles_by_minute.keys())[-count:]:
-                candle_data = candles_by_minute[minute_key]
-                prices = candle_data['prices']
-                volumes = candle_data['volumes']
+            # Build OHLCV columns from grouped data in a single pass
+            candles = {'OPEN': [], 'HIGH': [], 'LOW': [], 'CLOSE': [], 'VOLUME': []}
+            # Only the last `count` minutes are needed, so select them without sorting every bucket
+            for minute_key in sorted(heapq.nlargest(count, prices_by_minute)):
+                prices = prices_by_minute[minute_key]
+                volumes = volumes_by_minute[minute_key]
                 
                 if prices:
-                    candles_list.append({
-                        'OPEN': prices[0],
-                        'HIGH': max(prices),
-                        'LOW': min(prices),
-                        'CLOSE': prices[-1],
-                        'VOLUME': sum(volumes)
-                    })
+                    candles['OPEN'].append(prices[0])
+                    candles['HIGH'].append(max(prices))
+                    candles['LOW'].append(min(prices))
+                    candles['CLOSE'].append(prices[-1])
+                    candles['VOLUME'].append(sum(volumes))
             
-            if not candles_list:
+            if not candles['OPEN']:
                 raise ValueError(f"Could not build candles from trade data for {symbol}")
             
-            # Convert to DataFrame if pandas available
-            if pd is not None:
-                df = pd.DataFrame(candles_list)
-                df.columns = [col.upper() for col in df.columns]
-                required_cols = ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
-                return df[required_cols].tail(count)
-            else:
-                # Return dict structure
-                return {
-                    'OPEN': [c['OPEN'] for c in candles_list[-count:]],
-                    'HIGH': [c['HIGH'] for c in candles_list[-count:]],
-                    'LOW': [c['LOW'] for c in candles_list[-count:]],
-                    'CLOSE': [c['CLOSE'] for c in candles_list[-count:]],
-                    'VOLUME': [c['VOLUME'] for c in candles_list[-count:]]
-                }
+            # Return dict structure (already limited to the last `count` minutes)
+            return candles
             
         except Exception as e:
-            logger.error(f"Error getting 1-minute candles for {symbol}: {e}")
+            logger.error("Error getting 1-minute candles for %s: %s", symbol, e)
             raise
 
+    async def get_prices_bulk(self, symbols: Iterable[str]) -> dict[str, float | BaseException]:
+        """
+        Get current prices for several symbols in one batch.
+        
+        Args:
+            symbols: Stock symbols (duplicates are fetched once)
+        
+        Returns:
+            Dict mapping symbol to its price, or to the exception raised while fetching it
+        """
+        unique_symbols = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(
+            *(self.get_current_price(symbol) for symbol in unique_symbols),
+            return_exceptions=True
+        )
+        return dict(zip(unique_symbols, results, strict=True))
+    
+    async def get_prices(self, symbols: Iterable[str]) -> dict[str, float]:
+        """
+        Get current prices for several symbols concurrently, skipping symbols that fail.
+        
+        Args:
+            symbols: Stock symbols (duplicates are fetched once)
+        
+        Returns:
+            Dict mapping each symbol that was priced successfully to its price
+        """
+        prices = {}
+        for symbol, result in (await self.get_prices_bulk(symbols)).items():
+            if isinstance(result, BaseException):
+                logger.warning("Could not get price for %s: %s", symbol, result)
+            else:
+                prices[symbol] = result
+        return prices
+    
+    async def get_1min_candles_bulk(
+        self, symbols: Iterable[str], count: int = 10
+    ) -> "dict[str, pd.DataFrame | dict[str, list[float]] | BaseException]":
+        """
+        Get the last N one-minute candles for several symbols in one batch.
+        
+        Args:
+            symbols: Stock symbols (duplicates are fetched once)
+            count: Number of 1-minute candles per symbol (default: 10)
+        
+        Returns:
+            Dict mapping symbol to its candles, or to the exception raised while fetching them
+        """
+        unique_symbols = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(
+            *(self.get_1min_candles(symbol, count=count) for symbol in unique_symbols),
+            return_exceptions=True
+        )
+        return dict(zip(unique_symbols, results, strict=True))
+
 
 # Singleton instance (lazy initialization)
 _thetadata_client: ThetaDataClient | None = None
 
 
+_thetadata_client_lock = threading.Lock()
+
+
 def get_thetadata_client(url: str | None = None) -> ThetaDataClient:
-    """Get or create ThetaData client singleton."""
+    """Get or create ThetaData client singleton (url only applies when it is first created)."""
     global _thetadata_client
     if _thetadata_client is None:
-        _thetadata_client = ThetaDataClient(url=url)
+        # Double-checked so concurrent first callers can't each build a client and connection pool
+        with _thetadata_client_lock:
+            if _thetadata_client is None:
+                _thetadata_client = ThetaDataClient(url=url)
+                atexit.register(_thetadata_client.close)
     return _thetadata_client
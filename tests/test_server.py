@@ -1,27 +1,48 @@
 """Unit tests for tasty_agent.server module."""
 
-from datetime import UTC, date, datetime
-from unittest.mock import Mock
+import asyncio
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
 
 import pytest
+from aiolimiter import AsyncLimiter
+from pydantic import BaseModel
+from tabulate import tabulate
+from tastytrade.order import OrderAction, OrderTimeInForce, OrderType
 
 from tasty_agent.server import (
     InstrumentDetail,
     InstrumentSpec,
     OrderLeg,
+    QuoteCache,
+    ServerContext,
     WatchlistSymbol,
+    _fast_plain_table,
     _get_next_open_time,
     _option_chain_key_builder,
+    _paginate,
+    build_new_order,
     build_order_legs,
+    delete_orders,
+    get_cached_option_chain,
+    get_instrument_details,
+    get_live_orders_by_id,
+    invalidate_live_orders,
+    replace_order,
     to_table,
     validate_date_format,
     validate_strike_price,
 )
+from tasty_agent.utils.session import select_account
 
 
 class TestToTable:
     """Tests for to_table function."""
 
+    class _Single(BaseModel):
+        name: str
+
     def test_empty_data_returns_no_data(self):
         assert to_table([]) == "No data"
 
@@ -34,6 +55,39 @@ class TestToTable:
         assert "AAPL" in result
         assert "TSLA" in result
 
+    def test_single_field_model(self):
+        assert to_table([TestToTable._Single(name="only")]).splitlines() == ["name", "only"]
+
+    def test_fast_plain_table_matches_tabulate(self):
+        headers = ["symbol", "strike", "expires", "note"]
+        rows = [["AAPL", Decimal("150.5"), date(2024, 12, 20), None], ["TSLA", 7, date(2025, 1, 17), "long text"]]
+        expected = tabulate(rows, headers=headers, tablefmt="plain", disable_numparse=True)
+        assert _fast_plain_table(rows, headers) == expected
+
+
+class TestPaginate:
+    """Tests for _paginate function."""
+
+    def test_fetches_consecutive_pages_until_short_page(self):
+        requested = []
+
+        async def fetch(page):
+            requested.append(page)
+            return [page] * (2 if page < 2 else 1)
+
+        async def fetch_single(page):
+            requested.append(page)
+            return ["only"]
+
+        async def run():
+            assert await _paginate(fetch, page_size=2) == [0, 0, 1, 1, 2]
+            assert requested[:3] == [0, 1, 2]
+            requested.clear()
+            assert await _paginate(fetch_single, page_size=50) == ["only"]
+            assert requested == [0]
+
+        asyncio.run(run())
+
 
 class TestValidateDateFormat:
     """Tests for validate_date_format function."""
@@ -50,6 +104,16 @@ class TestValidateDateFormat:
         with pytest.raises(ValueError, match="Invalid date format"):
             validate_date_format("2024-13-45")
 
+    @pytest.mark.parametrize("value", ["2024/12/20", "20241220", "2024-W51-5", "2024-1-5"])
+    def test_rejects_non_dashed_iso_layouts(self, value):
+        with pytest.raises(ValueError, match="Invalid date format"):
+            validate_date_format(value)
+
+    def test_invalid_date_raises_on_repeat_call(self):
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Invalid date format"):
+                validate_date_format("2024-02-30")
+
 
 class TestValidateStrikePrice:
     """Tests for validate_strike_price function."""
@@ -98,6 +162,287 @@ class TestOptionChainKeyBuilder:
         assert key1 == key2
 
 
+class TestGetCachedOptionChain:
+    """Tests for get_cached_option_chain single-flight behaviour."""
+
+    def test_concurrent_misses_share_one_fetch(self, monkeypatch):
+        async def slow_chain(session, symbol):
+            await asyncio.sleep(0.01)
+            return {"symbol": symbol}
+
+        fetch = AsyncMock(side_effect=slow_chain)
+        monkeypatch.setattr("tasty_agent.server.a_get_option_chain", fetch)
+
+        async def run():
+            return await asyncio.gather(*[get_cached_option_chain(Mock(), "SINGLEFLIGHT") for _ in range(3)])
+
+        results = asyncio.run(run())
+
+        assert fetch.await_count == 1
+        assert all(result is results[0] for result in results)
+
+
+class TestGetLiveOrdersById:
+    """Tests for the short-lived live orders cache."""
+
+    def test_reuses_fetch_until_invalidated(self):
+        account = Mock()
+        account.a_get_live_orders = AsyncMock(return_value=[Mock(id=1), Mock(id=2)])
+
+        async def run():
+            context = ServerContext(session=Mock(), account=account)
+            first = await get_live_orders_by_id(context, context.session)
+            second = await get_live_orders_by_id(context, context.session)
+            invalidate_live_orders(context)
+            await get_live_orders_by_id(context, context.session)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert list(first) == ["1", "2"]
+        assert second is first
+        assert account.a_get_live_orders.await_count == 2
+
+    def test_fetch_invalidated_while_in_flight_is_not_cached(self):
+        async def fetch_then_mutate(session):
+            invalidate_live_orders(context)  # An order was placed while the list was in flight
+            return [Mock(id=1)]
+
+        account = Mock()
+        account.a_get_live_orders = AsyncMock(side_effect=fetch_then_mutate)
+        context = ServerContext(session=Mock(), account=account)
+
+        async def run():
+            stale = await get_live_orders_by_id(context, context.session)
+            await get_live_orders_by_id(context, context.session)
+            return stale
+
+        assert list(asyncio.run(run())) == ["1"]
+        assert context.live_orders is None
+        assert account.a_get_live_orders.await_count == 2
+
+
+class _FakeStreamer:
+    """DXLinkStreamer stand-in that answers each subscription with a quote unless the symbol is silent."""
+
+    def __init__(self, silent=(), fail_subscribe=False):
+        self.queue = asyncio.Queue()
+        self.silent = set(silent)
+        self.fail_subscribe = fail_subscribe
+        self.subscribed = []
+        self.unsubscribed = []
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    async def subscribe(self, event_class, symbols):
+        if self.fail_subscribe:
+            raise RuntimeError("subscription rejected")
+        self.subscribed.append(list(symbols))
+        for symbol in symbols:
+            if symbol not in self.silent:
+                self.queue.put_nowait(Mock(event_symbol=symbol))
+
+    async def unsubscribe(self, event_class, symbols):
+        self.unsubscribed.append(list(symbols))
+
+    async def listen(self, event_class):
+        while (quote := await self.queue.get()) is not None:  # None simulates a dropped connection
+            yield quote
+
+
+class TestQuoteCache:
+    """Tests for the shared quote streamer cache."""
+
+    @staticmethod
+    def _patch_streamers(monkeypatch, *streamers):
+        pending = list(streamers)
+        monkeypatch.setattr("tasty_agent.server.DXLinkStreamer", lambda session: pending.pop(0))
+
+    def test_subscribed_symbol_served_from_cache(self, monkeypatch):
+        streamer = _FakeStreamer()
+        self._patch_streamers(monkeypatch, streamer)
+
+        async def run():
+            cache = QuoteCache(Mock())
+            first = await cache.get_quotes(["AAPL", "SPY"])
+            second = await cache.get_quotes(["SPY", "AAPL", "SPY"])
+            await cache.close()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert [q.event_symbol for q in second] == ["SPY", "AAPL", "SPY"]
+        assert second[1] is first[0]
+        assert streamer.subscribed == [["AAPL", "SPY"]]
+        assert streamer.closed
+
+    def test_first_subscribe_waits_for_quote(self, monkeypatch):
+        streamer = _FakeStreamer(silent={"AAPL"})
+        self._patch_streamers(monkeypatch, streamer)
+        quote = Mock(event_symbol="AAPL")
+
+        async def run():
+            cache = QuoteCache(Mock())
+            waiting = asyncio.create_task(cache.get_quotes(["AAPL"]))
+            await asyncio.sleep(0.01)
+            assert not waiting.done()
+            streamer.queue.put_nowait(quote)
+            result = await waiting
+            await cache.close()
+            return result
+
+        assert asyncio.run(run()) == [quote]
+
+    def test_timed_out_symbol_is_unsubscribed(self, monkeypatch):
+        streamer = _FakeStreamer(silent={"HALTED"})
+        self._patch_streamers(monkeypatch, streamer)
+
+        async def run():
+            cache = QuoteCache(Mock())
+            with pytest.raises(TimeoutError):
+                await cache.get_quotes(["AAPL", "HALTED"], timeout=0.01)
+            streamer.silent.clear()
+            result = await cache.get_quotes(["HALTED"])
+            await cache.close()
+            return result
+
+        result = asyncio.run(run())
+
+        assert result[0].event_symbol == "HALTED"
+        assert streamer.unsubscribed == [["HALTED"]]
+        assert streamer.subscribed == [["AAPL", "HALTED"], ["HALTED"]]
+
+    def test_failed_subscribe_is_retried(self, monkeypatch):
+        streamer = _FakeStreamer(fail_subscribe=True)
+        self._patch_streamers(monkeypatch, streamer)
+
+        async def run():
+            cache = QuoteCache(Mock())
+            with pytest.raises(RuntimeError):
+                await cache.get_quotes(["AAPL"])
+            streamer.fail_subscribe = False
+            result = await cache.get_quotes(["AAPL"])
+            await cache.close()
+            return result
+
+        assert asyncio.run(run())[0].event_symbol == "AAPL"
+        assert streamer.subscribed == [["AAPL"]]
+
+    def test_stale_quote_is_resubscribed(self, monkeypatch):
+        streamer = _FakeStreamer()
+        self._patch_streamers(monkeypatch, streamer)
+        monkeypatch.setattr("tasty_agent.server.QUOTE_CACHE_MAX_AGE", -1.0)
+
+        async def run():
+            cache = QuoteCache(Mock())
+            first = await cache.get_quotes(["AAPL"])
+            second = await cache.get_quotes(["AAPL"])
+            await cache.close()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert second[0] is not first[0]
+        assert streamer.unsubscribed == [["AAPL"]]
+        assert streamer.subscribed == [["AAPL"], ["AAPL"]]
+
+    def test_reconnects_after_dropped_stream(self, monkeypatch):
+        dropped, fresh = _FakeStreamer(), _FakeStreamer()
+        self._patch_streamers(monkeypatch, dropped, fresh)
+
+        async def run():
+            cache = QuoteCache(Mock())
+            await cache.get_quotes(["AAPL"])
+            dropped.queue.put_nowait(None)
+            await asyncio.sleep(0.01)
+            result = await cache.get_quotes(["AAPL"])
+            await cache.close()
+            return result
+
+        result = asyncio.run(run())
+
+        assert result[0].event_symbol == "AAPL"
+        assert dropped.closed
+        assert fresh.subscribed == [["AAPL"]]
+
+
+class TestDeleteOrders:
+    """Tests for the batch delete_orders tool."""
+
+    def test_reports_each_order_and_keeps_going_after_a_failure(self, monkeypatch):
+        monkeypatch.setattr("tasty_agent.server.rate_limiter", AsyncLimiter(100, 1))
+
+        async def delete(session, order_id):
+            if order_id == 2:
+                raise RuntimeError("already filled")
+
+        account = Mock()
+        account.a_delete_order = AsyncMock(side_effect=delete)
+        session = Mock(session_expiration=datetime.now(UTC) + timedelta(minutes=15))
+
+        async def run():
+            ctx = Mock()
+            ctx.request_context.lifespan_context = ServerContext(session=session, account=account)
+            return await delete_orders(ctx, ["1", "2", "3"])
+
+        result = asyncio.run(run())
+
+        assert result["success"] is False
+        assert [r["success"] for r in result["results"]] == [True, False, True]
+        assert result["results"][1]["error"] == "already filled"
+        assert account.a_delete_order.await_count == 3
+
+
+class TestReplaceOrder:
+    """Tests for the replace_order tool."""
+
+    def test_keeps_stop_trigger_and_gtc_date(self, monkeypatch):
+        monkeypatch.setattr("tasty_agent.server.rate_limiter", AsyncLimiter(100, 1))
+        existing = Mock(
+            id=42,
+            time_in_force=OrderTimeInForce.GTD,
+            order_type=OrderType.STOP_LIMIT,
+            legs=[],
+            stop_trigger="95.5",
+            gtc_date=date(2026, 12, 31),
+        )
+        account = Mock()
+        account.a_get_live_orders = AsyncMock(return_value=[existing])
+        account.a_replace_order = AsyncMock(return_value=Mock(model_dump=Mock(return_value={"id": 42})))
+        session = Mock(session_expiration=datetime.now(UTC) + timedelta(minutes=15))
+
+        async def run():
+            ctx = Mock()
+            ctx.request_context.lifespan_context = ServerContext(session=session, account=account)
+            return await replace_order(ctx, "42", 96.0)
+
+        assert asyncio.run(run()) == {"id": 42}
+        order = account.a_replace_order.await_args.args[2]
+        assert order.order_type == OrderType.STOP_LIMIT
+        assert order.time_in_force == OrderTimeInForce.GTD
+        assert order.price == Decimal("96.0")
+        assert order.stop_trigger == Decimal("95.5")
+        assert order.gtc_date == date(2026, 12, 31)
+
+
+class TestSelectAccount:
+    """Tests for select_account function."""
+
+    def test_list_and_index_select_same_account(self):
+        accounts = [Mock(account_number="5WX01"), Mock(account_number="5WX02")]
+        by_number = {acc.account_number: acc for acc in accounts}
+        assert select_account(accounts, "5WX02") is accounts[1]
+        assert select_account(by_number, "5WX02") is accounts[1]
+        assert select_account(by_number) is accounts[0]
+        with pytest.raises(ValueError, match="5WX03"):
+            select_account(by_number, "5WX03")
+
+
 class TestGetNextOpenTime:
     """Tests for _get_next_open_time function."""
 
@@ -146,6 +491,23 @@ class TestGetNextOpenTime:
         assert result is None
 
 
+class TestBuildNewOrder:
+    """Tests for build_new_order function."""
+
+    @pytest.mark.parametrize("order_type", ["StopLimit", "stop_limit", "STOP_LIMIT", "Stop Limit"])
+    def test_order_type_spellings_resolve_to_same_enum(self, order_type):
+        order = build_new_order(order_type, [], "Day", price=Decimal("1.50"), stop_price=Decimal("1.60"))
+        assert order.order_type == OrderType.STOP_LIMIT
+
+    def test_stop_price_sent_as_stop_trigger(self):
+        order = build_new_order("Stop", [], "Day", stop_price=Decimal("150"))
+        assert order.stop_trigger == Decimal("150")
+
+    def test_unknown_order_type_raises_error(self):
+        with pytest.raises(ValueError):
+            build_new_order("Sideways", [], "Day")
+
+
 class TestBuildOrderLegs:
     """Tests for build_order_legs function."""
 
@@ -160,6 +522,19 @@ class TestBuildOrderLegs:
         result = build_order_legs([], [])
         assert result == []
 
+    def test_stock_leg_actions(self):
+        instrument = Mock()
+        details = [InstrumentDetail("AAPL", instrument)] * 2
+        legs = [OrderLeg(symbol="AAPL", action="Buy", quantity=10), OrderLeg(symbol="AAPL", action="Sell to Close", quantity=10)]
+
+        build_order_legs(details, legs)
+
+        assert [call.args for call in instrument.build_leg.call_args_list] == [
+            (Decimal(10), OrderAction.BUY), (Decimal(10), OrderAction.SELL)
+        ]
+        with pytest.raises(ValueError, match="Invalid action 'buy'"):
+            build_order_legs(details[:1], [OrderLeg(symbol="AAPL", action="buy", quantity=1)])
+
 
 class TestPydanticModels:
     """Tests for Pydantic model validation."""
@@ -189,6 +564,11 @@ class TestPydanticModels:
         assert leg.action == "Buy"
         assert leg.quantity == 100
 
+    def test_order_leg_signed_quantity(self):
+        assert OrderLeg(symbol="AAPL", action="Buy to Open", quantity=2).signed_quantity == -2
+        assert OrderLeg(symbol="AAPL", action="Sell to Close", quantity=2).signed_quantity == 2
+        assert "signed_quantity" not in OrderLeg(symbol="AAPL", action="Buy", quantity=1).model_dump()
+
     def test_order_leg_option(self):
         leg = OrderLeg(
             symbol="AAPL",
@@ -222,3 +602,45 @@ class TestInstrumentDetail:
         detail = InstrumentDetail("AAPL", mock_instrument)
         assert detail.instrument.symbol == "AAPL"
 
+
+class TestGetInstrumentDetails:
+    """Tests for get_instrument_details function."""
+
+    def test_duplicate_specs_resolved_once_in_caller_order(self, monkeypatch):
+        lookup = AsyncMock(side_effect=lambda session, symbols: {s: Mock(symbol=s) for s in symbols})
+        monkeypatch.setattr("tasty_agent.server._get_cached_equities", lookup)
+        monkeypatch.setattr("tasty_agent.server._instrument_detail_cache", {})
+        specs = [InstrumentSpec(symbol="aapl"), InstrumentSpec(symbol="TSLA"), InstrumentSpec(symbol="AAPL")]
+
+        details = asyncio.run(get_instrument_details(Mock(), specs))
+
+        assert [d.streamer_symbol for d in details] == ["AAPL", "TSLA", "AAPL"]
+        lookup.assert_awaited_once()
+        assert lookup.await_args.args[1] == ["AAPL", "TSLA"]
+
+    def test_fractional_strike_found_by_cents_index(self, monkeypatch):
+        option = Mock(strike_price=Decimal("100.1"), streamer_symbol=".XYZ241220C100.1")
+        option.option_type.value = "C"
+        chain = {date(2024, 12, 20): [option]}
+        monkeypatch.setattr("tasty_agent.server.get_cached_option_chain", AsyncMock(return_value=chain))
+        monkeypatch.setattr("tasty_agent.server._instrument_detail_cache", {})
+        spec = InstrumentSpec(symbol="XYZ", option_type="C", strike_price=100.1, expiration_date="2024-12-20")
+
+        details = asyncio.run(get_instrument_details(Mock(), [spec]))
+
+        assert details[0].instrument is option
+
+    def test_repeat_specs_served_from_detail_cache(self, monkeypatch):
+        lookup = AsyncMock(side_effect=lambda session, symbols: {s: Mock(symbol=s) for s in symbols})
+        monkeypatch.setattr("tasty_agent.server._get_cached_equities", lookup)
+        monkeypatch.setattr("tasty_agent.server._instrument_detail_cache", {})
+
+        async def run():
+            first = await get_instrument_details(Mock(), [InstrumentSpec(symbol="QQQ")])
+            second = await get_instrument_details(Mock(), [InstrumentSpec(symbol="QQQ"), InstrumentSpec(symbol="SPY")])
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert second[0] is first[0]
+        assert [call.args[1] for call in lookup.await_args_list] == [["QQQ"], ["SPY"]]
@@ -0,0 +1,140 @@
+"""Unit tests for tasty_agent.supabase_client module."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import Mock
+
+import bcrypt
+
+from tasty_agent.supabase_client import SupabaseClient
+
+API_KEY = "gk_abcdef123"
+CLIENT_IP = "100.77.64.79"
+
+
+def _hash(key: str) -> str:
+    return bcrypt.hashpw(key.encode(), bcrypt.gensalt(4)).decode()
+
+
+def _device(device_id, api_key_hash, prefix=None, expires_at=None):
+    return {
+        "device_id": device_id,
+        "device_identifier": f"kiosk-{device_id}",
+        "api_key_hash": api_key_hash,
+        "api_key_prefix": prefix,
+        "api_key_expires_at": expires_at,
+        "tailscale_ip": None,
+    }
+
+
+class _Pool:
+    """asyncpg pool stand-in serving fixed device rows and direct credentials for any device."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.fetch_count = 0
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def fetch(self, query):
+        self.fetch_count += 1
+        return self.rows
+
+    async def fetchrow(self, query, device_id):
+        return {
+            "device_id": device_id,
+            "device_identifier": f"kiosk-{device_id}",
+            "user_id": None,
+            "tastytrade_account_id": f"ACC{device_id}",
+            "tastytrade_client_secret": "secret",
+            "tastytrade_refresh_token": "token",
+            "account_id": None,
+            "client_secret": None,
+            "refresh_token": None,
+        }
+
+
+def _client(rows) -> SupabaseClient:
+    client = SupabaseClient("postgresql://test")
+    client._pool = _Pool(rows)
+    return client
+
+
+class TestValidateKioskApiKey:
+    """Tests for cached API key validation."""
+
+    def test_cache_hit_still_enforces_expiry(self, monkeypatch):
+        now = datetime.now(UTC)
+        client = _client([_device(1, _hash(API_KEY), expires_at=now + timedelta(hours=1))])
+
+        class _TwoHoursLater(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return now + timedelta(hours=2)
+
+        async def run():
+            first = await client.validate_kiosk_api_key(API_KEY, CLIENT_IP)
+            cached = await client.validate_kiosk_api_key(API_KEY, CLIENT_IP)
+            monkeypatch.setattr("tasty_agent.supabase_client.datetime", _TwoHoursLater)
+            expired = await client.validate_kiosk_api_key(API_KEY, CLIENT_IP)
+            return first, cached, expired
+
+        first, cached, expired = asyncio.run(run())
+
+        assert first["account_id"] == "ACC1"
+        assert cached == first
+        assert expired is None
+        assert client._pool.fetch_count == 2
+        assert not client._validation_cache
+
+    def test_invalidate_drops_every_client_ip(self):
+        client = _client([_device(1, _hash(API_KEY))])
+
+        async def run():
+            await client.validate_kiosk_api_key(API_KEY, CLIENT_IP)
+            await client.validate_kiosk_api_key(API_KEY, "100.77.64.80")
+            client.invalidate(API_KEY)
+            assert not client._validation_cache
+            return await client.validate_kiosk_api_key(API_KEY, CLIENT_IP)
+
+        assert asyncio.run(run())["device_id"] == 1
+        assert client._pool.fetch_count == 3
+
+    def test_wrong_key_against_verified_hash_skips_bcrypt(self, monkeypatch):
+        client = _client([_device(1, _hash(API_KEY))])
+
+        async def run():
+            await client.validate_kiosk_api_key(API_KEY, CLIENT_IP)
+            checkpw = Mock(side_effect=bcrypt.checkpw)
+            monkeypatch.setattr("tasty_agent.supabase_client.bcrypt.checkpw", checkpw)
+            return await client.validate_kiosk_api_key("gk_wrong", CLIENT_IP), checkpw
+
+        result, checkpw = asyncio.run(run())
+
+        assert result is None
+        checkpw.assert_not_called()
+
+    def test_malformed_hash_counts_as_mismatch(self):
+        client = _client([_device(1, "not-a-bcrypt-hash"), _device(2, _hash(API_KEY))])
+
+        result = asyncio.run(client.validate_kiosk_api_key(API_KEY, CLIENT_IP))
+
+        assert result["device_id"] == 2
+
+    def test_prefix_matched_rows_checked_first(self, monkeypatch):
+        rows = [_device(1, _hash("gk_zzz999"), prefix="gk_zz"), _device(2, _hash(API_KEY), prefix="gk_ab")]
+        client = _client(rows)
+        checkpw = Mock(side_effect=bcrypt.checkpw)
+        monkeypatch.setattr("tasty_agent.supabase_client.bcrypt.checkpw", checkpw)
+
+        result = asyncio.run(client.validate_kiosk_api_key(API_KEY, CLIENT_IP))
+
+        assert result["device_id"] == 2
+        assert [call.args[1].decode() for call in checkpw.call_args_list] == [rows[1]["api_key_hash"]]